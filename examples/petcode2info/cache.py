@@ -0,0 +1,229 @@
+"""SeerAPI 参考数据的本地缓存
+
+精灵、技能、刻印等数据只会随游戏版本更新变化，因此把请求结果保存在本地 SQLite 数据库中，
+之后的运行直接从缓存读取（首次读取后还会保留在内存中）。
+
+每条记录带有写入时间和数据版本：超过所属资源类型的 TTL、或版本与当前版本不同的记录
+视为未命中，会重新请求并覆盖。
+
+数据以 JSON 保存（pydantic 模型的类型名和 ``model_dump`` 的结果），读取时只会还原
+``seerapi`` 和 ``seerapi_models`` 包中的模型，缓存文件被篡改也不会执行任意代码。
+写入先保存在内存中，每 ``batch_size`` 条或关闭时一次性提交，避免每条记录一次 fsync。
+"""
+
+from dataclasses import dataclass, field
+from functools import reduce
+from importlib import import_module, metadata
+import json
+import sqlite3
+import time
+
+DAY = 24 * 60 * 60
+
+# 各资源类型的缓存有效期（秒）
+DEFAULT_TTLS: dict[str, float] = {
+    'pet': 30 * DAY,
+    'skill': 30 * DAY,
+    'nature': 365 * DAY,
+    'element_type_combination': 365 * DAY,
+    'battle_effect': 90 * DAY,
+    'pet_effect': 30 * DAY,
+    'pet_variation': 30 * DAY,
+    'soulmark': 30 * DAY,
+    'mintmark': 30 * DAY,
+    'equip': 30 * DAY,
+    'title': 30 * DAY,
+}
+DEFAULT_TTL = 7 * DAY
+DEFAULT_BATCH_SIZE = 256
+
+# 允许从缓存中还原的模型所在的包
+TRUSTED_PACKAGES = frozenset({'seerapi', 'seerapi_models'})
+
+
+def default_version() -> str:
+    """默认的数据版本，使用 seerapi 包的版本号（随游戏数据更新发布）"""
+    try:
+        return metadata.version('seerapi')
+    except metadata.PackageNotFoundError:
+        return '0'
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class _Counters:
+    total: CacheStats = field(default_factory=CacheStats)
+    by_resource: dict[str, CacheStats] = field(default_factory=dict)
+
+    def record(self, resource: str, hit: bool):
+        stats = self.by_resource.setdefault(resource, CacheStats())
+        for target in (self.total, stats):
+            if hit:
+                target.hits += 1
+            else:
+                target.misses += 1
+
+
+_MISSING = object()
+
+
+def _encode(value) -> str | None:
+    """将 pydantic 模型编码为 JSON，其他类型的值返回 None（只缓存在内存中）"""
+    if not hasattr(value, 'model_dump'):
+        return None
+    cls = type(value)
+    return json.dumps(
+        {
+            'type': f'{cls.__module__}:{cls.__qualname__}',
+            'data': value.model_dump(mode='json'),
+        },
+        ensure_ascii=False,
+    )
+
+
+def _decode(text: str):
+    record = json.loads(text)
+    module_name, _, name = record['type'].partition(':')
+    if module_name.partition('.')[0] not in TRUSTED_PACKAGES:
+        raise ValueError(f'Untrusted type in cache: {record["type"]}')
+    cls = reduce(getattr, name.split('.'), import_module(module_name))
+    return cls.model_validate(record['data'])
+
+
+class ReferenceCache:
+    """基于 SQLite 的参考数据缓存
+
+    Args:
+        path: 数据库文件路径，``':memory:'`` 表示仅在内存中缓存
+        version: 数据版本，与记录中的版本不同时视为未命中
+        ttls: 覆盖各资源类型的有效期（秒）
+        batch_size: 累积多少条写入后提交一次，其余的写入在 `flush` 或 `close` 时提交
+    """
+
+    def __init__(
+        self,
+        path: str = 'seerapi_cache.sqlite3',
+        *,
+        version: str | None = None,
+        ttls: dict[str, float] | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.version = version if version is not None else default_version()
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.batch_size = batch_size
+        self._memory: dict[tuple[str, str], object] = {}
+        self._pending: list[tuple[str, str, str, float, str]] = []
+        self._counters = _Counters()
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS records ('
+            'resource TEXT NOT NULL, key TEXT NOT NULL, version TEXT NOT NULL, '
+            'fetched_at REAL NOT NULL, data BLOB NOT NULL, '
+            'PRIMARY KEY (resource, key))'
+        )
+        self._conn.commit()
+
+    def flush(self):
+        """提交尚未写入数据库的记录"""
+        if not self._pending:
+            return
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)', self._pending
+        )
+        self._conn.commit()
+        self._pending.clear()
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _lookup(self, resource: str, key: str):
+        value = self._memory.get((resource, key), _MISSING)
+        if value is not _MISSING:
+            return value
+        row = self._conn.execute(
+            'SELECT version, fetched_at, data FROM records '
+            'WHERE resource = ? AND key = ?',
+            (resource, key),
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        version, fetched_at, data = row
+        ttl = self.ttls.get(resource, DEFAULT_TTL)
+        if version != self.version or time.time() - fetched_at > ttl:
+            return _MISSING
+        try:
+            value = _decode(data)
+        except Exception:
+            # 旧格式或损坏的记录视为未命中，之后会被覆盖
+            return _MISSING
+        self._memory[resource, key] = value
+        return value
+
+    def get(self, resource: str, key) -> tuple[bool, object]:
+        """读取缓存，返回 ``(是否命中, 数据)``"""
+        value = self._lookup(resource, str(key))
+        hit = value is not _MISSING
+        self._counters.record(resource, hit)
+        return hit, value if hit else None
+
+    def set(self, resource: str, key, value):
+        key = str(key)
+        self._memory[resource, key] = value
+        data = _encode(value)
+        if data is None:
+            return
+        self._pending.append((resource, key, self.version, time.time(), data))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def clear(self, resource: str | None = None):
+        """清除全部缓存，或只清除某一资源类型的缓存"""
+        if resource is None:
+            self._memory.clear()
+            self._pending.clear()
+            self._conn.execute('DELETE FROM records')
+        else:
+            self._memory = {k: v for k, v in self._memory.items() if k[0] != resource}
+            self._pending = [row for row in self._pending if row[0] != resource]
+            self._conn.execute('DELETE FROM records WHERE resource = ?', (resource,))
+        self._conn.commit()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self._counters.total.hits, self._counters.total.misses)
+
+    def stats_by_resource(self) -> dict[str, CacheStats]:
+        return {
+            resource: CacheStats(stats.hits, stats.misses)
+            for resource, stats in self._counters.by_resource.items()
+        }
+
+    def format_stats(self) -> str:
+        lines = []
+        for resource, stats in sorted(self.stats_by_resource().items()):
+            lines.append(
+                f'  - {resource}: 命中 {stats.hits} 未命中 {stats.misses} '
+                f'命中率 {stats.hit_rate:.1%}'
+            )
+        total = self.stats()
+        lines.append(
+            f'  合计: 命中 {total.hits} 未命中 {total.misses} '
+            f'命中率 {total.hit_rate:.1%}'
+        )
+        return '\n'.join(lines)
@@ -1,5 +1,13 @@
+import argparse
 import asyncio
 import base64
+from collections.abc import AsyncIterator
+from contextlib import ExitStack
+from dataclasses import dataclass
+import io
+import json
+import sys
+from typing import Literal, TextIO
 
 from google.protobuf import json_format
 from petcode import PetCodeMessage, from_binary
@@ -17,59 +25,194 @@ from seerapi_models import (
     TypeCombination,
     VariationEffect,
 )
-from seerbp.petcode.v1.message_pb2 import MintmarkInfo
+from seerbp.petcode.v1.message_pb2 import MintmarkInfo, PetInfo
+
+from cache import ReferenceCache
 
 
 class DataFetcher:
-    def __init__(self):
+    """SeerAPI 数据获取器
+
+    所有请求共享一个信号量，同时进行的请求数不超过 ``max_concurrency``；
+    相同的请求只会发出一次，之后的调用直接复用进行中或已完成的结果。
+    传入 ``cache`` 时优先从本地缓存读取，未命中的请求结果会写入缓存。
+    """
+
+    def __init__(self, max_concurrency: int = 8, cache: ReferenceCache | None = None):
         self.client = SeerAPI()
+        self.cache = cache
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._requests: dict[tuple, asyncio.Future] = {}
 
     async def close(self):
         await self.client.aclose()
 
+    async def _limited(self, method: str, resource: str, key):
+        if self.cache is not None:
+            hit, value = self.cache.get(resource, key)
+            if hit:
+                return value
+        async with self._semaphore:
+            if method == 'get':
+                value = await self.client.get(resource, id=key)
+            else:
+                named_data = await self.client.get_by_name(resource, name=key)
+                value = next(iter(named_data.data.values()))
+        if self.cache is not None:
+            self.cache.set(resource, key, value)
+        return value
+
+    def _request(self, method: str, resource: str, key) -> asyncio.Future:
+        request_key = (method, resource, key)
+        future = self._requests.get(request_key)
+        if future is None:
+            future = asyncio.ensure_future(self._limited(method, resource, key))
+            self._requests[request_key] = future
+            future.add_done_callback(lambda done: self._evict_failed(request_key, done))
+        return future
+
+    def _evict_failed(self, request_key: tuple, future: asyncio.Future):
+        # 失败的请求不复用，之后引用相同数据的调用会重新请求
+        if future.cancelled() or future.exception() is not None:
+            if self._requests.get(request_key) is future:
+                del self._requests[request_key]
+
+    async def _get(self, resource: str, id: int):
+        return await self._request('get', resource, id)
+
+    async def _get_by_name(self, resource: str, name: str):
+        return await self._request('get_by_name', resource, name)
+
     async def fetch_pet_data(self, pet_id: int) -> Pet:
-        return await self.client.get('pet', id=pet_id)
+        return await self._get('pet', pet_id)
 
     async def fetch_skills(self, skill_ids: list[int]) -> dict[int, Skill]:
-        skills = {}
-        for sid in skill_ids:
-            skill = await self.client.get('skill', id=sid)
-            skills[sid] = skill
-
-        return skills
+        skills = await asyncio.gather(*(self.fetch_skill(sid) for sid in skill_ids))
+        return dict(zip(skill_ids, skills))
 
     async def fetch_skill(self, skill_id: int) -> Skill:
-        return await self.client.get('skill', id=skill_id)
+        return await self._get('skill', skill_id)
 
     async def fetch_element_type(self, type_id: int) -> TypeCombination:
-        return await self.client.get('element_type_combination', id=type_id)
+        return await self._get('element_type_combination', type_id)
 
     async def fetch_battle_effect_name(self, effect_id: int) -> str:
-        return (await self.client.get('battle_effect', id=effect_id)).name
+        return (await self._get('battle_effect', effect_id)).name
 
     async def fetch_pet_effect(self, effect_string: str) -> PetEffect:
-        named_data = await self.client.get_by_name('pet_effect', name=effect_string)
-        return next(iter(named_data.data.values()))
+        return await self._get_by_name('pet_effect', effect_string)
 
     async def fetch_variation_effect(self, effect_string: str) -> VariationEffect:
-        named_data = await self.client.get_by_name('pet_variation', name=effect_string)
-        return next(iter(named_data.data.values()))
+        return await self._get_by_name('pet_variation', effect_string)
 
     async def fetch_soulmark(self, effect_string: str) -> Soulmark:
-        named_data = await self.client.get_by_name('soulmark', name=effect_string)
-        return next(iter(named_data.data.values()))
+        return await self._get_by_name('soulmark', effect_string)
 
     async def fetch_nature(self, nature_id: int) -> Nature:
-        return await self.client.get('nature', id=nature_id)
+        return await self._get('nature', nature_id)
 
     async def fetch_mintmark(self, mintmark_id: int):
-        return await self.client.get('mintmark', id=mintmark_id)
+        return await self._get('mintmark', mintmark_id)
 
     async def fetch_equip(self, suit_id: int):
-        return await self.client.get('equip', id=suit_id)
+        return await self._get('equip', suit_id)
 
     async def fetch_title(self, title_id: int):
-        return await self.client.get('title', id=title_id)
+        return await self._get('title', title_id)
+
+    async def fetch_effect(self, effect: PetInfo.Effect):
+        """根据特效类型获取特性、魂印或异能特质"""
+        effect_type = get_effect_type(effect.status)
+        param = effect_to_param(effect).name
+        if effect_type == EffectType.GENERAL:
+            return await self.fetch_pet_effect(param)
+        if effect_type == EffectType.SOULMARK:
+            return await self.fetch_soulmark(param)
+        if effect_type == EffectType.VARIATION:
+            return await self.fetch_variation_effect(param)
+        return None
+
+    async def resolve(self, message: PetCodeMessage) -> 'ResolvedData':
+        """收集消息引用的所有 ID，去重后并发获取"""
+        pet_ids, nature_ids, skill_ids, mintmark_ids, state_ids = (
+            set() for _ in range(5)
+        )
+        effects: dict[tuple[int, int, tuple[int, ...]], PetInfo.Effect] = {}
+        for pet in message.pets:
+            pet_ids.add(pet.id)
+            nature_ids.add(pet.nature)
+            skill_ids.update(pet.skills)
+            for effect in pet.effects:
+                effects.setdefault(_effect_key(effect), effect)
+            for m in pet.mintmarks:
+                mintmark = read_mintmark(m)
+                mintmark_ids.add(mintmark.id)
+                if _has_bound_gem(mintmark):
+                    skill_ids.add(mintmark.gem.bind_skill_id)
+            for item in (*pet.resistance.ctl, *pet.resistance.weak):
+                state_ids.add(item.state_id)
+        equip_ids = set(message.seer_set.equips)
+        title_id = message.seer_set.title_id
+
+        async def fetch_all(fetch, keys) -> dict:
+            keys = list(keys)
+            return dict(zip(keys, await asyncio.gather(*map(fetch, keys))))
+
+        (
+            pets,
+            natures,
+            skills,
+            effect_data,
+            mintmarks,
+            state_names,
+            equips,
+            titles,
+        ) = await asyncio.gather(
+            fetch_all(self.fetch_pet_data, pet_ids),
+            fetch_all(self.fetch_nature, nature_ids),
+            fetch_all(self.fetch_skill, skill_ids),
+            fetch_all(lambda key: self.fetch_effect(effects[key]), effects),
+            fetch_all(self.fetch_mintmark, mintmark_ids),
+            fetch_all(self.fetch_battle_effect_name, state_ids),
+            fetch_all(self.fetch_equip, equip_ids),
+            fetch_all(self.fetch_title, [title_id] if title_id else []),
+        )
+        return ResolvedData(
+            pets=pets,
+            natures=natures,
+            skills=skills,
+            effects=effect_data,
+            mintmarks=mintmarks,
+            state_names=state_names,
+            equips=equips,
+            titles=titles,
+        )
+
+
+@dataclass
+class ResolvedData:
+    """一条消息渲染所需的全部数据，以 ID 为键"""
+
+    pets: dict[int, Pet]
+    natures: dict[int, Nature]
+    skills: dict[int, Skill]
+    effects: dict[tuple[int, int, tuple[int, ...]], object]
+    mintmarks: dict[int, object]
+    state_names: dict[int, str]
+    equips: dict[int, object]
+    titles: dict[int, object]
+
+
+def _effect_key(effect: PetInfo.Effect) -> tuple[int, int, tuple[int, ...]]:
+    return effect.id, effect.status, tuple(effect.args)
+
+
+def _has_bound_gem(mintmark) -> bool:
+    return bool(
+        isinstance(mintmark, MintmarkInfo.Universal)
+        and mintmark.gem.bind_skill_id
+        and mintmark.gem.gem_id
+    )
 
 
 FIRE_NAMES = {
@@ -80,16 +223,21 @@ FIRE_NAMES = {
 }
 
 
-async def main(base64string: str):
-    data_fetcher = DataFetcher()
-    binary = base64.b64decode(base64string)
-    message = from_binary(binary)
-    print(f'服务器: {message.server}')
-    print(f'显示模式: {message.display_mode}')
-    pet_msg = message.pets[0]
-    pet = await data_fetcher.fetch_pet_data(pet_msg.id)
-    nature = await data_fetcher.fetch_nature(pet_msg.nature)
-    skills = await data_fetcher.fetch_skills(list(pet_msg.skills))
+def describe_effect(eff: PetInfo.Effect, data: ResolvedData) -> str | None:
+    effect_type = get_effect_type(eff.status)
+    effect = data.effects[_effect_key(eff)]
+    if effect_type == EffectType.GENERAL:
+        return f'特性: {effect.name}LV{effect.star_level}, idx: {effect.id}'
+    if effect_type == EffectType.SOULMARK:
+        return f'魂印id: {effect.id}'
+    if effect_type == EffectType.VARIATION:
+        return f'异能特质: {effect.name}'
+    return None
+
+
+def render_pet(pet_msg: PetInfo, data: ResolvedData) -> list[str]:
+    pet = data.pets[pet_msg.id]
+    nature = data.natures[pet_msg.nature]
 
     infos = [
         f'精灵名称：{pet.name}',
@@ -104,37 +252,22 @@ async def main(base64string: str):
         infos.append(f'  - {key}: {value}')
 
     infos.append('精灵携带的技能：')
-    for skill in skills.values():
-        infos.append(f'  - {skill.name}')
+    for sid in dict.fromkeys(pet_msg.skills):
+        infos.append(f'  - {data.skills[sid].name}')
 
     infos.append('精灵特效：')
     for eff in pet_msg.effects:
-        effect_type = get_effect_type(eff.status)
-        param = effect_to_param(eff).name
-        if effect_type == EffectType.GENERAL:
-            general_effect = await data_fetcher.fetch_pet_effect(param)
-            infos.append(
-                f'  - 特性: {general_effect.name}LV{general_effect.star_level}, idx: {general_effect.id}'
-            )
-        elif effect_type == EffectType.SOULMARK:
-            soulmark = await data_fetcher.fetch_soulmark(param)
-            infos.append(f'  - 魂印id: {soulmark.id}')
-        elif effect_type == EffectType.VARIATION:
-            variation_effect = await data_fetcher.fetch_variation_effect(param)
-            infos.append(f'  - 异能特质: {variation_effect.name}')
+        description = describe_effect(eff, data)
+        if description is not None:
+            infos.append(f'  - {description}')
 
     infos.append('精灵装备的刻印：')
     for m in pet_msg.mintmarks:
         mintmark = read_mintmark(m)
-        mintmark_info = await data_fetcher.fetch_mintmark(mintmark.id)
-        infos.append(f'  - {mintmark_info.name}')
-        if (
-            isinstance(mintmark, MintmarkInfo.Universal)
-            and mintmark.gem.bind_skill_id
-            and mintmark.gem.gem_id
-        ):
+        infos.append(f'  - {data.mintmarks[mintmark.id].name}')
+        if _has_bound_gem(mintmark):
             infos.append(f'    - 宝石: {mintmark.gem.gem_id}')
-            skill = await data_fetcher.fetch_skill(mintmark.gem.bind_skill_id)
+            skill = data.skills[mintmark.gem.bind_skill_id]
             infos.append(f'    - 绑定技能: {skill.name}')
 
     infos.append('精灵携带的战斗道具：')
@@ -148,12 +281,8 @@ async def main(base64string: str):
         f'百分比伤害抗性: {resistance.hurt.precent}'
     )
 
-    for item in resistance.ctl:
-        state_name = await data_fetcher.fetch_battle_effect_name(item.state_id)
-        infos.append(f'  - 状态: {state_name} 抵抗概率: {item.percent}')
-
-    for item in resistance.weak:
-        state_name = await data_fetcher.fetch_battle_effect_name(item.state_id)
+    for item in (*resistance.ctl, *resistance.weak):
+        state_name = data.state_names[item.state_id]
         infos.append(f'  - 状态: {state_name} 抵抗概率: {item.percent}')
 
     infos.append('精灵的额外能力值加成：')
@@ -171,14 +300,25 @@ async def main(base64string: str):
     for key, value in json_format.MessageToDict(pet_msg.ability_total).items():
         infos.append(f'  - {key}: {value}')
 
-    infos.append('')
+    return infos
+
+
+def render(message: PetCodeMessage, data: ResolvedData) -> str:
+    infos = [
+        f'服务器: {message.server}',
+        f'显示模式: {message.display_mode}',
+    ]
+    for pet_msg in message.pets:
+        infos.extend(render_pet(pet_msg, data))
+        infos.append('')
+
     infos.append('用户的套装信息：')
     for item in message.seer_set.equips:
-        infos.append(f'  - {(await data_fetcher.fetch_equip(item)).name}')
+        infos.append(f'  - {data.equips[item].name}')
 
     title_name = '无'
     if message.seer_set.title_id != 0:
-        title_name = (await data_fetcher.fetch_title(message.seer_set.title_id)).name
+        title_name = data.titles[message.seer_set.title_id].name
     infos.append(f'用户的称号：{title_name}')
 
     infos.append('用户的战斗火焰：')
@@ -188,11 +328,248 @@ async def main(base64string: str):
     else:
         infos.append('  - 无')
 
-    print('\n'.join(infos))
+    return '\n'.join(infos)
 
-    await data_fetcher.close()
+
+async def main(
+    base64string: str,
+    max_concurrency: int = 8,
+    cache: ReferenceCache | None = None,
+):
+    binary = base64.b64decode(base64string)
+    message = from_binary(binary)
+
+    data_fetcher = DataFetcher(max_concurrency, cache)
+    try:
+        data = await data_fetcher.resolve(message)
+    finally:
+        await data_fetcher.close()
+
+    print(render(message, data))
+
+
+def pet_to_record(pet_msg: PetInfo, data: ResolvedData) -> dict:
+    effects = (describe_effect(eff, data) for eff in pet_msg.effects)
+    return {
+        'id': pet_msg.id,
+        'name': data.pets[pet_msg.id].name,
+        'level': pet_msg.level,
+        'dv': pet_msg.dv,
+        'nature': data.natures[pet_msg.nature].name,
+        'skills': [data.skills[sid].name for sid in pet_msg.skills],
+        'effects': [effect for effect in effects if effect is not None],
+        'mintmarks': [
+            data.mintmarks[read_mintmark(m).id].name for m in pet_msg.mintmarks
+        ],
+        'pet_items': list(pet_msg.pet_items),
+        'skin_id': pet_msg.skin_id,
+        'is_awaken': pet_msg.is_awaken,
+    }
+
+
+def to_record(message: PetCodeMessage, data: ResolvedData) -> dict:
+    """将消息及其引用的数据转换为可 JSON 序列化的字典"""
+    title_id = message.seer_set.title_id
+    return {
+        'server': message.server,
+        'display_mode': message.display_mode,
+        'pets': [pet_to_record(pet_msg, data) for pet_msg in message.pets],
+        'equips': [data.equips[item].name for item in message.seer_set.equips],
+        'title': data.titles[title_id].name if title_id else None,
+        'battle_fires': [FIRE_NAMES[item] for item in message.battle_fires],
+    }
+
+
+async def read_codes(
+    source: TextIO,
+) -> AsyncIterator[tuple[int, PetCodeMessage | Exception]]:
+    """逐行读取并解码 PetCode，返回 ``(行号, 消息或异常)``，跳过空行
+
+    读取在线程中进行，等待输入时不会阻塞事件循环。
+    """
+    line_no = 0
+    while line := await asyncio.to_thread(source.readline):
+        line_no += 1
+        code = line.strip()
+        if not code:
+            continue
+        try:
+            yield line_no, from_binary(base64.b64decode(code, validate=True))
+        except Exception as e:
+            yield line_no, e
+
+
+async def batch(
+    source: TextIO,
+    output: TextIO,
+    *,
+    output_format: Literal['text', 'jsonl'] = 'text',
+    max_concurrency: int = 8,
+    max_pending: int = 256,
+    cache: ReferenceCache | None = None,
+) -> int:
+    """批量输出 PetCode 的信息
+
+    所有 PetCode 共享同一个 `DataFetcher`，不同 PetCode 引用的相同数据只请求一次。
+    输入逐行读取，每读到一个 PetCode 就开始获取数据，获取完成后立即输出，
+    因此输出顺序不一定与输入顺序相同，
+    可以根据行号（文本格式中的 ``# 第 N 行``、JSON 中的 ``line``）对应。
+    同时处理的 PetCode 数量不超过 ``max_pending``。
+
+    Returns:
+        处理失败的 PetCode 数量
+    """
+    errors = 0
+
+    def format_result(line_no: int, message: PetCodeMessage, data: ResolvedData):
+        if output_format == 'jsonl':
+            record = {'line': line_no, **to_record(message, data)}
+            return json.dumps(record, ensure_ascii=False) + '\n'
+        return f'# 第 {line_no} 行\n{render(message, data)}\n\n'
+
+    def format_error(line_no: int, error: Exception):
+        if output_format == 'jsonl':
+            record = {'line': line_no, 'error': f'{type(error).__name__}: {error}'}
+            return json.dumps(record, ensure_ascii=False) + '\n'
+        return f'# 第 {line_no} 行：处理失败：{error!r}\n\n'
+
+    def write(line_no: int, message: PetCodeMessage | None, result):
+        nonlocal errors
+        if not isinstance(result, Exception):
+            # 渲染失败（例如数据中缺少某个 ID）只影响这一个 PetCode
+            try:
+                text = format_result(line_no, message, result)
+            except Exception as e:
+                result = e
+        if isinstance(result, Exception):
+            errors += 1
+            text = format_error(line_no, result)
+        output.write(text)
+        output.flush()
+
+    async def process(line_no: int, message: PetCodeMessage):
+        try:
+            result = await data_fetcher.resolve(message)
+        except Exception as e:
+            result = e
+        return line_no, message, result
+
+    data_fetcher = DataFetcher(max_concurrency, cache)
+    codes = read_codes(source)
+    reader: asyncio.Future | None = asyncio.ensure_future(anext(codes, None))
+    pending: set[asyncio.Future] = set()
+    try:
+        while reader is not None or pending:
+            # 同时处理的数量达到上限时暂不接收新的输入
+            waiting = set(pending)
+            if reader is not None and len(pending) < max_pending:
+                waiting.add(reader)
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is not reader:
+                    pending.discard(task)
+                    write(*task.result())
+                    continue
+                item = task.result()
+                if item is None:
+                    reader = None
+                    continue
+                reader = asyncio.ensure_future(anext(codes, None))
+                line_no, message = item
+                if isinstance(message, Exception):
+                    write(line_no, None, message)
+                else:
+                    pending.add(asyncio.ensure_future(process(line_no, message)))
+    finally:
+        for task in pending:
+            task.cancel()
+        if reader is not None:
+            reader.cancel()
+        await data_fetcher.close()
+    return errors
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='将 PetCode 输出为文字信息')
+    parser.add_argument(
+        '--cache',
+        default='seerapi_cache.sqlite3',
+        help='本地缓存文件路径（默认：%(default)s）',
+    )
+    parser.add_argument('--no-cache', action='store_true', help='不使用本地缓存')
+    parser.add_argument(
+        '--refresh', action='store_true', help='清空本地缓存后重新获取数据'
+    )
+    parser.add_argument('--max-concurrency', type=int, default=8)
+    parser.add_argument('--stats', action='store_true', help='输出缓存命中率')
+    subparsers = parser.add_subparsers(dest='command')
+    show = subparsers.add_parser('show', help='输出一个 PetCode 的信息（默认）')
+    show.add_argument('code', nargs='?', help='PetCode，省略时从标准输入读取')
+    warm = subparsers.add_parser('warmup', help='预先缓存一批 PetCode 引用的数据')
+    warm.add_argument('file', help='每行一个 PetCode 的文本文件')
+    batch_parser = subparsers.add_parser('batch', help='批量输出多个 PetCode 的信息')
+    batch_parser.add_argument(
+        'file',
+        nargs='?',
+        default='-',
+        help='每行一个 PetCode 的文本文件，默认读取标准输入',
+    )
+    batch_parser.add_argument(
+        '-f', '--format', choices=('text', 'jsonl'), default='text', help='输出格式'
+    )
+    batch_parser.add_argument(
+        '--max-pending', type=int, default=256, help='同时处理的 PetCode 数量上限'
+    )
+    return parser.parse_args(argv)
+
+
+def run(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    exit_code = 0
+    cache = None if args.no_cache else ReferenceCache(args.cache)
+    if cache is not None and args.refresh:
+        cache.clear()
+    try:
+        if args.command == 'warmup':
+            with open(args.file, encoding='utf-8') as f:
+                errors = asyncio.run(
+                    batch(
+                        f,
+                        io.StringIO(),
+                        max_concurrency=args.max_concurrency,
+                        cache=cache,
+                    )
+                )
+            print(f'缓存完成，{errors} 个 PetCode 处理失败')
+        elif args.command == 'batch':
+            with ExitStack() as stack:
+                source = (
+                    sys.stdin
+                    if args.file == '-'
+                    else stack.enter_context(open(args.file, encoding='utf-8'))
+                )
+                errors = asyncio.run(
+                    batch(
+                        source,
+                        sys.stdout,
+                        output_format=args.format,
+                        max_concurrency=args.max_concurrency,
+                        max_pending=args.max_pending,
+                        cache=cache,
+                    )
+                )
+            exit_code = 1 if errors else 0
+        else:
+            code = getattr(args, 'code', None) or input('请输入 PetCode: ')
+            asyncio.run(main(code, args.max_concurrency, cache))
+        if cache is not None and (args.stats or args.command == 'warmup'):
+            print('缓存命中率：', file=sys.stderr)
+            print(cache.format_stats(), file=sys.stderr)
+    finally:
+        if cache is not None:
+            cache.close()
+    return exit_code
 
 
 if __name__ == '__main__':
-    base64string: str = input('请输入 PetCode: ')
-    asyncio.run(main(base64string))
+    sys.exit(run())
@@ -0,0 +1,114 @@
+"""基准测试使用的合成数据集
+
+所有数据都基于 ``tests/conftest.py`` 中的示例数据构造，保证每次运行完全一致。
+"""
+
+from petcode.create_and_read import (
+    create_quanxiao_mintmark,
+    create_skill_mintmark,
+    create_universal_mintmark,
+)
+from seerbp.petcode.v1.message_pb2 import (
+    PetAbilityValue,
+    PetCodeMessage,
+    PetInfo,
+    ResistanceInfo,
+)
+from tests.conftest import (
+    make_sample_pet_ability_bonus,
+    make_sample_pet_info,
+    make_sample_petcode_message,
+)
+
+MAX_PETS = 6
+
+
+def _six_pets() -> list[PetInfo]:
+    pets = []
+    for i in range(MAX_PETS):
+        pet = make_sample_pet_info()
+        pet.id += i
+        pet.skills[0] += i
+        pets.append(pet)
+    return pets
+
+
+def _max_sized_pet(index: int) -> PetInfo:
+    """每个字段都填满的精灵"""
+    pet = make_sample_pet_info()
+    pet.id += index
+    pet.extra_hp = 150
+    pet.is_awaken = True
+    pet.skills.append(31570 + index)
+    pet.effects.extend(
+        [
+            PetInfo.Effect(id=1200 + index, status=5, args=[]),
+            PetInfo.Effect(id=12, status=4, args=[3, 10, 20]),
+        ]
+    )
+    pet.mintmarks.extend(
+        [
+            create_universal_mintmark(
+                id=40002,
+                level=5,
+                gem_id=1800011,
+                bind_skill_id=24708,
+                ability=PetAbilityValue(
+                    hp=100,
+                    attack=120,
+                    defense=80,
+                    special_attack=90,
+                    special_defense=85,
+                    speed=110,
+                ),
+            ),
+            create_quanxiao_mintmark(id=70001, skill_mintmark_id=50001),
+            create_skill_mintmark(id=50002),
+        ]
+    )
+    pet.resistance.weak.extend(
+        [
+            ResistanceInfo.StateItem(state_id=11, percent=55),
+            ResistanceInfo.StateItem(state_id=12, percent=18),
+            ResistanceInfo.StateItem(state_id=13, percent=10),
+        ]
+    )
+    pet.pet_items.append(300003)
+    for bonus_type in (1, 2, 3, 4, 5):
+        bonus = make_sample_pet_ability_bonus()
+        bonus.type = bonus_type  # type: ignore[assignment]
+        pet.ability_bonus.append(bonus)
+    return pet
+
+
+def single_pet_message() -> PetCodeMessage:
+    return make_sample_petcode_message()
+
+
+def six_pet_message() -> PetCodeMessage:
+    message = make_sample_petcode_message()
+    del message.pets[:]
+    message.pets.extend(_six_pets())
+    return message
+
+
+def max_sized_message() -> PetCodeMessage:
+    message = make_sample_petcode_message()
+    del message.pets[:]
+    message.pets.extend(_max_sized_pet(i) for i in range(MAX_PETS))
+    message.battle_fires.extend(
+        [
+            PetCodeMessage.BattleFire.BATTLE_FIRE_GREEN,
+            PetCodeMessage.BattleFire.BATTLE_FIRE_BLUE,
+            PetCodeMessage.BattleFire.BATTLE_FIRE_PURPLE,
+            PetCodeMessage.BattleFire.BATTLE_FIRE_GOLD,
+        ]
+    )
+    return message
+
+
+CORPORA = {
+    'single_pet': single_pet_message,
+    'six_pets': six_pet_message,
+    'max_sized': max_sized_message,
+}
@@ -0,0 +1,194 @@
+"""序列化层基准测试
+
+用法（在 sdk/py 目录下运行）::
+
+    python -m benchmarks.run                      # 运行全部基准并打印结果
+    python -m benchmarks.run -o result.json       # 同时保存为 JSON
+    python -m benchmarks.run -k decode            # 只运行名称包含 decode 的基准
+    python -m benchmarks.run --compare old.json   # 与之前的结果对比
+
+JSON 结果包含运行环境信息（Python/protobuf 版本及实现），便于在升级依赖前后对比。
+"""
+
+import argparse
+from collections.abc import Callable
+import json
+import platform
+import statistics
+import sys
+import time
+
+from google.protobuf import __version__ as protobuf_version
+from google.protobuf import json_format
+from google.protobuf.internal import api_implementation
+import petcode
+from petcode.effect import (
+    effect_to_param,
+    effects_to_params,
+    param_to_effect,
+    params_to_effects,
+)
+
+from .corpus import CORPORA
+
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.2
+
+
+def _effect_benchmarks(message):
+    effects = [effect for pet in message.pets for effect in pet.effects]
+    params = [effect_to_param(effect) for effect in effects]
+    return {
+        'effect_to_param': lambda: [effect_to_param(effect) for effect in effects],
+        'param_to_effect': lambda: [param_to_effect(param) for param in params],
+        'effects_to_params': lambda: effects_to_params(effects),
+        'params_to_effects': lambda: params_to_effects(params),
+    }
+
+
+def build_benchmarks() -> list[tuple[str, str, int, Callable[[], object]]]:
+    """返回 ``(基准名称, 数据集名称, 消息字节数, 被测函数)`` 列表"""
+    benchmarks = []
+    for corpus_name, factory in CORPORA.items():
+        message = factory()
+        binary = petcode.to_binary(message)
+        code = petcode.to_base64(message)
+        data = petcode.to_dict(message)
+        cases: dict[str, Callable[[], object]] = {
+            'serialize': message.SerializeToString,
+            'encode_binary': lambda m=message: petcode.to_binary(m),
+            'encode_base64': lambda m=message: petcode.to_base64(m),
+            'decode_binary': lambda b=binary: petcode.from_binary(b),
+            'decode_base64': lambda c=code: petcode.from_base64(c),
+            'to_dict': lambda m=message: petcode.to_dict(m),
+            'from_dict': lambda d=data: petcode.from_dict(d),
+            'to_dict_json_format': lambda m=message: json_format.MessageToDict(m),
+            'from_dict_json_format': lambda d=data: json_format.ParseDict(
+                d, type(message)()
+            ),
+        }
+        for codec in ('deflate', 'deflate-dict'):
+            codec_binary = petcode.to_binary(message, codec=codec)
+            cases[f'encode_binary[{codec}]'] = lambda m=message, c=codec: (
+                petcode.to_binary(m, codec=c)
+            )
+            cases[f'decode_binary[{codec}]'] = lambda b=codec_binary: (
+                petcode.from_binary(b)
+            )
+        cases.update(_effect_benchmarks(message))
+
+        size = message.ByteSize()
+        for name, func in cases.items():
+            benchmarks.append((name, corpus_name, size, func))
+    return benchmarks
+
+
+def _calibrate(func: Callable[[], object], min_time: float) -> int:
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= min_time:
+            return number
+        number *= 2
+
+
+def measure(func: Callable[[], object], repeat: int, min_time: float) -> dict:
+    """测量单次调用耗时（纳秒）"""
+    number = _calibrate(func, min_time)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter_ns() - start) / number)
+    median = statistics.median(timings)
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min_ns': min(timings),
+        'median_ns': median,
+        'mean_ns': statistics.fmean(timings),
+        'stdev_ns': statistics.stdev(timings) if repeat > 1 else 0.0,
+        'ops_per_sec': 1e9 / median if median else float('inf'),
+    }
+
+
+def environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'protobuf': protobuf_version,
+        'protobuf_api': api_implementation.Type(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def run(
+    keyword: str | None = None,
+    repeat: int = DEFAULT_REPEAT,
+    min_time: float = DEFAULT_MIN_TIME,
+) -> dict:
+    results = []
+    for name, corpus_name, size, func in build_benchmarks():
+        full_name = f'{name}/{corpus_name}'
+        if keyword and keyword not in full_name:
+            continue
+        result = {'name': name, 'corpus': corpus_name, 'message_bytes': size}
+        result.update(measure(func, repeat, min_time))
+        results.append(result)
+    return {'environment': environment(), 'results': results}
+
+
+def _format_table(report: dict, baseline: dict | None) -> str:
+    previous = {}
+    if baseline is not None:
+        previous = {
+            (item['name'], item['corpus']): item['median_ns']
+            for item in baseline['results']
+        }
+    lines = [f'{"benchmark":<48}{"median":>12}{"ops/s":>14}{"change":>10}']
+    for item in report['results']:
+        full_name = f'{item["name"]}/{item["corpus"]}'
+        change = ''
+        old = previous.get((item['name'], item['corpus']))
+        if old:
+            change = f'{(item["median_ns"] / old - 1) * 100:+.1f}%'
+        lines.append(
+            f'{full_name:<48}{item["median_ns"] / 1000:>10.2f}us'
+            f'{item["ops_per_sec"]:>14,.0f}{change:>10}'
+        )
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='PetCode 序列化层基准测试')
+    parser.add_argument('-o', '--output', help='将结果保存为 JSON 文件')
+    parser.add_argument('-k', '--keyword', help='只运行名称包含该关键字的基准')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        '--min-time',
+        type=float,
+        default=DEFAULT_MIN_TIME,
+        help='每轮测量的最短时间（秒）',
+    )
+    parser.add_argument('--compare', help='与之前保存的 JSON 结果对比')
+    args = parser.parse_args(argv)
+
+    report = run(args.keyword, args.repeat, args.min_time)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    sys.stdout.write(_format_table(report, baseline) + '\n')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,73 +1,170 @@
 import base64
-import gzip
-
-from google.protobuf import json_format
+import binascii
+from collections.abc import Iterable
 
 from seerbp.petcode.v1.message_pb2 import PetCodeMessage
 
+from . import validate
+from .canonical import canonicalize, fingerprint
+from .codec import BinaryData, compress, decompress_view
 from .create_and_read import create_petcode_message
+from .fast_dict import dict_to_message, message_to_dict
+from .validate import Limits
 
 
-def _compress_with_gzip(binary: bytes, level: int = 1) -> bytes:
-    """使用 gzip 压缩二进制数据"""
-    return gzip.compress(binary, compresslevel=level)
-
+def _b64encode(binary: bytes) -> str:
+    return binascii.b2a_base64(binary, newline=False).decode('ascii')
 
-def _decompress_with_gzip(compressed: bytes) -> bytes:
-    """使用 gzip 解压缩二进制数据"""
-    return gzip.decompress(compressed)
 
-
-def to_binary(message: PetCodeMessage) -> bytes:
+def to_binary(message: PetCodeMessage, *, codec: str = 'gzip') -> bytes:
     """
-    将消息序列化为二进制数据，并使用 gzip 压缩
+    将消息序列化为二进制数据，并使用 gzip（或 ``codec`` 指定的编解码器）压缩
     """
-    return _compress_with_gzip(message.SerializeToString())
+    return compress(message.SerializeToString(), codec)
 
 
-def from_binary(binary: bytes) -> PetCodeMessage:
+def from_binary(binary: BinaryData, *, limits: Limits | None = None) -> PetCodeMessage:
     """
     将二进制数据解压缩，并反序列化为消息
+
+    编解码器根据数据头部自动识别。``binary`` 也可以是 ``bytearray``、``memoryview``
+    或 ``mmap`` 等缓冲区对象，解码时不会复制输入数据
+
+    处理不可信的输入时可以传入 ``limits``，见 `petcode.validate`
     """
-    return PetCodeMessage.FromString(_decompress_with_gzip(binary))
+    if limits is not None:
+        return validate.from_binary(binary, limits)
+    return PetCodeMessage.FromString(decompress_view(binary))
 
 
-def to_base64(message: PetCodeMessage) -> str:
+def to_base64(message: PetCodeMessage, *, codec: str = 'gzip') -> str:
     """
     将消息序列化为二进制数据并压缩，返回数据的 base64
     """
-    binary = _compress_with_gzip(message.SerializeToString())
-    return base64.b64encode(binary).decode('utf-8')
+    return _b64encode(to_binary(message, codec=codec))
 
 
-def from_base64(base64_str: str) -> PetCodeMessage:
+def from_base64(base64_str: str, *, limits: Limits | None = None) -> PetCodeMessage:
     """
     将 base64 数据解码，并反序列化为消息
+
+    处理不可信的输入时可以传入 ``limits``，见 `petcode.validate`
     """
+    if limits is not None:
+        return validate.from_base64(base64_str, limits)
     binary = base64.b64decode(base64_str)
     return from_binary(binary)
 
 
+def to_binary_many(
+    messages: Iterable[PetCodeMessage], *, codec: str = 'gzip'
+) -> list[bytes]:
+    """
+    批量将消息序列化为压缩后的二进制数据，结果顺序与输入一致
+    """
+    return [compress(message.SerializeToString(), codec) for message in messages]
+
+
+def from_binary_many(
+    binaries: Iterable[BinaryData], *, limits: Limits | None = None
+) -> list[PetCodeMessage | Exception]:
+    """
+    批量将二进制数据解压缩并反序列化为消息，结果顺序与输入一致
+
+    单条数据解析失败不会中断整个批次，该位置会返回对应的异常对象，
+    调用方可通过 ``isinstance(item, Exception)`` 判断。
+    """
+    if limits is not None:
+        return _decode_many(validate.from_binary, binaries, limits)
+    parse = PetCodeMessage.FromString
+    results: list[PetCodeMessage | Exception] = []
+    append = results.append
+    for binary in binaries:
+        try:
+            append(parse(decompress_view(binary)))
+        except Exception as e:
+            append(e)
+    return results
+
+
+def to_base64_many(
+    messages: Iterable[PetCodeMessage], *, codec: str = 'gzip'
+) -> list[str]:
+    """
+    批量将消息序列化为 base64 字符串，结果顺序与输入一致
+    """
+    encode = _b64encode
+    return [encode(binary) for binary in to_binary_many(messages, codec=codec)]
+
+
+def from_base64_many(
+    base64_strs: Iterable[str], *, limits: Limits | None = None
+) -> list[PetCodeMessage | Exception]:
+    """
+    批量将 base64 字符串解码并反序列化为消息，结果顺序与输入一致
+
+    与 `from_binary_many` 相同，解码失败的条目以异常对象的形式出现在结果中。
+    """
+    if limits is not None:
+        return _decode_many(validate.from_base64, base64_strs, limits)
+    decode = base64.b64decode
+    parse = PetCodeMessage.FromString
+    results: list[PetCodeMessage | Exception] = []
+    append = results.append
+    for base64_str in base64_strs:
+        try:
+            append(parse(decompress_view(decode(base64_str))))
+        except Exception as e:
+            append(e)
+    return results
+
+
+def _decode_many(decode, items: Iterable, limits: Limits) -> list:
+    results: list[PetCodeMessage | Exception] = []
+    append = results.append
+    for item in items:
+        try:
+            append(decode(item, limits))
+        except Exception as e:
+            append(e)
+    return results
+
+
 def to_dict(message: PetCodeMessage) -> dict:
     """
     将消息序列化为字典
+
+    结果与 ``json_format.MessageToDict`` 相同，但使用针对 PetCodeMessage 的专用实现
     """
-    return json_format.MessageToDict(message)
+    return message_to_dict(message)
 
 
 def from_dict(data: dict) -> PetCodeMessage:
     """
     将字典反序列化为消息
+
+    结果与 ``json_format.ParseDict`` 相同，但使用针对 PetCodeMessage 的专用实现
     """
-    return json_format.ParseDict(data, PetCodeMessage())
+    return dict_to_message(data)
+
 
+from .stream import iter_binary_records, iter_decode
 
 __all__ = [
+    'Limits',
+    'canonicalize',
     'create_petcode_message',
+    'fingerprint',
     'from_base64',
+    'from_base64_many',
     'from_binary',
+    'from_binary_many',
     'from_dict',
+    'iter_binary_records',
+    'iter_decode',
     'to_base64',
+    'to_base64_many',
     'to_binary',
+    'to_binary_many',
     'to_dict',
 ]
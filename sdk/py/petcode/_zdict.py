@@ -0,0 +1,47 @@
+"""内置的预设字典
+
+由 `petcode.dictionary.train_dictionary` 训练得到（2048 字节）。该字典与编解码器 ID 2
+（`deflate-dict`）绑定，已发布的分享码依赖其内容，因此不能修改；
+需要更新字典时应当使用新的编解码器 ID 注册。
+"""
+
+import base64
+
+DEFAULT_ZDICT = base64.b64decode(
+    'EApYAXISIAcqBhD/IAgqBhD/IBYqBhD/BioBAyACKgwIVSAKKgwIVSANKgwIVSAWKgwIVQwQZBgV'
+    'EGQYIBBkGAoQZBgfEGQYIAwqBhD/AhABGggCEAEEEAEaCAQQAQEESgYSBAFKBgogAioGEP8gFCoM'
+    'CFUBSgoiDxBkGBAQZBgbEGQYAxABGggDEAEYEGQYERBkGAgQZBgQAhoLCgkaEGQYIAUqBhD/IhBk'
+    'GA4QZBghEGQYAQJKEhoQHBBkGCMQZBgZEGQYCxBkGBMQZBglEGQYDRBkGBQQZBggAyoMCFUgDioG'
+    'EP8XEGQYJBBkGB0QZBgmEGQYuAIQBQEQARoAIgECSgYSBBADGg4KCRAQCnISCA8QBUoaEQoPARAC'
+    'Gg4KARACGhEKEAMaEQoMGg4KDKgSchIDSgYKARABGgMQA0oKIhADGhQKDzBVMg84MkIJCPAQARoC'
+    'AwVCBQEEShIaEDhkQgkI8BACGhQKDxABGgsKCQEQAxoIARADARACGggBEAIOEAVKDRAFSgFKBhIF'
+    'QgUICEIFCBABGgIDAkIFEAEaAgQDQgUSchIIWAFiAwkQBUoQARoCAQNCBRABGgIECkIFIAcqCQj/'
+    'CxAFSgoQBUoMEAVKEAEaAgMEQgUDQgUICBAFSiASKgkI/1gBYgYBShIaEAEaAgEFQgUQARoCAwhC'
+    'BRABGgIDCUIFEAEaAgQEQgUQARoCBAhCBQRCBQgQARoCAgNCBRABGgIDAUIFAkIFCCAZKgkI/wZC'
+    'BQgQARoCAQhCBSACKgkI/yAWKgkI/8ACEAUgDCoJCP8QARoCAgRCBRABGgICCEIFEAEaAgUFQgW8'
+    'AhAFEAEaAgEHQgUQARoCAQlCBRABGgICBUIFIBEqCQj/ugIQBSAUKgkI/wlCBQgHQgUIEAEaAgIC'
+    'QgUQARoCAgZCBRABGgIFCEIFwgIQBcYCEAUgCioJCP/EAhAFxwIQBQpCBQgQARoCBQNCBRABGgIF'
+    'BkIFvQIQBSAGKgkI/7sCEAW+AhAFAUIFCL8CEAW5AhAFEAEaAgEKQgUQARoCAwdCBRABGgIEBUIF'
+    'EAEaAgUJQgXDAhAFAQJKCBoGxQIQBRABGhEKDBABGhQKDxABGgIBBkIFEAEaAgIBQgUQARoCBAZC'
+    'BRABGgIFAkIFEAEaAgECQgUQARoCBAdCBRABGgICB0IFEAEaAgQCQgXBAhAFEAEaAgMGQgUgBSoJ'
+    'CP8QARoCBQRCBRABGgIFB0IFA0oGEhABGgIBBEIFEAVKChABGgIDA0IFEAEaAgQBQgUgAyoJCP8Q'
+    'ARoCAQFCBRABGgIECUIFEAEaAgUKQgUQARoCAgpCBSAOKgkI/xABGgIFAUIFEAEaAgIJQgUBBEoI'
+    'GgYQARoCAwpCBRABGg4KCQE4lgEQEApYA0oSGgFKCBoIARABEBAKamQYHyASKmQYHyAHKmQYHyAZ'
+    'KmQYHyARKmQYHyAUKmQYHyAPKgkIZBgfIBMqCQgPchIIZBgfIAYqZBgfIAoqZBgfIBYqAUIJCGQY'
+    'HyABKgkIZBgfIAwq1e5tEGQYHyACKmQYHyALKgkIZBgfIA0qCQhkGB8gFyoJCMvubRBkGB8gGCoJ'
+    'CGQYHyAIKgkIZBgfIAkqCQhkGB8gBSpkGB8gECoJCMzubRBkGB8gAyoKchIIZBgfIAQqCQhkGB8g'
+    'FSoJCGQYHyAOKgNKCBqnEmoc/wEyDxAEGgECSgEaAgQQBUoSARoCAxAFQgcBGgIBARoCBRAEGgED'
+    'ShAEGgEFSgVCBwgBGgICEAQaAQFKAVIsChAEGgEEShAFSgYFMgIIDxoCCA8iAggFGgIIBSoCCAoq'
+    'AggFIgIICiICCA8qAggKMgIIChoCCBAEGgE4lgFCCAgBODJCCAgBOGRCCAgDUiwKBUoGCgQIBUoK'
+    'IggIEApYAWocCAEIBRAeEgQIBRASEgQIBxAUEgQCEAVKCBoECA8QClgBYg8QCmocCAFCCAgFchII'
+    'MgIID3ISMgIICnISMgIIBXISCA8QCmIDCBAQCmIGEGQYH2QYHyAFSgYSBAgECAcQHhIECCoGEP8B'
+    'MAQIBhASEgQIBUoSGhAIBAgGEBQSBAgSBAgFEBQSBBIECAcQEhIEEgQIBhAeEgQyAggPahwIAioC'
+    'CAUyAhICCA8aAhoCCA8iAiICCAUqAiICCAoqAhoCCAUiAjICCAVqHAgCGgIICiICEAUiCAjV7m0F'
+    'SggaBggiAggPKgIqAggPMgIICmocCAISGAoCKgIICjICEAUiCAjL7m1CCAhFEAEaAhAFIggIzO5t'
+    'QggIQxABGgI3EgQIBRBCCAh4EAEaAkIICEQQARoCNxIECAcQNxIECAYQQgkI8AEQARqoEmocCAFC'
+    'CAhGEAEaAgIQBSIICCMSBAgCEDcSIxIECAQQNxIjEgQIARA3EmocCAESGAoCCAoSAggKGgISBAgJ'
+    'EAoaBGocCAESGAoCCB4SAggFGgIJCP8BEP8BMP8BMgwSBAgKEAoaBBIECAgQChoEAhAFUiwKBggq'
+    'CQj/ASD/ATD/ATIQEhoECBAQCioJCP8BGP8BKP8BMhASGgQIDxAKKgwIVRBVGFUgVShVMFUyDBwI'
+    'ARIYCgIIFBICCGocCAESGAoCEAoaBAgLEDcaBAgNEBIaBBAKGgQIDBA3GgQIDhASGgQGCCMQIxgj'
+    'EgQIAxA3EgQIUiwKBggjECMYIxIEahwIAhIYCgIQBRICEAUaAhAFIgIQBSoCEAUyAhAFchI='
+)
@@ -0,0 +1,316 @@
+"""异步编解码接口
+
+在协程中直接调用 `petcode.from_base64` 等函数时，gzip 解压和 protobuf 解析
+会阻塞事件循环。本模块将这些操作提交到线程池或进程池中执行：
+
+- 同时提交到执行器的任务数不超过 ``max_pending``，超出的调用在事件循环中等待，
+  大量请求同时到达时不会在执行器中无限堆积
+- 批量函数按 ``chunk_size`` 分块提交，每块占用一个名额；同时最多创建 ``max_pending``
+  个分块任务，输入按需读取，惰性的可迭代对象不会被一次性读入内存
+- 调用方被取消时，尚未开始执行的任务会被取消；已经开始执行的任务无法中断，
+  其名额会在执行结束后才释放
+
+线程池适合单条消息的编解码（开销小，zlib 在解压时会释放 GIL）；
+大批量解码需要利用多核时可以使用进程池（``use_processes=True``）。
+
+Example:
+    >>> from petcode import aio
+    >>> message = await aio.from_base64(code)
+    >>> results = await aio.from_base64_many(codes)
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TypeVar
+import weakref
+
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+# 本模块的异步函数与同步版本同名，导入时加上前缀
+from . import from_base64 as _from_base64
+from . import from_base64_many as _from_base64_many
+from . import from_binary as _from_binary
+from . import from_binary_many as _from_binary_many
+from . import to_base64 as _to_base64
+from . import to_base64_many as _to_base64_many
+from . import to_binary as _to_binary
+from . import to_binary_many as _to_binary_many
+from .parallel import chunked
+from .validate import Limits
+
+T = TypeVar('T')
+
+DEFAULT_MAX_PENDING = 64
+DEFAULT_CHUNK_SIZE = 256
+
+
+def _release_soon(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore):
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # 事件循环已关闭，信号量不会再被使用
+        pass
+
+
+class AsyncPetCode:
+    """将编解码操作提交到执行器的异步接口
+
+    Args:
+        executor: 使用已有的执行器，此时不会在 `close` 时关闭它；
+            省略时根据 ``use_processes`` 创建线程池或进程池
+        max_workers: 创建执行器时的工作线程/进程数
+        use_processes: 是否创建进程池
+        max_pending: 同时提交到执行器的最大任务数（背压上限）
+        chunk_size: 批量函数每个任务包含的条目数
+
+    Example:
+        >>> async with AsyncPetCode(use_processes=True, max_workers=4) as coder:
+        ...     results = await coder.from_base64_many(codes)
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        *,
+        max_workers: int | None = None,
+        use_processes: bool = False,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        if max_pending < 1:
+            raise ValueError(f'max_pending must be positive, got {max_pending}')
+        if chunk_size < 1:
+            raise ValueError(f'chunk_size must be positive, got {chunk_size}')
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self._owns_executor = executor is None
+        if executor is not None:
+            self._executor = executor
+        elif use_processes:
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix='petcode'
+            )
+        # asyncio.Semaphore 只能在一个事件循环中使用，每个事件循环单独计数
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    def close(self, *, wait: bool = True, cancel_futures: bool = False):
+        """关闭自行创建的执行器
+
+        Args:
+            wait: 是否等待已提交的任务执行完毕
+            cancel_futures: 是否取消尚未开始执行的任务
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """在执行器中调用 ``func``，受 ``max_pending`` 限制"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        await semaphore.acquire()
+        try:
+            future: Future = self._executor.submit(func, *args, **kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+        # 名额在任务真正结束（完成或被取消）时释放，而不是在调用方被取消时
+        future.add_done_callback(lambda _: _release_soon(loop, semaphore))
+        return await asyncio.wrap_future(future)
+
+    async def _map_chunks(self, func: Callable[[list], list], items: Iterable) -> list:
+        results = []
+        pending: deque[asyncio.Future] = deque()
+        try:
+            for chunk in chunked(items, self.chunk_size):
+                if len(pending) >= self.max_pending:
+                    results.extend(await pending.popleft())
+                pending.append(asyncio.ensure_future(self.run(func, chunk)))
+            while pending:
+                results.extend(await pending.popleft())
+        finally:
+            # 出错或被取消时，取消其余的分块任务
+            for task in pending:
+                task.cancel()
+        return results
+
+    async def to_binary(self, message: PetCodeMessage, *, codec: str = 'gzip') -> bytes:
+        return await self.run(_to_binary, message, codec=codec)
+
+    async def from_binary(
+        self, binary: bytes, *, limits: Limits | None = None
+    ) -> PetCodeMessage:
+        return await self.run(_from_binary, binary, limits=limits)
+
+    async def to_base64(self, message: PetCodeMessage, *, codec: str = 'gzip') -> str:
+        return await self.run(_to_base64, message, codec=codec)
+
+    async def from_base64(
+        self, base64_str: str, *, limits: Limits | None = None
+    ) -> PetCodeMessage:
+        return await self.run(_from_base64, base64_str, limits=limits)
+
+    async def to_binary_many(
+        self, messages: Iterable[PetCodeMessage], *, codec: str = 'gzip'
+    ) -> list[bytes]:
+        return await self._map_chunks(
+            _BatchCall(_to_binary_many, codec=codec), messages
+        )
+
+    async def from_binary_many(
+        self, binaries: Iterable[bytes], *, limits: Limits | None = None
+    ) -> list[PetCodeMessage | Exception]:
+        return await self._map_chunks(
+            _BatchCall(_from_binary_many, limits=limits), binaries
+        )
+
+    async def to_base64_many(
+        self, messages: Iterable[PetCodeMessage], *, codec: str = 'gzip'
+    ) -> list[str]:
+        return await self._map_chunks(
+            _BatchCall(_to_base64_many, codec=codec), messages
+        )
+
+    async def from_base64_many(
+        self, base64_strs: Iterable[str], *, limits: Limits | None = None
+    ) -> list[PetCodeMessage | Exception]:
+        return await self._map_chunks(
+            _BatchCall(_from_base64_many, limits=limits), base64_strs
+        )
+
+
+class _BatchCall:
+    """可以被 pickle 的 ``functools.partial(func, **kwargs)``，用于进程池"""
+
+    def __init__(self, func: Callable, **kwargs):
+        self.func = func
+        self.kwargs = kwargs
+
+    def __call__(self, items: list) -> list:
+        return self.func(items, **self.kwargs)
+
+
+_default: AsyncPetCode | None = None
+
+
+def get_default() -> AsyncPetCode:
+    """返回模块级函数使用的共享实例，首次调用时以默认参数创建线程池"""
+    global _default
+    if _default is None:
+        _default = AsyncPetCode()
+    return _default
+
+
+def configure(
+    executor: Executor | None = None,
+    *,
+    max_workers: int | None = None,
+    use_processes: bool = False,
+    max_pending: int = DEFAULT_MAX_PENDING,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncPetCode:
+    """替换模块级函数使用的共享实例，并关闭之前自行创建的执行器
+
+    参数与 `AsyncPetCode` 相同，通常在应用启动时调用一次。
+    """
+    global _default
+    previous = _default
+    _default = AsyncPetCode(
+        executor,
+        max_workers=max_workers,
+        use_processes=use_processes,
+        max_pending=max_pending,
+        chunk_size=chunk_size,
+    )
+    if previous is not None:
+        previous.close(wait=False)
+    return _default
+
+
+def shutdown(*, wait: bool = True):
+    """关闭共享实例，之后再调用模块级函数时会重新创建"""
+    global _default
+    if _default is not None:
+        _default.close(wait=wait)
+        _default = None
+
+
+async def to_binary(message: PetCodeMessage, *, codec: str = 'gzip') -> bytes:
+    """异步版本的 `petcode.to_binary`"""
+    return await get_default().to_binary(message, codec=codec)
+
+
+async def from_binary(binary: bytes, *, limits: Limits | None = None) -> PetCodeMessage:
+    """异步版本的 `petcode.from_binary`"""
+    return await get_default().from_binary(binary, limits=limits)
+
+
+async def to_base64(message: PetCodeMessage, *, codec: str = 'gzip') -> str:
+    """异步版本的 `petcode.to_base64`"""
+    return await get_default().to_base64(message, codec=codec)
+
+
+async def from_base64(
+    base64_str: str, *, limits: Limits | None = None
+) -> PetCodeMessage:
+    """异步版本的 `petcode.from_base64`"""
+    return await get_default().from_base64(base64_str, limits=limits)
+
+
+async def to_binary_many(
+    messages: Iterable[PetCodeMessage], *, codec: str = 'gzip'
+) -> list[bytes]:
+    """异步版本的 `petcode.to_binary_many`"""
+    return await get_default().to_binary_many(messages, codec=codec)
+
+
+async def from_binary_many(
+    binaries: Iterable[bytes], *, limits: Limits | None = None
+) -> list[PetCodeMessage | Exception]:
+    """异步版本的 `petcode.from_binary_many`"""
+    return await get_default().from_binary_many(binaries, limits=limits)
+
+
+async def to_base64_many(
+    messages: Iterable[PetCodeMessage], *, codec: str = 'gzip'
+) -> list[str]:
+    """异步版本的 `petcode.to_base64_many`"""
+    return await get_default().to_base64_many(messages, codec=codec)
+
+
+async def from_base64_many(
+    base64_strs: Iterable[str], *, limits: Limits | None = None
+) -> list[PetCodeMessage | Exception]:
+    """异步版本的 `petcode.from_base64_many`"""
+    return await get_default().from_base64_many(base64_strs, limits=limits)
+
+
+__all__ = [
+    'DEFAULT_CHUNK_SIZE',
+    'DEFAULT_MAX_PENDING',
+    'AsyncPetCode',
+    'configure',
+    'from_base64',
+    'from_base64_many',
+    'from_binary',
+    'from_binary_many',
+    'get_default',
+    'shutdown',
+    'to_base64',
+    'to_base64_many',
+    'to_binary',
+    'to_binary_many',
+]
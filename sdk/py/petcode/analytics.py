@@ -0,0 +1,218 @@
+"""将大量分享码解码为 NumPy 列式数据
+
+用于统计精灵、性格、技能、学习力分配等的使用率。每只精灵对应一行，
+定长字段为一维/二维数组，变长字段（技能、特效、道具、刻印）使用
+“偏移量 + 值”的形式存储，第 ``i`` 行的数据为 ``values[offsets[i]:offsets[i + 1]]``。
+
+需要安装可选依赖：``pip install petcode[analytics]``
+"""
+
+from array import array
+from collections.abc import Iterable
+from typing import Literal, NamedTuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        'petcode.analytics requires numpy, install it with '
+        '`pip install petcode[analytics]`'
+    ) from e
+
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+from . import from_base64_many, from_binary_many
+from .create_and_read import read_mintmark
+
+
+class RaggedArray(NamedTuple):
+    """变长数据列
+
+    Attributes:
+        offsets: 长度为行数 + 1 的 int64 数组
+        values: 所有行的数据按顺序拼接后的数组
+    """
+
+    offsets: np.ndarray
+    values: np.ndarray
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def row(self, index: int) -> np.ndarray:
+        return self.values[self.offsets[index] : self.offsets[index + 1]]
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def row_index(self) -> np.ndarray:
+        """每个值所属的行号，便于与其他列对齐后进行分组统计"""
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.lengths())
+
+
+class PetColumns(NamedTuple):
+    """精灵信息的列式数据，每只精灵一行
+
+    Attributes:
+        message_index: 该精灵所属的消息在输入中的位置
+        id/level/dv/nature/extra_hp: int32 数组
+        evs/ability_total: 形状为 ``(n, 6)`` 的 int32 数组，
+            列顺序为 hp/attack/defense/special_attack/special_defense/speed
+        skin_id: int32 数组，未设置时为 0
+        is_awaken: bool 数组
+        skills/pet_items: int32 变长列
+        effects: 变长列，值为形状 ``(m, 2)`` 的 int32 数组，列为 id/status
+        mintmarks: 刻印 ID 的 int32 变长列
+    """
+
+    message_index: np.ndarray
+    id: np.ndarray
+    level: np.ndarray
+    dv: np.ndarray
+    nature: np.ndarray
+    extra_hp: np.ndarray
+    evs: np.ndarray
+    ability_total: np.ndarray
+    skin_id: np.ndarray
+    is_awaken: np.ndarray
+    skills: RaggedArray
+    effects: RaggedArray
+    pet_items: RaggedArray
+    mintmarks: RaggedArray
+
+    def __len__(self):
+        return len(self.id)
+
+
+class _RaggedBuilder:
+    __slots__ = ('offsets', 'values')
+
+    def __init__(self):
+        self.offsets = array('q', [0])
+        self.values = array('i')
+
+    def build(self, width: int = 1) -> RaggedArray:
+        offsets = np.frombuffer(self.offsets, dtype=np.int64).copy()
+        values = np.frombuffer(self.values, dtype=np.int32).copy()
+        if width > 1:
+            values = values.reshape(-1, width)
+        return RaggedArray(offsets, values)
+
+
+def _ints(buffer: array, dtype=np.int32) -> np.ndarray:
+    return np.frombuffer(buffer, dtype=dtype).copy()
+
+
+def _build_columns(indexed: Iterable[tuple[int, PetCodeMessage]]) -> PetColumns:
+    message_index = array('i')
+    ids, levels, dvs, natures, extra_hps = (array('i') for _ in range(5))
+    evs, ability_total, skin_ids = array('i'), array('i'), array('i')
+    is_awaken = array('b')
+    skills, effects, pet_items, mintmarks = (_RaggedBuilder() for _ in range(4))
+
+    for index, message in indexed:
+        for pet in message.pets:
+            message_index.append(index)
+            ids.append(pet.id)
+            levels.append(pet.level)
+            dvs.append(pet.dv)
+            natures.append(pet.nature)
+            extra_hps.append(pet.extra_hp)
+            for target, value in ((evs, pet.evs), (ability_total, pet.ability_total)):
+                target.extend(
+                    (
+                        value.hp,
+                        value.attack,
+                        value.defense,
+                        value.special_attack,
+                        value.special_defense,
+                        value.speed,
+                    )
+                )
+            skin_ids.append(pet.skin_id)
+            is_awaken.append(pet.is_awaken)
+
+            skills.values.extend(pet.skills)
+            skills.offsets.append(len(skills.values))
+            pet_items.values.extend(pet.pet_items)
+            pet_items.offsets.append(len(pet_items.values))
+            for effect in pet.effects:
+                effects.values.append(effect.id)
+                effects.values.append(effect.status)
+            effects.offsets.append(len(effects.values) // 2)
+            for mintmark in pet.mintmarks:
+                # 未设置类型的刻印记为 0，避免单条异常数据中断整个批次
+                if mintmark.WhichOneof('mintmark') is None:
+                    mintmarks.values.append(0)
+                else:
+                    mintmarks.values.append(read_mintmark(mintmark).id)
+            mintmarks.offsets.append(len(mintmarks.values))
+
+    return PetColumns(
+        message_index=_ints(message_index),
+        id=_ints(ids),
+        level=_ints(levels),
+        dv=_ints(dvs),
+        nature=_ints(natures),
+        extra_hp=_ints(extra_hps),
+        evs=_ints(evs).reshape(-1, 6),
+        ability_total=_ints(ability_total).reshape(-1, 6),
+        skin_id=_ints(skin_ids),
+        is_awaken=_ints(is_awaken, dtype=np.int8).astype(bool),
+        skills=skills.build(),
+        effects=effects.build(width=2),
+        pet_items=pet_items.build(),
+        mintmarks=mintmarks.build(),
+    )
+
+
+def messages_to_columns(messages: Iterable[PetCodeMessage]) -> PetColumns:
+    """将消息转换为列式数据，消息在输入中的位置记录在 ``message_index`` 中"""
+    return _build_columns(enumerate(messages))
+
+
+def decode_columns(
+    codes: Iterable[str] | Iterable[bytes],
+    *,
+    encoding: Literal['base64', 'binary'] = 'base64',
+) -> tuple[PetColumns, list[tuple[int, Exception]]]:
+    """批量解码分享码并转换为列式数据
+
+    Args:
+        codes: base64 字符串或二进制数据
+        encoding: 输入数据的编码方式
+
+    Returns:
+        ``(columns, errors)``；``columns.message_index`` 指向输入中的位置，
+        ``errors`` 为解码失败的 ``(位置, 异常)`` 列表，这些输入不会产生任何行
+
+    Example:
+        >>> columns, errors = decode_columns(codes)
+        >>> ids, counts = np.unique(columns.id, return_counts=True)
+    """
+    if encoding == 'base64':
+        results = from_base64_many(codes)  # type: ignore[arg-type]
+    elif encoding == 'binary':
+        results = from_binary_many(codes)  # type: ignore[arg-type]
+    else:
+        raise ValueError(f'Unknown encoding: {encoding}')
+
+    errors = [
+        (index, result)
+        for index, result in enumerate(results)
+        if isinstance(result, Exception)
+    ]
+    columns = _build_columns(
+        (index, result)
+        for index, result in enumerate(results)
+        if not isinstance(result, Exception)
+    )
+    return columns, errors
+
+
+__all__ = [
+    'PetColumns',
+    'RaggedArray',
+    'decode_columns',
+    'messages_to_columns',
+]
@@ -0,0 +1,444 @@
+"""PetCode 消息的归档文件格式
+
+大量消息分别用 `to_binary` 保存时，每条数据都带有独立的压缩头尾，且只能顺序读取。
+归档文件把消息按长度前缀（varint，与 protobuf 的 delimited 格式相同）依次写入，
+每 ``records_per_block`` 条压缩为一个数据块，文件末尾的索引记录每个块的位置：
+
+    +--------+---------+-----+---------+-----------------+---------+
+    | 文件头  | 数据块 0 | ... | 数据块 n | 索引（每块 12 字节）| 文件尾   |
+    +--------+---------+-----+---------+-----------------+---------+
+
+- 文件头（8 字节）：魔数 ``PCAR``、格式版本（1 字节）和 3 字节保留位
+- 数据块：`codec.compress` 的结果，带有编解码器头部，不同数据块的编解码器可以不同
+- 索引：每个数据块的偏移量（uint64）和长度（uint32），小端序
+- 文件尾（32 字节）：索引偏移量（uint64）、记录数（uint64）、块数、每块记录数、
+  索引的 CRC32（均为 uint32）和魔数 ``PCAR``
+
+除最后一块外每块的记录数相同，因此第 N 条记录所在的块和索引项位置都可以直接算出。
+数据块按索引定位，不要求连续：追加写入时新的数据块、索引和文件尾写在原有文件尾之后，
+原有的索引和文件尾在写入新的文件尾之前一直有效，中断时可以用 `recover_archive` 恢复。
+"""
+
+from collections.abc import Iterable, Iterator
+import mmap
+import os
+import struct
+import zlib
+
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+from .codec import BinaryData, compress, decompress_record, get_codec
+
+MAGIC = b'PCAR'
+ARCHIVE_VERSION = 1
+DEFAULT_RECORDS_PER_BLOCK = 256
+DEFAULT_CODEC = 'deflate'
+
+_HEADER = struct.Struct('<4sB3x')
+_INDEX_ENTRY = struct.Struct('<QI')
+_TRAILER = struct.Struct('<QQIII4s')
+
+
+class ArchiveFormatError(ValueError):
+    """数据不是有效的归档文件，或归档文件已损坏"""
+
+
+def _encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _record_spans(data: bytes, count: int) -> list[tuple[int, int]]:
+    """返回块内每条记录（不含长度前缀）的 ``(起始位置, 结束位置)``"""
+    spans = []
+    position = 0
+    try:
+        for _ in range(count):
+            length = shift = 0
+            while True:
+                byte = data[position]
+                position += 1
+                length |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            spans.append((position, position + length))
+            position += length
+    except IndexError:
+        raise ArchiveFormatError('Truncated record in block') from None
+    if position != len(data):
+        raise ArchiveFormatError('Block size does not match its records')
+    return spans
+
+
+class _Trailer:
+    __slots__ = (
+        'block_count',
+        'index_crc',
+        'index_offset',
+        'record_count',
+        'records_per_block',
+    )
+
+    def __init__(self, buffer: memoryview, size: int):
+        if size < _HEADER.size + _TRAILER.size:
+            raise ArchiveFormatError('Data is too short to be an archive')
+        magic, version = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ArchiveFormatError('Not a PetCode archive')
+        if version != ARCHIVE_VERSION:
+            raise ArchiveFormatError(f'Unsupported archive version: {version}')
+        (
+            self.index_offset,
+            self.record_count,
+            self.block_count,
+            self.records_per_block,
+            self.index_crc,
+            magic,
+        ) = _TRAILER.unpack_from(buffer, size - _TRAILER.size)
+        if magic != MAGIC:
+            raise ArchiveFormatError('Missing archive trailer')
+        index_end = self.index_offset + self.block_count * _INDEX_ENTRY.size
+        if (
+            self.records_per_block < 1
+            or index_end != size - _TRAILER.size
+            or self.index_offset < _HEADER.size
+            or not (
+                (self.block_count - 1) * self.records_per_block
+                < self.record_count
+                <= self.block_count * self.records_per_block
+            )
+        ):
+            raise ArchiveFormatError('Inconsistent archive trailer')
+        with buffer[self.index_offset : index_end] as index:
+            if zlib.crc32(index) != self.index_crc:
+                raise ArchiveFormatError('Archive index checksum mismatch')
+
+
+class ArchiveReader:
+    """归档文件的只读访问，按需解压数据块
+
+    文件通过 ``mmap`` 映射，只有被访问的数据块会被读取和解压；最近访问的数据块会被缓存，
+    顺序访问同一块内的记录时不会重复解压。
+
+    Args:
+        source: 文件路径，或 ``bytes``/``memoryview``/``mmap`` 等缓冲区对象
+
+    Raises:
+        ArchiveFormatError: 数据不是有效的归档文件
+
+    Example:
+        >>> with ArchiveReader('pets.pcar') as archive:
+        ...     print(len(archive), archive[12345].pets[0].id)
+        ...     for message in archive:
+        ...         ...
+    """
+
+    def __init__(self, source: BinaryData | str | os.PathLike):
+        self._file = None
+        self._mmap = None
+        if isinstance(source, (str, os.PathLike)):
+            self._file = open(source, 'rb')
+            try:
+                if os.fstat(self._file.fileno()).st_size == 0:
+                    raise ArchiveFormatError('Data is too short to be an archive')
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except BaseException:
+                self._file.close()
+                raise
+            source = self._mmap
+        self._view = memoryview(source)
+        self._cached: tuple[int, memoryview, list[tuple[int, int]]] | None = None
+        try:
+            trailer = _Trailer(self._view, len(self._view))
+        except BaseException:
+            self.close()
+            raise
+        self._index_offset = trailer.index_offset
+        self.record_count = trailer.record_count
+        self.block_count = trailer.block_count
+        self.records_per_block = trailer.records_per_block
+
+    def close(self):
+        self._cached = None
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def _entry(self, block: int) -> tuple[int, int]:
+        """返回数据块的 ``(偏移量, 长度)``"""
+        return _INDEX_ENTRY.unpack_from(
+            self._view, self._index_offset + block * _INDEX_ENTRY.size
+        )
+
+    def _block(self, block: int) -> tuple[memoryview, list[tuple[int, int]]]:
+        if self._cached is not None and self._cached[0] == block:
+            return self._cached[1], self._cached[2]
+        offset, length = self._entry(block)
+        if offset < _HEADER.size or offset + length > self._index_offset:
+            raise ArchiveFormatError(f'Invalid index entry for block {block}')
+        data, end = decompress_record(self._view, offset)
+        if end != offset + length:
+            raise ArchiveFormatError(f'Block {block} size does not match the index')
+        count = min(
+            self.records_per_block,
+            self.record_count - block * self.records_per_block,
+        )
+        spans = _record_spans(data, count)
+        view = memoryview(data)
+        self._cached = (block, view, spans)
+        return view, spans
+
+    def __getitem__(self, index: int) -> PetCodeMessage:
+        """读取第 ``index`` 条记录，支持负数索引"""
+        if index < 0:
+            index += self.record_count
+        if not 0 <= index < self.record_count:
+            raise IndexError('archive index out of range')
+        block, position = divmod(index, self.records_per_block)
+        data, spans = self._block(block)
+        start, end = spans[position]
+        return PetCodeMessage.FromString(data[start:end])
+
+    def __iter__(self) -> Iterator[PetCodeMessage]:
+        return self.iter_records()
+
+    def iter_records(
+        self, start: int = 0, stop: int | None = None
+    ) -> Iterator[PetCodeMessage]:
+        """按顺序惰性读取 ``[start, stop)`` 范围内的记录"""
+        stop = self.record_count if stop is None else min(stop, self.record_count)
+        parse = PetCodeMessage.FromString
+        index = max(start, 0)
+        while index < stop:
+            block, position = divmod(index, self.records_per_block)
+            data, spans = self._block(block)
+            selected = spans[position : position + stop - index]
+            for begin, end in selected:
+                yield parse(data[begin:end])
+            index += len(selected)
+
+
+class ArchiveWriter:
+    """追加写入归档文件
+
+    记录先缓存在内存中，每满 ``records_per_block`` 条压缩写入一个数据块；
+    `close` 时写入最后一个数据块、索引和文件尾。以 ``'w'`` 模式写入时，
+    在 `close` 之前文件不是有效的归档文件。
+
+    以 ``'a'`` 模式打开已有的归档文件时沿用原有的每块记录数，不修改已有的数据：
+    新的数据块写在文件末尾，`close` 时写入新的索引和文件尾。最后一个数据块未写满时，
+    其中的记录会和新的记录一起重新写入，使之后的记录仍然可以直接定位。
+    在 `close` 之前中断时，可以用 `recover_archive` 恢复到追加之前的状态。
+    每次追加会在文件中留下原有的索引和文件尾（以及未写满的最后一块）作为无用数据。
+
+    Args:
+        path: 文件路径
+        mode: ``'w'`` 创建或覆盖文件，``'a'`` 在已有的归档文件后追加
+            （文件不存在时创建）
+        codec: 数据块使用的编解码器，需要自带结束标记（gzip、deflate 等），
+            不能为 ``none``
+        records_per_block: 每个数据块的记录数，较大的值压缩率更高，
+            但随机读取时需要解压的数据更多；追加时默认沿用原有的值
+
+    Example:
+        >>> with ArchiveWriter('pets.pcar') as writer:
+        ...     writer.write_many(messages)
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        mode: str = 'w',
+        *,
+        codec: str = DEFAULT_CODEC,
+        records_per_block: int | None = None,
+    ):
+        if mode not in ('w', 'a'):
+            raise ValueError(f"mode must be 'w' or 'a', got {mode!r}")
+        if records_per_block is not None and records_per_block < 1:
+            raise ValueError(
+                f'records_per_block must be positive, got {records_per_block}'
+            )
+        get_codec(codec).decompressobj()
+        self.codec = codec
+        self._blocks: list[tuple[int, int]] = []
+        self._pending: list[bytes] = []
+        self._count = 0
+        # 追加模式下没有写入任何记录时，关闭时不修改文件
+        self._modified = True
+
+        if mode == 'a' and os.path.exists(path) and os.path.getsize(path) > 0:
+            self.records_per_block = self._load(path, records_per_block)
+            self._modified = False
+            self._file = open(path, 'ab')
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(_HEADER.pack(MAGIC, ARCHIVE_VERSION))
+            self.records_per_block = records_per_block or DEFAULT_RECORDS_PER_BLOCK
+        self._position = self._file.tell()
+
+    def _load(self, path: str | os.PathLike, records_per_block: int | None) -> int:
+        """读取已有归档的索引，未写满的最后一块中的记录放回待写入的记录中"""
+        with ArchiveReader(path) as reader:
+            if records_per_block not in (None, reader.records_per_block):
+                raise ValueError(
+                    f'records_per_block must match the archive '
+                    f'({reader.records_per_block}), got {records_per_block}'
+                )
+            self._blocks = [reader._entry(i) for i in range(reader.block_count)]
+            self._count = len(reader)
+            if self._count % reader.records_per_block:
+                data, spans = reader._block(reader.block_count - 1)
+                self._pending = [
+                    _encode_varint(stop - start) + data[start:stop]
+                    for start, stop in spans
+                ]
+                self._count -= len(self._pending)
+                self._blocks.pop()
+            return reader.records_per_block
+
+    def __len__(self) -> int:
+        return self._count + len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write(self, message: PetCodeMessage) -> int:
+        """写入一条消息，返回其在归档中的序号"""
+        data = message.SerializeToString()
+        self._modified = True
+        self._pending.append(_encode_varint(len(data)) + data)
+        if len(self._pending) >= self.records_per_block:
+            self._flush_block()
+        return len(self) - 1
+
+    def write_many(self, messages: Iterable[PetCodeMessage]) -> int:
+        """写入多条消息，返回写入的条数"""
+        written = 0
+        for message in messages:
+            self.write(message)
+            written += 1
+        return written
+
+    def _flush_block(self):
+        if not self._pending:
+            return
+        block = compress(b''.join(self._pending), self.codec)
+        self._file.write(block)
+        self._blocks.append((self._position, len(block)))
+        self._position += len(block)
+        self._count += len(self._pending)
+        self._pending.clear()
+
+    def close(self):
+        """写入剩余的记录、索引和文件尾，并关闭文件"""
+        if self._file.closed:
+            return
+        try:
+            if not self._modified:
+                return
+            self._flush_block()
+            index = b''.join(_INDEX_ENTRY.pack(*entry) for entry in self._blocks)
+            self._file.write(index)
+            self._file.write(
+                _TRAILER.pack(
+                    self._position,
+                    self._count,
+                    len(self._blocks),
+                    self.records_per_block,
+                    zlib.crc32(index),
+                    MAGIC,
+                )
+            )
+        finally:
+            self._file.close()
+
+
+def _find_trailer(buffer) -> int:
+    """从后向前查找最后一个有效的文件尾，返回其结束位置"""
+    view = memoryview(buffer)
+    try:
+        end = len(view)
+        while (position := buffer.rfind(MAGIC, 0, end)) > 0:
+            end = position + len(MAGIC) - 1
+            try:
+                _Trailer(view, position + len(MAGIC))
+            except ArchiveFormatError:
+                continue
+            return position + len(MAGIC)
+    finally:
+        view.release()
+    raise ArchiveFormatError('No valid archive trailer found')
+
+
+def recover_archive(path: str | os.PathLike) -> int:
+    """将未正常关闭的归档文件恢复到最后一次写入文件尾时的状态
+
+    以 ``'a'`` 模式追加的写入器在 `close` 之前中断时，原有的索引和文件尾仍然完整。
+    从文件末尾向前查找最后一个有效的文件尾（索引的 CRC32 也需要匹配），
+    并截断之后的数据。文件已经是有效的归档文件时不做修改。
+
+    Returns:
+        恢复后的记录数
+
+    Raises:
+        ArchiveFormatError: 找不到有效的文件尾，例如以 ``'w'`` 模式创建后从未关闭
+    """
+    with open(path, 'r+b') as file:
+        if os.fstat(file.fileno()).st_size < _HEADER.size + _TRAILER.size:
+            raise ArchiveFormatError('Data is too short to be an archive')
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end = _find_trailer(mapped)
+        file.truncate(end)
+    with ArchiveReader(path) as reader:
+        return len(reader)
+
+
+def write_archive(
+    path: str | os.PathLike,
+    messages: Iterable[PetCodeMessage],
+    *,
+    codec: str = DEFAULT_CODEC,
+    records_per_block: int = DEFAULT_RECORDS_PER_BLOCK,
+) -> int:
+    """将消息写入新的归档文件，返回写入的条数"""
+    with ArchiveWriter(
+        path, codec=codec, records_per_block=records_per_block
+    ) as writer:
+        return writer.write_many(messages)
+
+
+__all__ = [
+    'ARCHIVE_VERSION',
+    'DEFAULT_CODEC',
+    'DEFAULT_RECORDS_PER_BLOCK',
+    'MAGIC',
+    'ArchiveFormatError',
+    'ArchiveReader',
+    'ArchiveWriter',
+    'recover_archive',
+    'write_archive',
+]
@@ -0,0 +1,161 @@
+"""解码结果的 LRU 缓存
+
+热门分享码会被反复解码。`DecodeCache` 以分享码本身为键缓存解码后的消息，
+命中时跳过 base64 解码、解压和解析。缓存中的消息不会直接交给调用方，
+每次读取都会返回一份副本，调用方修改返回值不会影响缓存。
+"""
+
+from collections import OrderedDict
+import threading
+from typing import NamedTuple
+
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+from . import from_base64, from_binary
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class CacheStats(NamedTuple):
+    """缓存统计信息
+
+    Attributes:
+        hits: 命中次数
+        misses: 未命中次数
+        evictions: 因超出限制被淘汰的条目数
+        entries: 当前条目数
+        bytes: 当前缓存消息的序列化总字节数
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class DecodeCache:
+    """有大小上限的解码结果 LRU 缓存（线程安全）
+
+    Args:
+        max_entries: 最多缓存的条目数
+        max_bytes: 缓存消息的序列化总字节数上限，单条超过该值的消息不会被缓存
+
+    Example:
+        >>> cache = DecodeCache(max_entries=4096)
+        >>> message = cache.from_base64(code)
+        >>> cache.stats().hit_rate
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        if max_entries < 1:
+            raise ValueError(f'max_entries must be positive, got {max_entries}')
+        if max_bytes < 1:
+            raise ValueError(f'max_bytes must be positive, got {max_bytes}')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str | bytes, tuple[PetCodeMessage, int]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def from_base64(self, base64_str: str) -> PetCodeMessage:
+        """带缓存的 `petcode.from_base64`"""
+        return self._get(base64_str, from_base64)
+
+    def from_binary(self, binary: bytes) -> PetCodeMessage:
+        """带缓存的 `petcode.from_binary`"""
+        return self._get(bytes(binary), from_binary)
+
+    def _get(self, key, decode) -> PetCodeMessage:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+        if entry is not None:
+            # 缓存中的消息不会被修改，可以在锁外复制
+            return _copy(entry[0])
+
+        # 解码在锁外进行，失败时异常直接抛出且不会被缓存
+        message = decode(key)
+        size = message.ByteSize()
+        if size <= self.max_bytes:
+            with self._lock:
+                self._put(key, message, size)
+        return _copy(message)
+
+    def _put(self, key, message: PetCodeMessage, size: int):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (message, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._evictions += 1
+
+    def invalidate(self, key: str | bytes) -> bool:
+        """移除指定分享码的缓存，返回该条目是否存在"""
+        with self._lock:
+            entry = self._entries.pop(_normalize_key(key), None)
+            if entry is None:
+                return False
+            self._bytes -= entry[1]
+            return True
+
+    def clear(self):
+        """清空缓存（统计计数保留）"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: str | bytes):
+        return _normalize_key(key) in self._entries
+
+
+def _normalize_key(key: str | bytes) -> str | bytes:
+    # 与 from_binary 一致，bytearray、memoryview 等按内容转换为 bytes
+    return key if isinstance(key, str) else bytes(key)
+
+
+def _copy(message: PetCodeMessage) -> PetCodeMessage:
+    copied = PetCodeMessage()
+    copied.CopyFrom(message)
+    return copied
+
+
+__all__ = [
+    'CacheStats',
+    'DecodeCache',
+]
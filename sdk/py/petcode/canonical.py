@@ -0,0 +1,141 @@
+"""消息的规范形式与内容指纹
+
+同一套配置由不同的导出工具生成时，gzip 输出和部分重复字段的顺序可能不同，
+分享码因此不同。`canonicalize` 将消息转换为规范形式：
+
+- 顺序无关的重复字段按元素排序：`PetCodeMessage.battle_fires`、
+  `PetInfo.effects`、`PetInfo.pet_items` 和 `PetInfo.ability_bonus`
+- 值为默认值的 optional 字段，以及内容为空的子消息被清除
+  （oneof 中的字段除外，例如 id 为 0 的技能刻印仍然保留刻印类型）
+- 未知字段被丢弃
+
+规范形式使用确定性序列化（``deterministic=True``）得到 `canonical_bytes`，
+`fingerprint` 为其 BLAKE2b 摘要，可以直接作为 dict/set 的键用于去重。
+"""
+
+from functools import cache
+import hashlib
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.message import Message
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+# 顺序无关的重复字段
+UNORDERED_FIELDS: dict[str, frozenset[str]] = {
+    'seerbp.petcode.v1.PetCodeMessage': frozenset({'battle_fires'}),
+    'seerbp.petcode.v1.PetInfo': frozenset({'effects', 'pet_items', 'ability_bonus'}),
+}
+
+_MESSAGE = 0
+_REPEATED_MESSAGE = 1
+_OPTIONAL_SCALAR = 2
+_REPEATED_SCALAR = 3
+
+
+def _in_real_oneof(field: FieldDescriptor) -> bool:
+    oneof = field.containing_oneof
+    if oneof is None:
+        return False
+    # proto3 optional 字段生成的合成 oneof 只包含该字段，名称以下划线开头
+    return not (len(oneof.fields) == 1 and oneof.name.startswith('_'))
+
+
+@cache
+def _plan(descriptor: Descriptor) -> tuple[tuple[str, int, bool, bool], ...]:
+    """返回需要处理的字段 ``(名称, 类型, 可清除或需要排序, 子消息需要处理)``
+
+    不需要处理的字段（以及不含需要处理的字段的子消息）不会出现在结果中，
+    规范化时不会进入这些子消息。
+    """
+    unordered = UNORDERED_FIELDS.get(descriptor.full_name, frozenset())
+    plan = []
+    for field in descriptor.fields:
+        is_message = field.type == FieldDescriptor.TYPE_MESSAGE
+        nested = is_message and bool(_plan(field.message_type))
+        if field.is_repeated:
+            flag = field.name in unordered
+            if flag or nested:
+                kind = _REPEATED_MESSAGE if is_message else _REPEATED_SCALAR
+                plan.append((field.name, kind, flag, nested))
+        elif is_message:
+            flag = not _in_real_oneof(field)
+            if flag or nested:
+                plan.append((field.name, _MESSAGE, flag, nested))
+        elif field.has_presence and not _in_real_oneof(field):
+            plan.append((field.name, _OPTIONAL_SCALAR, True, False))
+    return tuple(plan)
+
+
+def _canonicalize(message: Message):
+    for name, kind, flag, nested in _plan(message.DESCRIPTOR):
+        if kind == _MESSAGE:
+            if not message.HasField(name):
+                continue
+            child = getattr(message, name)
+            if nested:
+                _canonicalize(child)
+            if flag and child.ByteSize() == 0:
+                message.ClearField(name)
+        elif kind == _REPEATED_MESSAGE:
+            items = getattr(message, name)
+            if nested:
+                for item in items:
+                    _canonicalize(item)
+            if flag and len(items) > 1:
+                serialized = [
+                    item.SerializeToString(deterministic=True) for item in items
+                ]
+                ordered = sorted(serialized)
+                if ordered != serialized:
+                    del items[:]
+                    for data in ordered:
+                        items.add().MergeFromString(data)
+        elif kind == _REPEATED_SCALAR:
+            items = getattr(message, name)
+            if len(items) > 1:
+                items.sort()
+        elif message.HasField(name) and not getattr(message, name):
+            message.ClearField(name)
+
+
+def canonicalize(message: PetCodeMessage) -> PetCodeMessage:
+    """返回消息的规范形式，不会修改输入的消息
+
+    内容相同、仅字段顺序或默认值的写法不同的消息，规范形式完全相同。
+    """
+    result = PetCodeMessage()
+    result.CopyFrom(message)
+    result.DiscardUnknownFields()
+    _canonicalize(result)
+    return result
+
+
+def canonical_bytes(message: PetCodeMessage) -> bytes:
+    """规范形式的确定性序列化结果"""
+    return canonicalize(message).SerializeToString(deterministic=True)
+
+
+def fingerprint(message: PetCodeMessage, *, bits: int = 64) -> int:
+    """消息内容的指纹，规范形式相同的消息指纹相同
+
+    Args:
+        message: 消息
+        bits: 指纹位数，64 或 128；百万级以上的数据去重时建议使用 128 位以避免碰撞
+
+    Example:
+        >>> unique = {}
+        >>> for message in messages:
+        ...     unique.setdefault(fingerprint(message), message)
+    """
+    if bits not in (64, 128):
+        raise ValueError(f'bits must be 64 or 128, got {bits}')
+    digest = hashlib.blake2b(canonical_bytes(message), digest_size=bits // 8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+__all__ = [
+    'UNORDERED_FIELDS',
+    'canonical_bytes',
+    'canonicalize',
+    'fingerprint',
+]
@@ -0,0 +1,96 @@
+"""训练用于 deflate 压缩的预设字典（zdict）
+
+PetCodeMessage 的序列化数据通常只有几百字节，并且包含大量重复的片段
+（字段标签、常用的精灵/技能 ID、学习力分配等）。通用压缩算法在这种长度下几乎
+无法积累上下文，而预设字典可以让压缩器从第一个字节开始引用这些公共片段。
+
+训练方法：统计样本中不同长度子串出现在多少个样本中，按估算的节省字节数排序，
+贪心地选取片段拼接成字典。得分越高的片段越靠近字典末尾，因为 deflate
+对距离较近的引用编码更短。
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+# 与内置字典（_zdict.DEFAULT_ZDICT）训练时使用的大小一致
+DEFAULT_DICTIONARY_SIZE = 2048
+DEFAULT_SEGMENT_LENGTHS = (4, 6, 8, 12, 16, 24, 32)
+
+# deflate 的一次匹配至少需要约 3 字节（长度 + 距离），短于此的片段没有收益
+_MATCH_COST = 3
+
+
+def _grams(segment: bytes) -> set[bytes]:
+    n = _MATCH_COST + 1
+    return {segment[i : i + n] for i in range(len(segment) - n + 1)}
+
+
+def train_dictionary(
+    samples: Iterable[PetCodeMessage | bytes],
+    size: int = DEFAULT_DICTIONARY_SIZE,
+    *,
+    segment_lengths: Iterable[int] = DEFAULT_SEGMENT_LENGTHS,
+    min_frequency: int = 2,
+) -> bytes:
+    """从样本中训练预设字典
+
+    Args:
+        samples: 样本消息，或消息未压缩的序列化数据
+        size: 字典的最大字节数（deflate 最多使用 32KB）
+        segment_lengths: 参与统计的子串长度
+        min_frequency: 子串至少需要出现在多少个样本中才会被选入字典
+
+    Returns:
+        可直接用作 ``zlib`` ``zdict`` 参数的字典数据
+
+    Example:
+        >>> zdict = train_dictionary(messages, size=2048)
+        >>> register_codec(DeflateCodec(name='my-dict', codec_id=8, zdict=zdict))
+    """
+    lengths = sorted(set(segment_lengths))
+    frequency: Counter[bytes] = Counter()
+    for sample in samples:
+        if isinstance(sample, PetCodeMessage):
+            data = sample.SerializeToString()
+        else:
+            data = sample
+        seen: set[bytes] = set()
+        for length in lengths:
+            seen.update(data[i : i + length] for i in range(len(data) - length + 1))
+        frequency.update(seen)
+
+    candidates = sorted(
+        (
+            (count * (len(segment) - _MATCH_COST), segment)
+            for segment, count in frequency.items()
+            if count >= min_frequency and len(segment) > _MATCH_COST
+        ),
+        reverse=True,
+    )
+
+    chosen: list[bytes] = []
+    covered: set[bytes] = set()
+    total = 0
+    for _, segment in candidates:
+        if total + len(segment) > size:
+            continue
+        # 与已选片段大量重叠的片段几乎没有额外收益
+        grams = _grams(segment)
+        if len(grams - covered) * 2 < len(grams):
+            continue
+        chosen.append(segment)
+        covered |= grams
+        total += len(segment)
+        if total >= size:
+            break
+
+    # 得分最高的片段放在末尾
+    return b''.join(reversed(chosen))
+
+
+__all__ = [
+    'DEFAULT_DICTIONARY_SIZE',
+    'train_dictionary',
+]
@@ -0,0 +1,203 @@
+"""增量编码的编辑会话
+
+配置编辑器每次修改一个字段都需要重新生成分享码用于预览。`to_base64` 每次都会序列化
+整条消息，而一次编辑通常只涉及一只精灵。`EditSession` 缓存每只精灵和 ``seer_set``
+序列化后的字节，重新编码时只序列化被修改的部分，再与缓存拼接后压缩。
+
+Protobuf 消息无法得知自己是否被修改，修改需要通过会话进行：
+
+- `EditSession.pet` 和 `EditSession.seer_set` 返回可以直接修改的子消息，
+  并将其标记为已修改
+- `set_pet`、`insert_pet`、`append_pet`、`remove_pet`、`move_pet` 修改精灵列表，
+  `move_pet` 不需要重新序列化
+- ``server``、``display_mode`` 和 ``battle_fires`` 每次编码时都会重新写入，
+  可以直接修改 `EditSession.message`
+- 通过其他方式修改了精灵或 ``seer_set`` 时，需要调用 `mark_dirty`
+
+编码结果与 `petcode.to_base64` 完全相同。
+"""
+
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage, PetInfo
+
+from . import _b64encode
+from .codec import compress
+
+# 字段编号和 wire type 组成的 tag
+_SERVER_TAG = b'\x08'
+_DISPLAY_MODE_TAG = b'\x10'
+_SEER_SET_TAG = b'\x1a'
+_PETS_TAG = b'\x22'
+_BATTLE_FIRES_TAG = b'\x2a'
+
+
+def _varint(value: int) -> bytes:
+    # 负数的枚举值按 64 位补码编码
+    value &= 0xFFFFFFFFFFFFFFFF
+    result = bytearray()
+    while value > 0x7F:
+        result.append(value & 0x7F | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def _field(tag: bytes, data: bytes) -> bytes:
+    return tag + _varint(len(data)) + data
+
+
+class EditSession:
+    """编辑一条消息并增量生成分享码
+
+    Args:
+        message: 初始消息，会话会复制一份，不会修改传入的消息
+        codec: 压缩使用的编解码器
+
+    Example:
+        >>> session = EditSession(message)
+        >>> session.pet(0).skills[1] = 24708
+        >>> code = session.to_base64()
+    """
+
+    def __init__(self, message: PetCodeMessage | None = None, *, codec: str = 'gzip'):
+        self.message = PetCodeMessage()
+        if message is not None:
+            self.message.CopyFrom(message)
+        self.codec = codec
+        self._pets: list[bytes | None] = [None] * len(self.message.pets)
+        self._seer_set: bytes | None = None
+        self._head: tuple[tuple[int, int], bytes] = ((0, 0), b'')
+        self._battle_fires: tuple[list[int], bytes] = ([], b'')
+        self._unknown = b''
+        self._binary: tuple[str, bytes, bytes] | None = None
+
+        # 顶层消息的未知字段序列化在末尾，保留下来以保证结果与 to_binary 相同
+        full = self.message.SerializeToString()
+        known = self.serialize()
+        if full != known and full.startswith(known):
+            self._unknown = full[len(known) :]
+
+    def pet(self, index: int) -> PetInfo:
+        """返回第 ``index`` 只精灵用于修改，并将其标记为已修改
+
+        标记只在调用时生效，保留返回值并在编码之后继续修改时需要重新调用。
+        """
+        pet = self.message.pets[index]
+        self._pets[index] = None
+        return pet
+
+    @property
+    def seer_set(self) -> PetCodeMessage.SeerSet:
+        """返回 ``seer_set`` 用于修改，并将其标记为已修改"""
+        self._seer_set = None
+        return self.message.seer_set
+
+    def set_pet(self, index: int, pet: PetInfo):
+        """将第 ``index`` 只精灵替换为 ``pet`` 的副本"""
+        self.message.pets[index].CopyFrom(pet)
+        self._pets[index] = None
+
+    def insert_pet(self, index: int, pet: PetInfo):
+        """在 ``index`` 处插入 ``pet`` 的副本"""
+        self.message.pets.insert(index, pet)
+        self._pets.insert(index, None)
+
+    def append_pet(self, pet: PetInfo):
+        """在末尾添加 ``pet`` 的副本"""
+        self.insert_pet(len(self._pets), pet)
+
+    def remove_pet(self, index: int) -> PetInfo:
+        """移除并返回第 ``index`` 只精灵"""
+        self._pets.pop(index)
+        return self.message.pets.pop(index)
+
+    def move_pet(self, source: int, target: int):
+        """将第 ``source`` 只精灵移动到 ``target`` 处，其余精灵顺序不变"""
+        pets = self.message.pets
+        pets.insert(target, pets.pop(source))
+        self._pets.insert(target, self._pets.pop(source))
+
+    def mark_dirty(self, index: int | None = None):
+        """将第 ``index`` 只精灵标记为已修改
+
+        ``index`` 为 None 时标记所有精灵和 ``seer_set``。
+        """
+        if index is None:
+            self._pets = [None] * len(self.message.pets)
+            self._seer_set = None
+        else:
+            self._pets[index] = None
+
+    @property
+    def dirty(self) -> list[int]:
+        """已修改、尚未重新序列化的精灵的位置"""
+        return [index for index, data in enumerate(self._pets) if data is None]
+
+    def serialize(self) -> bytes:
+        """序列化整条消息，结果与 ``message.SerializeToString()`` 相同"""
+        message = self.message
+        # 读取字段的开销与编码相当，标量字段和 battle_fires 与上一次相同时
+        # 直接使用上一次的编码结果
+        key = (message.server, message.display_mode)
+        if key != self._head[0]:
+            head = b''
+            if key[0]:
+                head += _SERVER_TAG + _varint(key[0])
+            if key[1]:
+                head += _DISPLAY_MODE_TAG + _varint(key[1])
+            self._head = (key, head)
+        fires = message.battle_fires[:]
+        if fires != self._battle_fires[0]:
+            packed = b''.join(map(_varint, fires))
+            self._battle_fires = (
+                fires,
+                _field(_BATTLE_FIRES_TAG, packed) if packed else b'',
+            )
+
+        seer_set = b''
+        if message.HasField('seer_set'):
+            if self._seer_set is None:
+                self._seer_set = _field(
+                    _SEER_SET_TAG, message.seer_set.SerializeToString()
+                )
+            seer_set = self._seer_set
+
+        pets, cache = message.pets, self._pets
+        if len(cache) != len(pets):
+            # 精灵列表被直接修改过，无法确定哪些缓存仍然有效
+            cache[:] = [None] * len(pets)
+        if None in cache:
+            for index, data in enumerate(cache):
+                if data is None:
+                    cache[index] = _field(_PETS_TAG, pets[index].SerializeToString())
+
+        return b''.join(
+            (
+                self._head[1],
+                seer_set,
+                *cache,  # type: ignore[misc]
+                self._battle_fires[1],
+                self._unknown,
+            )
+        )
+
+    def to_binary(self) -> bytes:
+        """序列化并压缩，结果与 `petcode.to_binary` 相同
+
+        序列化结果与上一次相同时直接返回上一次的压缩结果。
+        """
+        data = self.serialize()
+        cached = self._binary
+        if cached is not None and cached[0] == self.codec and cached[1] == data:
+            return cached[2]
+        binary = compress(data, self.codec)
+        self._binary = (self.codec, data, binary)
+        return binary
+
+    def to_base64(self) -> str:
+        """序列化并压缩，返回数据的 base64，结果与 `petcode.to_base64` 相同"""
+        return _b64encode(self.to_binary())
+
+
+__all__ = [
+    'EditSession',
+]
@@ -1,4 +1,6 @@
+from collections.abc import Iterable
 from enum import IntEnum
+from functools import lru_cache
 from typing import NamedTuple
 
 from seerbp.petcode.v1.message_pb2 import PetInfo
@@ -46,9 +48,7 @@ def effect_to_param(effect: PetInfo.Effect) -> EffectParam:
         >>> param.type  # EffectType.GENERAL
         >>> param.name  # "67_1_5"
     """
-    type_ = get_effect_type(effect.status)
-    name = '_'.join([str(effect.id), *[str(arg) for arg in effect.args]])
-    return EffectParam(type=type_, name=name)
+    return _to_param(effect.id, effect.status, tuple(effect.args))
 
 
 def param_to_effect(param: EffectParam) -> PetInfo.Effect:
@@ -70,15 +70,61 @@ def param_to_effect(param: EffectParam) -> PetInfo.Effect:
         >>> effect.status  # 1
         >>> effect.args  # [1, 5]
     """
-    return PetInfo.Effect(
-        id=int(param.name.split('_')[0]),
-        status=param.type.value,
-        args=[int(arg) for arg in param.name.split('_')[1:]],
-    )
+    id_, args = _parse_name(param.name)
+    return PetInfo.Effect(id=id_, status=param.type.value, args=args)
+
+
+def effects_to_params(effects: Iterable[PetInfo.Effect]) -> list[EffectParam]:
+    """批量将 PetInfo.Effect 转换为 EffectParam，结果顺序与输入一致
+
+    Example:
+        >>> params = effects_to_params(pet.effects)
+    """
+    to_param = _to_param
+    return [
+        to_param(effect.id, effect.status, tuple(effect.args)) for effect in effects
+    ]
+
+
+def params_to_effects(params: Iterable[EffectParam]) -> list[PetInfo.Effect]:
+    """批量将 EffectParam 转换回 PetInfo.Effect，结果顺序与输入一致
+
+    Example:
+        >>> pet.effects.extend(params_to_effects(params))
+    """
+    parse = _parse_name
+    effect_type = PetInfo.Effect
+    effects = []
+    for param in params:
+        id_, args = parse(param.name)
+        effects.append(effect_type(id=id_, status=param.type.value, args=args))
+    return effects
+
+
+_EFFECT_TYPES = {effect_type.value: effect_type for effect_type in EffectType}
 
 
 def get_effect_type(status: int):
-    try:
-        return EffectType(status)
-    except ValueError:
-        return EffectType.OTHER
+    return _EFFECT_TYPES.get(status, EffectType.OTHER)
+
+
+# 常见特效的 EffectParam 与解析结果会被缓存，相同的特效共用同一个字符串对象
+EFFECT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def _to_param(id_: int, status: int, args: tuple[int, ...]) -> EffectParam:
+    name = '_'.join(map(str, (id_, *args)))
+    return EffectParam(type=get_effect_type(status), name=name)
+
+
+@lru_cache(maxsize=EFFECT_CACHE_SIZE)
+def _parse_name(name: str) -> tuple[int, tuple[int, ...]]:
+    id_, *args = map(int, name.split('_'))
+    return id_, tuple(args)
+
+
+def clear_effect_cache():
+    """清空特效转换的缓存"""
+    _to_param.cache_clear()
+    _parse_name.cache_clear()
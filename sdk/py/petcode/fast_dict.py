@@ -0,0 +1,342 @@
+"""PetCodeMessage 与字典之间的专用转换
+
+`google.protobuf.json_format` 通过反射逐字段处理，通用但较慢。本模块针对 PetCodeMessage
+的结构手写了转换函数，输出与 ``json_format.MessageToDict`` 完全一致
+（camelCase 字段名、枚举名称、省略默认值、保留 optional 字段和 oneof）。
+
+`dict_to_message` 使用预先由描述符生成的字段表解析字典；遇到快速路径不处理的输入
+（数字字符串、null、超出范围的整数等）时，整体回退到 ``json_format.ParseDict``，
+因此接受的输入和报错行为与 ``json_format`` 相同。
+"""
+
+from google.protobuf import json_format
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from seerbp.petcode.v1.message_pb2 import (
+    MintmarkInfo,
+    PetAbilityBonus,
+    PetAbilityValue,
+    PetCodeMessage,
+    PetInfo,
+    ResistanceInfo,
+)
+
+
+def _enum_names(enum_type) -> dict[int, str]:
+    return {value.number: value.name for value in enum_type.DESCRIPTOR.values}
+
+
+_SERVER_NAMES = _enum_names(PetCodeMessage.Server)
+_DISPLAY_MODE_NAMES = _enum_names(PetCodeMessage.DisplayMode)
+_BATTLE_FIRE_NAMES = _enum_names(PetCodeMessage.BattleFire)
+_BONUS_TYPE_NAMES = _enum_names(PetAbilityBonus.Type)
+
+
+def _ability_to_dict(value: PetAbilityValue) -> dict:
+    data = {}
+    if value.hp:
+        data['hp'] = value.hp
+    if value.attack:
+        data['attack'] = value.attack
+    if value.defense:
+        data['defense'] = value.defense
+    if value.special_attack:
+        data['specialAttack'] = value.special_attack
+    if value.special_defense:
+        data['specialDefense'] = value.special_defense
+    if value.speed:
+        data['speed'] = value.speed
+    return data
+
+
+def _extra_value_to_dict(value: PetAbilityBonus.ExtraValue) -> dict:
+    data = {}
+    if value.HasField('value'):
+        data['value'] = value.value
+    if value.HasField('percent'):
+        data['percent'] = value.percent
+    return data
+
+
+_BONUS_VALUE_FIELDS = (
+    ('hp', 'hp'),
+    ('attack', 'attack'),
+    ('defense', 'defense'),
+    ('special_attack', 'specialAttack'),
+    ('special_defense', 'specialDefense'),
+    ('speed', 'speed'),
+)
+
+
+def _ability_bonus_to_dict(bonus: PetAbilityBonus) -> dict:
+    data = {}
+    if bonus.type:
+        data['type'] = _BONUS_TYPE_NAMES.get(bonus.type, bonus.type)
+    if bonus.HasField('value'):
+        value = bonus.value
+        value_data = {}
+        for name, json_name in _BONUS_VALUE_FIELDS:
+            if value.HasField(name):
+                value_data[json_name] = _extra_value_to_dict(getattr(value, name))
+        data['value'] = value_data
+    return data
+
+
+def _mintmark_to_dict(mintmark: MintmarkInfo) -> dict:
+    which = mintmark.WhichOneof('mintmark')
+    if which is None:
+        return {}
+    if which == 'universal':
+        universal = mintmark.universal
+        data = {}
+        if universal.id:
+            data['id'] = universal.id
+        if universal.level:
+            data['level'] = universal.level
+        if universal.HasField('ability'):
+            data['ability'] = _ability_to_dict(universal.ability)
+        if universal.HasField('gem'):
+            gem = universal.gem
+            gem_data = {}
+            if gem.gem_id:
+                gem_data['gemId'] = gem.gem_id
+            if gem.bind_skill_id:
+                gem_data['bindSkillId'] = gem.bind_skill_id
+            data['gem'] = gem_data
+        return {'universal': data}
+    if which == 'quanxiao':
+        quanxiao = mintmark.quanxiao
+        data = {}
+        if quanxiao.id:
+            data['id'] = quanxiao.id
+        if quanxiao.skill_mintmark_id:
+            data['skillMintmarkId'] = quanxiao.skill_mintmark_id
+        return {'quanxiao': data}
+    # skill / ability 只有一个 id 字段
+    inner_id = getattr(mintmark, which).id
+    return {which: {'id': inner_id} if inner_id else {}}
+
+
+def _state_items_to_list(items) -> list:
+    result = []
+    for item in items:
+        data = {}
+        if item.state_id:
+            data['stateId'] = item.state_id
+        if item.percent:
+            data['percent'] = item.percent
+        result.append(data)
+    return result
+
+
+def _resistance_to_dict(resistance: ResistanceInfo) -> dict:
+    data = {}
+    if resistance.HasField('hurt'):
+        hurt = resistance.hurt
+        hurt_data = {}
+        if hurt.crit:
+            hurt_data['crit'] = hurt.crit
+        if hurt.regular:
+            hurt_data['regular'] = hurt.regular
+        if hurt.precent:
+            hurt_data['precent'] = hurt.precent
+        data['hurt'] = hurt_data
+    if resistance.ctl:
+        data['ctl'] = _state_items_to_list(resistance.ctl)
+    if resistance.weak:
+        data['weak'] = _state_items_to_list(resistance.weak)
+    return data
+
+
+def _effect_to_dict(effect: PetInfo.Effect) -> dict:
+    data = {}
+    if effect.id:
+        data['id'] = effect.id
+    if effect.status:
+        data['status'] = effect.status
+    if effect.args:
+        data['args'] = list(effect.args)
+    return data
+
+
+def _pet_to_dict(pet: PetInfo) -> dict:
+    data = {}
+    if pet.id:
+        data['id'] = pet.id
+    if pet.level:
+        data['level'] = pet.level
+    if pet.dv:
+        data['dv'] = pet.dv
+    if pet.nature:
+        data['nature'] = pet.nature
+    if pet.HasField('evs'):
+        data['evs'] = _ability_to_dict(pet.evs)
+    if pet.skills:
+        data['skills'] = list(pet.skills)
+    if pet.extra_hp:
+        data['extraHp'] = pet.extra_hp
+    if pet.effects:
+        data['effects'] = [_effect_to_dict(effect) for effect in pet.effects]
+    if pet.mintmarks:
+        data['mintmarks'] = [_mintmark_to_dict(mintmark) for mintmark in pet.mintmarks]
+    if pet.HasField('resistance'):
+        data['resistance'] = _resistance_to_dict(pet.resistance)
+    if pet.is_awaken:
+        data['isAwaken'] = True
+    if pet.pet_items:
+        data['petItems'] = list(pet.pet_items)
+    if pet.ability_bonus:
+        data['abilityBonus'] = [_ability_bonus_to_dict(b) for b in pet.ability_bonus]
+    if pet.HasField('ability_total'):
+        data['abilityTotal'] = _ability_to_dict(pet.ability_total)
+    if pet.HasField('skin_id'):
+        data['skinId'] = pet.skin_id
+    return data
+
+
+def message_to_dict(message: PetCodeMessage) -> dict:
+    """将消息转换为字典，结果与 ``json_format.MessageToDict(message)`` 相同"""
+    data = {}
+    if message.server:
+        data['server'] = _SERVER_NAMES.get(message.server, message.server)
+    if message.display_mode:
+        data['displayMode'] = _DISPLAY_MODE_NAMES.get(
+            message.display_mode, message.display_mode
+        )
+    if message.HasField('seer_set'):
+        seer_set = message.seer_set
+        seer_set_data = {}
+        if seer_set.equips:
+            seer_set_data['equips'] = list(seer_set.equips)
+        if seer_set.HasField('title_id'):
+            seer_set_data['titleId'] = seer_set.title_id
+        data['seerSet'] = seer_set_data
+    if message.pets:
+        data['pets'] = [_pet_to_dict(pet) for pet in message.pets]
+    if message.battle_fires:
+        data['battleFires'] = [
+            _BATTLE_FIRE_NAMES.get(fire, fire) for fire in message.battle_fires
+        ]
+    return data
+
+
+class _Fallback(Exception):
+    """快速路径无法处理该输入，需要回退到 json_format"""
+
+
+_INT32_MIN = -(2**31)
+_INT32_MAX = 2**31 - 1
+
+# 字段处理方式
+_INT, _BOOL, _ENUM, _MESSAGE = range(4)
+
+
+class _Field:
+    __slots__ = ('enum_values', 'kind', 'message_name', 'name', 'oneof', 'repeated')
+
+    def __init__(self, field: FieldDescriptor):
+        self.name = field.name
+        self.repeated = field.label == FieldDescriptor.LABEL_REPEATED
+        self.enum_values: dict[str, int] | None = None
+        self.message_name: str | None = None
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            self.kind = _MESSAGE
+            self.message_name = field.message_type.full_name
+        elif field.type == FieldDescriptor.TYPE_ENUM:
+            self.kind = _ENUM
+            self.enum_values = {v.name: v.number for v in field.enum_type.values}
+        elif field.type == FieldDescriptor.TYPE_BOOL:
+            self.kind = _BOOL
+        else:
+            self.kind = _INT
+        # proto3 optional 字段的合成 oneof 以下划线开头，不参与互斥检查
+        oneof = field.containing_oneof
+        self.oneof = (
+            oneof.name if oneof is not None and not oneof.name.startswith('_') else None
+        )
+
+
+# 字段表：消息描述符全名 -> {JSON 键或原始字段名 -> 字段信息}
+_FIELD_TABLES: dict[str, dict[str, _Field]] = {}
+
+
+def _compile(descriptor: Descriptor):
+    if descriptor.full_name in _FIELD_TABLES:
+        return
+    table: dict[str, _Field] = {}
+    _FIELD_TABLES[descriptor.full_name] = table
+    for field in descriptor.fields:
+        table[field.json_name] = table[field.name] = _Field(field)
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            _compile(field.message_type)
+
+
+_compile(PetCodeMessage.DESCRIPTOR)
+
+
+def _scalar(field: _Field, value):
+    value_type = type(value)
+    if value_type is int:
+        if field.kind == _BOOL or not _INT32_MIN <= value <= _INT32_MAX:
+            raise _Fallback
+        return value
+    if value_type is str and field.kind == _ENUM:
+        number = field.enum_values.get(value)  # type: ignore[union-attr]
+        if number is None:
+            raise _Fallback
+        return number
+    if value_type is bool and field.kind == _BOOL:
+        return value
+    raise _Fallback
+
+
+def _parse_into(data, message, table: dict[str, _Field]):
+    if type(data) is not dict:
+        raise _Fallback
+    seen: set[str] = set()
+    for key, value in data.items():
+        field = table.get(key)
+        if field is None:
+            raise _Fallback
+        name = field.name
+        # 同一字段重复出现、或同一个 oneof 出现多个字段时，交由 json_format 处理
+        oneof = field.oneof
+        if name in seen or (oneof is not None and oneof in seen):
+            raise _Fallback
+        seen.add(name)
+        if oneof is not None:
+            seen.add(oneof)
+
+        if field.kind == _MESSAGE:
+            sub_table = _FIELD_TABLES[field.message_name]  # type: ignore[index]
+            if field.repeated:
+                if type(value) is not list:
+                    raise _Fallback
+                add = getattr(message, name).add
+                for item in value:
+                    _parse_into(item, add(), sub_table)
+            else:
+                sub_message = getattr(message, name)
+                sub_message.SetInParent()
+                _parse_into(value, sub_message, sub_table)
+        elif field.repeated:
+            if type(value) is not list:
+                raise _Fallback
+            getattr(message, name).extend([_scalar(field, item) for item in value])
+        else:
+            setattr(message, name, _scalar(field, value))
+
+
+def dict_to_message(data: dict) -> PetCodeMessage:
+    """将字典转换为消息，结果与 ``json_format.ParseDict`` 相同"""
+    message = PetCodeMessage()
+    try:
+        _parse_into(data, message, _FIELD_TABLES[PetCodeMessage.DESCRIPTOR.full_name])
+    except _Fallback:
+        return json_format.ParseDict(data, PetCodeMessage())
+    return message
+
+
+__all__ = [
+    'dict_to_message',
+    'message_to_dict',
+]
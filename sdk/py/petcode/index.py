@@ -0,0 +1,420 @@
+"""PetCode 消息的倒排索引
+
+为大量消息（通常是 `petcode.archive` 归档文件中的记录）建立倒排索引，
+查询“使用某精灵且带有某技能”的配置时，只需对有序的记录序号数组求交集/并集，
+再按序号读取匹配的记录，不必解码其他记录。
+
+索引以消息为单位：``('pet', 3842)`` 与 ``('skill', 24708)`` 的交集表示消息中
+含有该精灵，且某只精灵带有该技能，两者不一定是同一只精灵；需要更精确的条件时，
+可以只解码命中的记录再做过滤。
+
+| 字段 | 取值 |
+| ------ | ------ |
+| ``pet`` | `PetInfo.id` |
+| ``skill`` | `PetInfo.skills` 中的技能 ID |
+| ``effect`` | `PetInfo.effects` 的 ``(id, status)`` |
+| ``mintmark`` | 刻印 ID（`read_mintmark(mintmark).id`） |
+| ``nature`` | `PetInfo.nature` |
+| ``server`` | `PetCodeMessage.server` |
+| ``display_mode`` | `PetCodeMessage.display_mode` |
+
+索引文件的结构为：文件头（魔数 ``PCIX``、格式版本、记录数），所有倒排列表，
+按 ``(字段, 值)`` 排序的词项表，以及文件尾（词项表偏移量、词项数和魔数）。
+倒排列表按体积较小者保存为 uint32 有序数组或位图。
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from itertools import chain, compress, islice
+import mmap
+from operator import eq, ne
+import os
+import struct
+import sys
+
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+from .codec import BinaryData
+from .create_and_read import read_mintmark
+
+MAGIC = b'PCIX'
+INDEX_VERSION = 1
+
+FIELDS = ('pet', 'skill', 'effect', 'mintmark', 'nature', 'server', 'display_mode')
+_FIELD_IDS = {name: field_id for field_id, name in enumerate(FIELDS)}
+_PET, _SKILL, _EFFECT, _MINTMARK, _NATURE, _SERVER, _DISPLAY_MODE = range(len(FIELDS))
+
+_HEADER = struct.Struct('<4sB3xQ')
+_TERM = struct.Struct('<BBxxiiIQI')
+_TRAILER = struct.Struct('<QI4s')
+
+_KIND_ARRAY = 0
+_KIND_BITMAP = 1
+
+# bin() 的结果中 '0'/'1' 转为 0/1，用作 itertools.compress 的选择器
+_BIN_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+Term = tuple[str, int | tuple[int, int]]
+"""查询词项 ``(字段, 值)``，``effect`` 字段的值为 ``(id, status)``"""
+
+
+class IndexFormatError(ValueError):
+    """数据不是有效的索引文件，或索引文件已损坏"""
+
+
+def _new_postings() -> array:
+    return array('I')
+
+
+def _bitmap_records(bits: int) -> array:
+    """位图（整数，第 i 位表示记录 i）中所有置位的记录序号"""
+    digits = bin(bits)[:1:-1].encode().translate(_BIN_DIGITS)
+    return array('I', compress(range(len(digits)), digits))
+
+
+def _filter_bitmap(records: array, bits: int) -> array:
+    """保留在位图中置位的记录序号"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    size = len(data)
+    return array(
+        'I',
+        [
+            record
+            for record in records
+            if record >> 3 < size and data[record >> 3] >> (record & 7) & 1
+        ],
+    )
+
+
+def _to_little_endian(postings: array) -> bytes:
+    if sys.byteorder == 'big':
+        postings = array('I', postings)
+        postings.byteswap()
+    return postings.tobytes()
+
+
+def _message_terms(message: PetCodeMessage) -> set[tuple[int, int, int]]:
+    terms = {
+        (_SERVER, message.server, 0),
+        (_DISPLAY_MODE, message.display_mode, 0),
+    }
+    add = terms.add
+    for pet in message.pets:
+        add((_PET, pet.id, 0))
+        add((_NATURE, pet.nature, 0))
+        for skill in pet.skills:
+            add((_SKILL, skill, 0))
+        for effect in pet.effects:
+            add((_EFFECT, effect.id, effect.status))
+        for mintmark in pet.mintmarks:
+            # 未设置类型的刻印没有 ID，跳过以免单条异常数据中断整个索引
+            if mintmark.WhichOneof('mintmark') is not None:
+                add((_MINTMARK, read_mintmark(mintmark).id, 0))
+    return terms
+
+
+def _term_key(field: str, value) -> tuple[int, int, int]:
+    try:
+        field_id = _FIELD_IDS[field]
+    except KeyError:
+        raise ValueError(
+            f'Unknown index field: {field!r}, choose from {", ".join(FIELDS)}'
+        ) from None
+    if field_id == _EFFECT:
+        effect_id, status = value
+        return field_id, effect_id, status
+    return field_id, value, 0
+
+
+class IndexBuilder:
+    """按顺序扫描消息并建立倒排索引
+
+    第 ``i`` 条添加的消息的记录序号为 ``i``，与 `ArchiveReader` 中的序号一致。
+
+    Example:
+        >>> builder = IndexBuilder()
+        >>> with ArchiveReader('pets.pcar') as archive:
+        ...     builder.add_many(archive)
+        >>> builder.write('pets.pcix')
+    """
+
+    def __init__(self):
+        self.record_count = 0
+        self._postings: dict[tuple[int, int, int], array] = {}
+
+    def add(self, message: PetCodeMessage) -> int:
+        """添加一条消息，返回其记录序号"""
+        record = self.record_count
+        postings = self._postings
+        for key in _message_terms(message):
+            entry = postings.get(key)
+            if entry is None:
+                entry = postings[key] = _new_postings()
+            entry.append(record)
+        self.record_count += 1
+        return record
+
+    def add_many(self, messages: Iterable[PetCodeMessage]) -> int:
+        """添加多条消息，返回添加的条数"""
+        start = self.record_count
+        for message in messages:
+            self.add(message)
+        return self.record_count - start
+
+    def to_bytes(self) -> bytes:
+        """序列化为索引文件的内容"""
+        bitmap_size = (self.record_count + 7) // 8
+        parts = [_HEADER.pack(MAGIC, INDEX_VERSION, self.record_count)]
+        position = _HEADER.size
+        table = []
+        for (field_id, key, status), postings in sorted(self._postings.items()):
+            if bitmap_size < len(postings) * postings.itemsize:
+                bitmap = bytearray(bitmap_size)
+                for record in postings:
+                    bitmap[record >> 3] |= 1 << (record & 7)
+                kind, data = _KIND_BITMAP, bytes(bitmap)
+            else:
+                kind, data = _KIND_ARRAY, _to_little_endian(postings)
+            table.append(
+                _TERM.pack(
+                    field_id, kind, key, status, len(postings), position, len(data)
+                )
+            )
+            parts.append(data)
+            position += len(data)
+        parts.extend(table)
+        parts.append(_TRAILER.pack(position, len(table), MAGIC))
+        return b''.join(parts)
+
+    def write(self, path: str | os.PathLike):
+        """将索引写入文件"""
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    def build(self) -> 'PetCodeIndex':
+        """返回内存中的索引"""
+        return PetCodeIndex(self.to_bytes())
+
+
+def build_index(messages: Iterable[PetCodeMessage]) -> 'PetCodeIndex':
+    """为一组消息建立内存中的索引"""
+    builder = IndexBuilder()
+    builder.add_many(messages)
+    return builder.build()
+
+
+class PetCodeIndex:
+    """只读的倒排索引
+
+    打开时只读取词项表，倒排列表在查询时才从文件（通过 ``mmap`` 映射）中读取。
+
+    Args:
+        source: 索引文件路径，或 `IndexBuilder.to_bytes` 的结果等缓冲区对象
+
+    Raises:
+        IndexFormatError: 数据不是有效的索引文件
+
+    Example:
+        >>> with PetCodeIndex('pets.pcix') as index:
+        ...     records = index.match_all([('pet', 3842), ('skill', 24708)])
+        >>> with ArchiveReader('pets.pcar') as archive:
+        ...     messages = [archive[i] for i in records]
+    """
+
+    def __init__(self, source: BinaryData | str | os.PathLike):
+        self._file = None
+        self._mmap = None
+        if isinstance(source, (str, os.PathLike)):
+            self._file = open(source, 'rb')
+            try:
+                if os.fstat(self._file.fileno()).st_size == 0:
+                    raise IndexFormatError('Data is too short to be an index')
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except BaseException:
+                self._file.close()
+                raise
+            source = self._mmap
+        self._view = memoryview(source)
+        try:
+            self._load_terms()
+        except BaseException:
+            self.close()
+            raise
+
+    def _load_terms(self):
+        size = len(self._view)
+        if size < _HEADER.size + _TRAILER.size:
+            raise IndexFormatError('Data is too short to be an index')
+        magic, version, self.record_count = _HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            raise IndexFormatError('Not a PetCode index')
+        if version != INDEX_VERSION:
+            raise IndexFormatError(f'Unsupported index version: {version}')
+        table_offset, term_count, magic = _TRAILER.unpack_from(
+            self._view, size - _TRAILER.size
+        )
+        if (
+            magic != MAGIC
+            or table_offset + term_count * _TERM.size != size - _TRAILER.size
+        ):
+            raise IndexFormatError('Inconsistent index trailer')
+        self._terms: dict[tuple[int, int, int], tuple[int, int, int, int]] = {}
+        with self._view[table_offset : size - _TRAILER.size] as table:
+            for field_id, kind, key, status, count, offset, length in _TERM.iter_unpack(
+                table
+            ):
+                if field_id >= len(FIELDS) or offset + length > table_offset:
+                    raise IndexFormatError('Invalid term in index')
+                self._terms[field_id, key, status] = (kind, count, offset, length)
+
+    def close(self):
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        """索引中的记录数"""
+        return self.record_count
+
+    def terms(self, field: str) -> dict:
+        """返回字段中出现过的所有值及其记录数"""
+        field_id = _term_key(field, (0, 0))[0]
+        return {
+            (key, status) if field_id == _EFFECT else key: entry[1]
+            for (term_field, key, status), entry in self._terms.items()
+            if term_field == field_id
+        }
+
+    def count(self, field: str, value) -> int:
+        """含有该词项的记录数，不读取倒排列表"""
+        entry = self._terms.get(_term_key(field, value))
+        return 0 if entry is None else entry[1]
+
+    def _read(self, entry: tuple[int, int, int, int], term: Term) -> array | int:
+        """读取倒排列表，数组返回 ``array('I')``，位图返回整数"""
+        kind, count, offset, length = entry
+        with self._view[offset : offset + length] as data:
+            if kind == _KIND_ARRAY:
+                result = _new_postings()
+                result.frombytes(data)
+                if sys.byteorder == 'big':
+                    result.byteswap()
+                size = len(result)
+            else:
+                result = int.from_bytes(data, 'little')
+                size = result.bit_count()
+        if size != count:
+            raise IndexFormatError(
+                f'Posting list size mismatch for {term[0]}={term[1]}'
+            )
+        return result
+
+    def _entries(self, terms: Iterable[Term]) -> list:
+        return [(self._terms.get(_term_key(*term)), term) for term in terms]
+
+    def postings(self, field: str, value) -> array:
+        """含有该词项的记录序号，为升序的 ``array('I')``"""
+        entry = self._terms.get(_term_key(field, value))
+        if entry is None:
+            return _new_postings()
+        result = self._read(entry, (field, value))
+        return result if isinstance(result, array) else _bitmap_records(result)
+
+    def match_all(self, terms: Iterable[Term]) -> array:
+        """同时含有所有词项的记录序号（AND）"""
+        entries = self._entries(terms)
+        if not entries:
+            raise ValueError('match_all requires at least one term')
+        if any(entry is None for entry, _ in entries):
+            return _new_postings()
+        # 从最短的列表开始，交集为空时不再读取其他列表。位图之间直接按位与，
+        # 已有的有序数组则逐个检查位图中对应的位
+        entries.sort(key=lambda item: item[0][1])
+        records: array | None = None
+        bits: int | None = None
+        for entry, term in entries:
+            postings = self._read(entry, term)
+            if isinstance(postings, array):
+                if bits is not None:
+                    records = _bitmap_records(bits)
+                    bits = None
+                records = postings if records is None else intersect(records, postings)
+            elif records is not None:
+                records = _filter_bitmap(records, postings)
+            else:
+                bits = postings if bits is None else bits & postings
+            if not (records if bits is None else bits):
+                return _new_postings()
+        return records if bits is None else _bitmap_records(bits)
+
+    def match_any(self, terms: Iterable[Term]) -> array:
+        """含有任一词项的记录序号（OR）"""
+        arrays = []
+        bits = 0
+        for entry, term in self._entries(terms):
+            if entry is None:
+                continue
+            postings = self._read(entry, term)
+            if isinstance(postings, array):
+                arrays.append(postings)
+            else:
+                bits |= postings
+        if bits:
+            arrays.append(_bitmap_records(bits))
+        return union(*arrays)
+
+
+def _contains(postings: array, record: int) -> bool:
+    index = bisect_left(postings, record)
+    return index < len(postings) and postings[index] == record
+
+
+def intersect(*postings: array) -> array:
+    """有序、不重复的记录序号列表的交集，可以与 `union` 组合出嵌套的查询条件"""
+    if not postings:
+        return _new_postings()
+    ordered = sorted(postings, key=len)
+    result = ordered[0]
+    for other in ordered[1:]:
+        if not result:
+            break
+        if len(result) * 16 < len(other):
+            # 较短的列表逐个在较长的列表中二分查找
+            result = array('I', [r for r in result if _contains(other, r)])
+        else:
+            # 两个有序列表拼接后排序即为线性归并，同时出现在两者中的序号相邻
+            merged = sorted(chain(result, other))
+            result = array(
+                'I', compress(merged, map(eq, merged, islice(merged, 1, None)))
+            )
+    return array('I', result)
+
+
+def union(*postings: array) -> array:
+    """有序、不重复的记录序号列表的并集"""
+    # 归并后去掉与前一个相同的序号
+    merged = sorted(chain(*postings))
+    return array('I', compress(merged, map(ne, merged, chain((-1,), merged))))
+
+
+__all__ = [
+    'FIELDS',
+    'INDEX_VERSION',
+    'MAGIC',
+    'IndexBuilder',
+    'IndexFormatError',
+    'PetCodeIndex',
+    'Term',
+    'build_index',
+    'intersect',
+    'union',
+]
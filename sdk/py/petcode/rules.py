@@ -0,0 +1,722 @@
+"""精灵配置的合法性规则
+
+规则以声明的方式描述：``Rule(名称, 字段路径, 约束)``。字段路径相对于 `PetInfo`，
+以 ``.`` 分隔，例如 ``level``、``evs.hp``、``mintmarks.universal.level``；
+``*`` 表示当前消息的所有字段，例如 ``evs.*``。
+
+- 路径经过重复的子消息字段时，对每个元素分别检查
+- 路径经过 optional 或 oneof 字段且该字段未设置时跳过检查
+  （例如 ``mintmarks.universal.level`` 只检查全能刻印）
+- `Range`/`Allowed` 作用于重复的数值字段时，对每个元素分别检查
+
+`RuleSet` 在创建时解析字段路径，将所有规则合并为一棵字段树：检查时每只精灵
+只遍历一遍，公共前缀（例如 ``resistance``）只访问一次，只有违反规则时才生成
+路径字符串。已经转换为列式数据（`petcode.analytics`）时，可以使用
+`RuleSet.check_columns` 在 NumPy 数组上一次性检查所有精灵。
+
+Example:
+    >>> from petcode import rules
+    >>> for violation in rules.check(message):
+    ...     print(violation.rule, violation.path, violation.value)
+    ev_total pets[0].evs 600
+"""
+
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+import math
+from operator import attrgetter
+from typing import Any, NamedTuple
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from seerbp.petcode.v1.message_pb2 import (
+    MintmarkInfo,
+    PetAbilityBonus,
+    PetCodeMessage,
+    PetInfo,
+)
+
+from .effect import EffectType
+
+
+class Range(NamedTuple):
+    """数值在 ``[min, max]`` 范围内，省略的一端不限制"""
+
+    min: int | None = None
+    max: int | None = None
+
+
+class Allowed(NamedTuple):
+    """数值属于 ``values``"""
+
+    values: frozenset[int]
+
+
+class MaxCount(NamedTuple):
+    """重复字段的元素数不超过 ``max``"""
+
+    max: int
+
+
+class Unique(NamedTuple):
+    """重复字段的元素不重复，``key`` 用于从元素中取出比较的值"""
+
+    key: Callable[[Any], Hashable] | None = None
+
+
+class Sum(NamedTuple):
+    """子消息中各数值字段之和不超过 ``max``"""
+
+    max: int
+
+
+Constraint = Range | Allowed | MaxCount | Unique | Sum
+
+
+class Rule(NamedTuple):
+    """一条规则
+
+    Attributes:
+        name: 规则名称，出现在 `Violation.rule` 中
+        path: 相对于 `PetInfo` 的字段路径
+        constraint: 约束
+    """
+
+    name: str
+    path: str
+    constraint: Constraint
+
+
+class Violation(NamedTuple):
+    """违反规则的字段
+
+    Attributes:
+        rule: 规则名称
+        path: 字段路径，例如 ``pets[0].evs.hp``、``pets[1].mintmarks[2]``
+        value: 字段的值；`MaxCount` 为元素数，`Sum` 为总和，`Unique` 为重复的值
+        constraint: 被违反的约束
+    """
+
+    rule: str
+    path: str
+    value: Any
+    constraint: Constraint
+
+
+def mintmark_id(mintmark: MintmarkInfo) -> int:
+    """刻印 ID，未设置刻印类型时为 0"""
+    kind = mintmark.WhichOneof('mintmark')
+    return 0 if kind is None else getattr(mintmark, kind).id
+
+
+DEFAULT_RULES: tuple[Rule, ...] = (
+    Rule('level', 'level', Range(1, 100)),
+    Rule('dv', 'dv', Range(0, 31)),
+    Rule('ev', 'evs.*', Range(0, 255)),
+    Rule('ev_total', 'evs', Sum(510)),
+    # 包括第五技能
+    Rule('skill_count', 'skills', MaxCount(5)),
+    Rule('skill_unique', 'skills', Unique()),
+    Rule('effect_status', 'effects.status', Allowed(frozenset(map(int, EffectType)))),
+    Rule('mintmark_unique', 'mintmarks', Unique(mintmark_id)),
+    Rule('hurt_resistance', 'resistance.hurt.*', Range(0, 35)),
+    Rule('ctl_resistance', 'resistance.ctl.percent', Range(0, 55)),
+    Rule('weak_resistance', 'resistance.weak.percent', Range(0, 55)),
+    Rule(
+        'ability_bonus_type',
+        'ability_bonus.type',
+        Allowed(frozenset(PetAbilityBonus.Type.values())),
+    ),
+)
+
+# 叶子检查：``leaf(value, pet_index, indices, out)``，``value`` 为路径终点字段的值，
+# ``indices`` 为经过的重复字段的下标；违反规则时向 ``out`` 追加
+# ``(检查序号, 排序键, Violation)``
+_Leaf = Callable[[Any, int, tuple[int, ...], list], None]
+
+
+def _resolve(
+    descriptor: Descriptor | None, segments: list[str], path: str
+) -> list[tuple[FieldDescriptor, ...]]:
+    """将字段路径解析为描述符序列，展开 ``*``"""
+    if not segments:
+        return [()]
+    if descriptor is None:
+        raise ValueError(f'Invalid path {path!r}: not a message field')
+    head, *rest = segments
+    if head == '*':
+        fields = list(descriptor.fields)
+    elif head in descriptor.fields_by_name:
+        fields = [descriptor.fields_by_name[head]]
+    else:
+        raise ValueError(
+            f'Invalid path {path!r}: unknown field {head!r} in {descriptor.name}'
+        )
+    return [
+        (field, *tail)
+        for field in fields
+        for tail in _resolve(field.message_type, rest, path)
+    ]
+
+
+def _template(fields: tuple[FieldDescriptor, ...], element: bool) -> str:
+    parts = ['pets[{}]']
+    for field in fields[:-1]:
+        parts.append(f'{field.name}[{{}}]' if field.is_repeated else field.name)
+    parts.append(f'{fields[-1].name}[{{}}]' if element else fields[-1].name)
+    return '.'.join(parts)
+
+
+def _value_test(constraint: Range | Allowed) -> Callable[[int], bool]:
+    if isinstance(constraint, Allowed):
+        return constraint.values.__contains__
+    low = -math.inf if constraint.min is None else constraint.min
+    high = math.inf if constraint.max is None else constraint.max
+    return lambda value: low <= value <= high
+
+
+def _compile(rule: Rule, fields: tuple[FieldDescriptor, ...], position: int) -> _Leaf:
+    """将规则编译为作用于路径终点字段的值的检查函数"""
+    name, _, constraint = rule
+    terminal = fields[-1]
+    is_message = terminal.type == FieldDescriptor.TYPE_MESSAGE
+
+    if isinstance(constraint, (Range, Allowed)):
+        if is_message:
+            raise ValueError(
+                f'Rule {name!r}: {type(constraint).__name__} needs a number'
+            )
+        test = _value_test(constraint)
+        if terminal.is_repeated:
+            template = _template(fields, element=True)
+
+            def leaf(items, pet_index, indices, out):
+                for index, item in enumerate(items):
+                    if not test(item):
+                        path = template.format(pet_index, *indices, index)
+                        violation = Violation(name, path, item, constraint)
+                        out.append((position, (*indices, index), violation))
+
+            return leaf
+        template = _template(fields, element=False)
+
+        def leaf(value, pet_index, indices, out):
+            if not test(value):
+                path = template.format(pet_index, *indices)
+                out.append(
+                    (position, indices, Violation(name, path, value, constraint))
+                )
+
+        return leaf
+
+    if isinstance(constraint, (MaxCount, Unique)):
+        if not terminal.is_repeated:
+            raise ValueError(
+                f'Rule {name!r}: {type(constraint).__name__} needs a repeated field'
+            )
+        if isinstance(constraint, MaxCount):
+            limit = constraint.max
+            template = _template(fields, element=False)
+
+            def leaf(items, pet_index, indices, out):
+                if len(items) > limit:
+                    path = template.format(pet_index, *indices)
+                    violation = Violation(name, path, len(items), constraint)
+                    out.append((position, indices, violation))
+
+            return leaf
+        key = constraint.key
+        template = _template(fields, element=True)
+
+        def leaf(items, pet_index, indices, out):
+            if len(items) < 2:
+                return
+            values = list(items) if key is None else list(map(key, items))
+            if len(set(values)) == len(values):
+                return
+            seen = set()
+            for index, value in enumerate(values):
+                if value in seen:
+                    path = template.format(pet_index, *indices, index)
+                    violation = Violation(name, path, value, constraint)
+                    out.append((position, (*indices, index), violation))
+                else:
+                    seen.add(value)
+
+        return leaf
+
+    if isinstance(constraint, Sum):
+        if not is_message or terminal.is_repeated:
+            raise ValueError(f'Rule {name!r}: Sum needs a message field')
+        values = attrgetter(
+            *(
+                field.name
+                for field in terminal.message_type.fields
+                if field.type != FieldDescriptor.TYPE_MESSAGE and not field.is_repeated
+            )
+        )
+        limit = constraint.max
+        template = _template(fields, element=False)
+
+        def leaf(message, pet_index, indices, out):
+            total = sum(values(message))
+            if total > limit:
+                path = template.format(pet_index, *indices)
+                out.append(
+                    (position, indices, Violation(name, path, total, constraint))
+                )
+
+        return leaf
+
+    raise TypeError(f'Rule {name!r}: unknown constraint {constraint!r}')
+
+
+class _Node:
+    """字段树中的一个消息
+
+    Attributes:
+        ranges/allowed: 不经过重复字段和 optional/oneof 字段即可取到的数值字段上的
+            `Range`/`Allowed` 检查，``(相对路径, 约束, 叶子)``；检查时合并为
+            一次 attrgetter 调用，只有不满足约束时才调用叶子
+        entries: 其他需要访问的字段
+    """
+
+    __slots__ = ('allowed', 'entries', 'ranges')
+
+    def __init__(self):
+        self.ranges: list[tuple[str, Range, _Leaf]] = []
+        self.allowed: list[tuple[str, Allowed, _Leaf]] = []
+        self.entries: dict[str, _Entry] = {}
+
+    def child(self, field: FieldDescriptor) -> '_Entry':
+        entry = self.entries.get(field.name)
+        if entry is None:
+            entry = self.entries[field.name] = _Entry(field)
+        return entry
+
+    def insert(self, fields: tuple[FieldDescriptor, ...], leaf: _Leaf, rule: Rule):
+        terminal = fields[-1]
+        constraint = rule.constraint
+        direct = not terminal.is_repeated and terminal.containing_oneof is None
+        node, start = self, 0
+        for index, field in enumerate(fields[:-1]):
+            # 经过重复字段或可能未设置的字段时需要进入子树
+            if field.is_repeated or field.containing_oneof is not None or not direct:
+                for step in fields[start : index + 1]:
+                    node = node.child(step).subtree()
+                start = index + 1
+        if direct and isinstance(constraint, (Range, Allowed)):
+            suffix = '.'.join(field.name for field in fields[start:])
+            table = node.ranges if isinstance(constraint, Range) else node.allowed
+            table.append((suffix, constraint, leaf))
+            return
+        for step in fields[start:-1]:
+            node = node.child(step).subtree()
+        node.child(terminal).leaves.append(leaf)
+
+    def freeze(self) -> tuple:
+        range_getter, bounds, range_leaves = _table(
+            [
+                (
+                    path,
+                    (
+                        -math.inf if constraint.min is None else constraint.min,
+                        math.inf if constraint.max is None else constraint.max,
+                    ),
+                    leaf,
+                )
+                for path, constraint, leaf in self.ranges
+            ]
+        )
+        allowed_getter, sets, allowed_leaves = _table(
+            [(path, constraint.values, leaf) for path, constraint, leaf in self.allowed]
+        )
+        entries = tuple(
+            (
+                entry.name,
+                entry.repeated,
+                entry.presence,
+                tuple(entry.leaves),
+                None if entry.node is None else entry.node.freeze(),
+            )
+            for entry in self.entries.values()
+        )
+        return (
+            range_getter,
+            bounds,
+            range_leaves,
+            allowed_getter,
+            sets,
+            allowed_leaves,
+            entries,
+        )
+
+
+class _Entry:
+    """字段树中的一个字段：路径终点在该字段的检查，以及经过该字段的子树"""
+
+    __slots__ = ('leaves', 'name', 'node', 'presence', 'repeated')
+
+    def __init__(self, field: FieldDescriptor):
+        self.name = field.name
+        self.repeated = field.is_repeated
+        # optional 和 oneof 字段未设置时跳过
+        self.presence = field.containing_oneof is not None
+        self.leaves: list[_Leaf] = []
+        self.node: _Node | None = None
+
+    def subtree(self) -> _Node:
+        if self.node is None:
+            self.node = _Node()
+        return self.node
+
+
+def _table(items: list[tuple[str, Any, _Leaf]]) -> tuple:
+    if not items:
+        return None, (), ()
+    paths, constraints, leaves = zip(*items)
+    if len(paths) == 1:
+        get = attrgetter(paths[0])
+        getter = lambda message: (get(message),)  # noqa: E731
+    else:
+        getter = attrgetter(*paths)
+    return getter, constraints, leaves
+
+
+def _run(node: tuple, message, pet_index: int, indices: tuple[int, ...], out):
+    (
+        range_getter,
+        bounds,
+        range_leaves,
+        allowed_getter,
+        sets,
+        allowed_leaves,
+        entries,
+    ) = node
+    if range_getter is not None:
+        for value, (low, high), leaf in zip(
+            range_getter(message), bounds, range_leaves
+        ):
+            if not low <= value <= high:
+                leaf(value, pet_index, indices, out)
+    if allowed_getter is not None:
+        for value, values, leaf in zip(allowed_getter(message), sets, allowed_leaves):
+            if value not in values:
+                leaf(value, pet_index, indices, out)
+    for name, repeated, presence, leaves, child in entries:
+        if presence and not message.HasField(name):
+            continue
+        value = getattr(message, name)
+        for leaf in leaves:
+            leaf(value, pet_index, indices, out)
+        if child is not None:
+            if repeated:
+                for index, item in enumerate(value):
+                    _run(child, item, pet_index, (*indices, index), out)
+            else:
+                _run(child, value, pet_index, indices, out)
+
+
+def _sorted(found: list) -> list[Violation]:
+    if len(found) > 1:
+        found.sort(key=lambda item: item[:2])
+    return [violation for _, _, violation in found]
+
+
+# 可以在 `petcode.analytics.PetColumns` 上向量化的字段
+_SCALAR_COLUMNS = frozenset({'id', 'level', 'dv', 'nature', 'extra_hp'})
+_ABILITY_COLUMNS = ('evs', 'ability_total')
+_ABILITY_FIELDS = (
+    'hp',
+    'attack',
+    'defense',
+    'special_attack',
+    'special_defense',
+    'speed',
+)
+_RAGGED_COLUMNS = frozenset({'skills', 'pet_items'})
+
+
+class _VectorCheck(NamedTuple):
+    """向量化检查
+
+    Attributes:
+        kind: ``'row'`` 每只精灵一个值；``'element'`` 变长列的每个元素一个值；
+            ``'count'`` 变长列的元素数；``'unique'`` 变长列中重复的元素
+        column: 从 `PetColumns` 中取出数据的函数，
+            ``'row'`` 返回一维数组，其他返回 ``(RaggedArray, 值数组)``
+    """
+
+    kind: str
+    column: Callable
+    template: str
+
+
+def _vector_check(
+    rule: Rule, fields: tuple[FieldDescriptor, ...]
+) -> _VectorCheck | None:
+    names = tuple(field.name for field in fields)
+    constraint = rule.constraint
+    top = names[0]
+    value_constraint = isinstance(constraint, (Range, Allowed))
+
+    if value_constraint and len(names) == 1 and top in _SCALAR_COLUMNS:
+        return _VectorCheck('row', attrgetter(top), _template(fields, False))
+    if top in _ABILITY_COLUMNS:
+        if value_constraint and len(names) == 2:
+            column = _ABILITY_FIELDS.index(names[1])
+            return _VectorCheck(
+                'row',
+                lambda columns: getattr(columns, top)[:, column],
+                _template(fields, False),
+            )
+        if isinstance(constraint, Sum) and len(names) == 1:
+            return _VectorCheck(
+                'row',
+                lambda columns: getattr(columns, top).sum(axis=1),
+                _template(fields, False),
+            )
+        return None
+
+    if top in _RAGGED_COLUMNS and len(names) == 1:
+
+        def column(columns):
+            ragged = getattr(columns, top)
+            return ragged, ragged.values
+
+    elif top == 'effects' and len(names) == 2 and names[1] in ('id', 'status'):
+        position = 0 if names[1] == 'id' else 1
+
+        def column(columns):
+            return columns.effects, columns.effects.values[:, position]
+
+    elif top in ('effects', 'mintmarks') and len(names) == 1:
+        if isinstance(constraint, MaxCount) or (
+            top == 'mintmarks' and constraint == Unique(mintmark_id)
+        ):
+
+            def column(columns):
+                ragged = getattr(columns, top)
+                return ragged, ragged.values
+
+        else:
+            return None
+    else:
+        return None
+
+    if value_constraint:
+        # effects.status 的元素下标来自路径中的 effects
+        template = _template(fields, element=fields[-1].is_repeated)
+        return _VectorCheck('element', column, template)
+    if isinstance(constraint, MaxCount):
+        return _VectorCheck('count', column, _template(fields, False))
+    if isinstance(constraint, Unique) and (
+        constraint.key is None or top == 'mintmarks'
+    ):
+        return _VectorCheck('unique', column, _template(fields, True))
+    return None
+
+
+class RuleSet:
+    """编译后的规则集
+
+    Args:
+        rules: 规则列表，省略时使用 `DEFAULT_RULES`
+
+    Raises:
+        ValueError: 字段路径不存在，或约束不适用于该字段
+
+    Example:
+        >>> extra = Rule('pet_item_count', 'pet_items', MaxCount(3))
+        >>> rule_set = RuleSet([*DEFAULT_RULES, extra])
+        >>> results = rule_set.check_many(messages)
+    """
+
+    def __init__(self, rules: Iterable[Rule] | None = None):
+        self.rules: tuple[Rule, ...] = DEFAULT_RULES if rules is None else tuple(rules)
+        # 所有规则的路径合并为一棵字段树，公共前缀（例如 resistance）只访问一次
+        root = _Node()
+        # 无法向量化的检查单独组成一棵树，供 check_columns 逐只精灵检查
+        scalar_root: _Node | None = None
+        vectors: list[tuple[int, Rule, _VectorCheck | None]] = []
+        for rule in self.rules:
+            for fields in _resolve(PetInfo.DESCRIPTOR, rule.path.split('.'), rule.path):
+                position = len(vectors)
+                root.insert(fields, _compile(rule, fields, position), rule)
+                vector = _vector_check(rule, fields)
+                if vector is None:
+                    if scalar_root is None:
+                        scalar_root = _Node()
+                    scalar_root.insert(fields, _compile(rule, fields, position), rule)
+                vectors.append((position, rule, vector))
+        self._tree = root.freeze()
+        self._scalar_tree = None if scalar_root is None else scalar_root.freeze()
+        self._vectors = tuple(vectors)
+
+    def check_pet(self, pet: PetInfo, pet_index: int = 0) -> list[Violation]:
+        """检查一只精灵，``pet_index`` 用于生成路径"""
+        found: list = []
+        _run(self._tree, pet, pet_index, (), found)
+        return _sorted(found)
+
+    def check(self, message: PetCodeMessage) -> list[Violation]:
+        """检查消息中的所有精灵，结果按精灵、规则和元素的顺序排列"""
+        tree = self._tree
+        violations: list[Violation] = []
+        for pet_index, pet in enumerate(message.pets):
+            found: list = []
+            _run(tree, pet, pet_index, (), found)
+            if found:
+                violations.extend(_sorted(found))
+        return violations
+
+    def check_many(self, messages: Iterable[PetCodeMessage]) -> list[list[Violation]]:
+        """批量检查，结果顺序与输入一致"""
+        check = self.check
+        return [check(message) for message in messages]
+
+    def check_columns(
+        self,
+        columns,
+        messages: Sequence[PetCodeMessage] | None = None,
+        *,
+        skip_unsupported: bool = False,
+    ) -> list[tuple[int, Violation]]:
+        """在 `petcode.analytics.PetColumns` 上向量化检查，需要安装 NumPy
+
+        列式数据只包含精灵的数值字段、学习力、能力值、技能、道具、特效的
+        id/status 和刻印 ID，作用于其他字段的规则（例如默认规则中的抗性和
+        能力加成）无法向量化。传入 ``messages`` 时这些规则逐只精灵检查，
+        结果与向量化检查的结果合并。
+
+        Args:
+            columns: `petcode.analytics.messages_to_columns` 等函数的结果
+            messages: 生成 ``columns`` 的消息，``messages[i]`` 为
+                ``columns.message_index`` 中位置 ``i`` 的消息
+            skip_unsupported: 没有传入 ``messages`` 时是否跳过无法向量化的规则，
+                默认抛出 ValueError
+
+        Returns:
+            ``(消息位置, 结果)`` 列表，消息位置即 ``columns.message_index``，
+            同一条消息的结果与 `check` 的顺序相同
+        """
+        scalar_tree = self._scalar_tree
+        if scalar_tree is not None and messages is None and not skip_unsupported:
+            unsupported = sorted(
+                {rule.name for _, rule, vector in self._vectors if vector is None}
+            )
+            raise ValueError(
+                f'Rules not supported on columns: {", ".join(unsupported)}; '
+                f'pass the messages to check them one by one'
+            )
+        import numpy as np
+
+        message_index = columns.message_index
+        pet_index = (
+            np.arange(len(message_index))
+            - np.searchsorted(message_index, message_index)
+        ).tolist()
+        message_index = message_index.tolist()
+
+        found = []
+        for position, rule, vector in self._vectors:
+            if vector is None:
+                continue
+            for row, element, value in _run_vector(
+                vector, rule.constraint, columns, np
+            ):
+                index = pet_index[row]
+                if element is None:
+                    path, key = vector.template.format(index), ()
+                else:
+                    path, key = vector.template.format(index, element), (element,)
+                violation = Violation(rule.name, path, value, rule.constraint)
+                found.append((message_index[row], index, position, key, violation))
+        if scalar_tree is not None and messages is not None:
+            for message_position in dict.fromkeys(message_index):
+                pets = messages[message_position].pets
+                for pet_index, pet in enumerate(pets):
+                    out: list = []
+                    _run(scalar_tree, pet, pet_index, (), out)
+                    found.extend(
+                        (message_position, pet_index, position, key, violation)
+                        for position, key, violation in out
+                    )
+        found.sort(key=lambda item: item[:4])
+        return [(item[0], item[4]) for item in found]
+
+
+def _vector_mask(constraint: Range | Allowed, values, np):
+    """返回违反约束的元素的掩码"""
+    if isinstance(constraint, Allowed):
+        return ~np.isin(values, np.fromiter(constraint.values, dtype=np.int64))
+    mask = np.zeros(len(values), dtype=bool)
+    if constraint.min is not None:
+        mask |= values < constraint.min
+    if constraint.max is not None:
+        mask |= values > constraint.max
+    return mask
+
+
+def _run_vector(
+    vector: _VectorCheck, constraint: Constraint, columns, np
+) -> Iterator[tuple[int, int, Any]]:
+    """返回 ``(行号, 元素下标, 值)``，``'row'`` 和 ``'count'`` 的元素下标为 None"""
+    if vector.kind == 'row':
+        values = vector.column(columns)
+        if isinstance(constraint, Sum):
+            mask = values > constraint.max
+        else:
+            mask = _vector_mask(constraint, values, np)  # type: ignore[arg-type]
+        rows = np.flatnonzero(mask)
+        return zip(rows.tolist(), [None] * len(rows), values[rows].tolist())
+
+    ragged, values = vector.column(columns)
+    if vector.kind == 'count':
+        lengths = ragged.lengths()
+        rows = np.flatnonzero(lengths > constraint.max)  # type: ignore[union-attr]
+        return zip(rows.tolist(), [None] * len(rows), lengths[rows].tolist())
+
+    row_index = ragged.row_index()
+    if vector.kind == 'element':
+        positions = np.flatnonzero(_vector_mask(constraint, values, np))  # type: ignore[arg-type]
+    else:
+        # 按 (行, 值, 位置) 排序，与前一个元素的行和值都相同的元素是重复的
+        order = np.lexsort((np.arange(len(values)), values, row_index))
+        sorted_rows, sorted_values = row_index[order], values[order]
+        duplicate = (sorted_rows[1:] == sorted_rows[:-1]) & (
+            sorted_values[1:] == sorted_values[:-1]
+        )
+        positions = np.sort(order[1:][duplicate])
+    rows = row_index[positions]
+    elements = positions - ragged.offsets[rows]
+    return zip(rows.tolist(), elements.tolist(), values[positions].tolist())
+
+
+DEFAULT_RULE_SET = RuleSet()
+
+
+def check(message: PetCodeMessage) -> list[Violation]:
+    """使用 `DEFAULT_RULES` 检查消息"""
+    return DEFAULT_RULE_SET.check(message)
+
+
+def check_many(messages: Iterable[PetCodeMessage]) -> list[list[Violation]]:
+    """使用 `DEFAULT_RULES` 批量检查消息"""
+    return DEFAULT_RULE_SET.check_many(messages)
+
+
+__all__ = [
+    'DEFAULT_RULES',
+    'DEFAULT_RULE_SET',
+    'Allowed',
+    'Constraint',
+    'MaxCount',
+    'Range',
+    'Rule',
+    'RuleSet',
+    'Sum',
+    'Unique',
+    'Violation',
+    'check',
+    'check_many',
+    'mintmark_id',
+]
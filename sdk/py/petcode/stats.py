@@ -0,0 +1,328 @@
+"""根据精灵的培养数据重新计算能力值
+
+`PetInfo.ability_total` 由导出工具填写，不同工具的算法并不一致。本模块根据种族值、
+等级、个体值、性格、学习力、刻印和额外加成重新计算六项能力值，用于审核和规范化上传的配置。
+
+计算公式（每一步都向下取整）::
+
+    基础 = (种族值 * 2 + 个体值 + 学习力 // 4) * 等级 // 100
+    体力 = 基础 + 等级 + 10
+    其他 = (基础 + 5) * 性格修正 // 100
+    结果 = 上述结果 + 刻印数值
+    # 按 bonus_order 依次结算每一组加成类型
+    结果 = (结果 + 该组加成固定值) * (100 + 该组加成百分比) // 100
+
+体力最后再加上 `PetInfo.extra_hp`。刻印数值：技能刻印为 0；能力刻印和全效刻印
+按 ID 查询；全能刻印设置了 ``ability`` 时使用该数值，否则按 ID 和等级查询。
+
+游戏没有公开各类加成（`PetAbilityBonus.Type`）的结算顺序，因此顺序由
+`StatProvider.bonus_order` 显式给出：每一组加成的固定值先相加，再乘以该组百分比之和，
+组与组之间依次结算，不在任何一组中的加成类型不参与计算。默认的
+`DEFAULT_BONUS_ORDER` 将所有类型合为一组同时结算。
+
+种族值、性格修正、刻印数值和加成顺序由 `StatProvider` 提供，
+`TableProvider` 是基于 dict 的实现。
+批量计算（`compute_ability_totals`）需要安装 NumPy。
+"""
+
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from operator import add
+from typing import Protocol
+
+from seerbp.petcode.v1.message_pb2 import PetAbilityBonus, PetInfo
+
+from .view import AbilityView
+
+_FIELDS = AbilityView._fields
+_ZERO = AbilityView(0, 0, 0, 0, 0, 0)
+
+BonusOrder = Sequence[Iterable[int]]
+"""加成的结算顺序，每一组为同时结算的 `PetAbilityBonus.Type`"""
+
+DEFAULT_BONUS_ORDER: tuple[frozenset[int], ...] = (
+    frozenset(PetAbilityBonus.Type.values()),
+)
+"""默认的加成顺序：所有类型的加成合为一组同时结算"""
+
+
+class StatProvider(Protocol):
+    """能力值计算所需的数据
+
+    各方法返回按 hp/attack/defense/special_attack/special_defense/speed
+    顺序排列的六个整数，数据不存在时抛出 KeyError。
+
+    可以提供 ``bonus_order`` 属性（`BonusOrder`）指定加成的结算顺序，
+    没有该属性时使用 `DEFAULT_BONUS_ORDER`。
+    """
+
+    def base_stats(self, pet_id: int) -> Sequence[int]:
+        """精灵的种族值"""
+        ...
+
+    def nature_modifiers(self, nature: int) -> Sequence[int]:
+        """性格修正的百分比，例如 ``(100, 110, 90, 100, 100, 100)``，体力一项不使用"""
+        ...
+
+    def mintmark_ability(self, mintmark_id: int, level: int) -> Sequence[int]:
+        """刻印提供的能力值，能力刻印和全效刻印的 ``level`` 为 0"""
+        ...
+
+
+class TableProvider:
+    """基于 dict 的 `StatProvider`
+
+    Args:
+        base_stats: 精灵 ID 到种族值
+        natures: 性格 ID 到性格修正的百分比
+        mintmarks: 刻印 ID（或全能刻印的 ``(ID, 等级)``）到刻印提供的能力值，
+            ``(ID, 等级)`` 不存在时使用 ID 对应的数值
+        bonus_order: 加成的结算顺序，见 `BonusOrder`
+
+    Example:
+        >>> provider = TableProvider(
+        ...     base_stats={3842: (100, 120, 80, 90, 85, 110)},
+        ...     natures={1: (100, 110, 90, 100, 100, 100)},
+        ... )
+    """
+
+    def __init__(
+        self,
+        base_stats: Mapping[int, Sequence[int]],
+        natures: Mapping[int, Sequence[int]],
+        mintmarks: Mapping[int | tuple[int, int], Sequence[int]] | None = None,
+        *,
+        bonus_order: BonusOrder = DEFAULT_BONUS_ORDER,
+    ):
+        self._base_stats = base_stats
+        self._natures = natures
+        self._mintmarks = {} if mintmarks is None else mintmarks
+        self.bonus_order = bonus_order
+
+    def base_stats(self, pet_id: int) -> Sequence[int]:
+        return self._base_stats[pet_id]
+
+    def nature_modifiers(self, nature: int) -> Sequence[int]:
+        return self._natures[nature]
+
+    def mintmark_ability(self, mintmark_id: int, level: int) -> Sequence[int]:
+        value = self._mintmarks.get((mintmark_id, level))
+        if value is None:
+            value = self._mintmarks[mintmark_id]
+        return value
+
+
+def _bonus_stages(order: BonusOrder) -> dict[int, int]:
+    """加成类型到结算阶段，阶段 0 为刻印，加成从阶段 1 开始"""
+    stages: dict[int, int] = {}
+    for stage, types in enumerate(order, 1):
+        for bonus_type in types:
+            if stages.setdefault(bonus_type, stage) != stage:
+                raise ValueError(
+                    f'Bonus type {bonus_type} appears in more than one group'
+                )
+    return stages
+
+
+class _Extras:
+    """刻印数值和额外加成
+
+    每种不同的刻印或加成只解析一次，结果为一行 ``12 * stage_count`` 个整数，
+    每个结算阶段占 12 个（六项固定值和六项百分比），只有所在阶段的部分不为 0。
+    战队、年费等加成在不同精灵之间大多相同，按序列化结果查找比逐个字段读取快。
+    """
+
+    def __init__(self, provider: StatProvider):
+        self.provider = provider
+        self.stages = _bonus_stages(
+            getattr(provider, 'bonus_order', DEFAULT_BONUS_ORDER)
+        )
+        self.stage_count = max(self.stages.values(), default=0) + 1
+        self.rows: list[tuple[int, ...]] = []
+        self._index: dict = {}
+
+    def _row(
+        self,
+        key,
+        values: Sequence[int],
+        percents: Sequence[int] = _ZERO,
+        stage: int = 0,
+    ) -> int:
+        index = self._index[key] = len(self.rows)
+        row = [0] * (12 * self.stage_count)
+        row[12 * stage : 12 * stage + 12] = (*values, *percents)
+        self.rows.append(tuple(row))
+        return index
+
+    def pet_rows(self, pet: PetInfo) -> list[int]:
+        rows = []
+        for mintmark in pet.mintmarks:
+            kind = mintmark.WhichOneof('mintmark')
+            if kind is None or kind == 'skill':
+                continue
+            if kind == 'universal' and mintmark.universal.HasField('ability'):
+                ability = mintmark.universal.ability
+                key = ('ability', ability.SerializeToString())
+                index = self._index.get(key)
+                if index is None:
+                    index = self._row(key, AbilityView.from_proto(ability))
+            else:
+                value = getattr(mintmark, kind)
+                key = (value.id, value.level if kind == 'universal' else 0)
+                index = self._index.get(key)
+                if index is None:
+                    index = self._row(key, self.provider.mintmark_ability(*key))
+            rows.append(index)
+        for bonus in pet.ability_bonus:
+            key = ('bonus', bonus.SerializeToString())
+            index = self._index.get(key)
+            if index is None:
+                stage = self.stages.get(bonus.type)
+                if stage is None:
+                    # 不在 bonus_order 中的加成类型不参与计算
+                    index = self._index[key] = -1
+                else:
+                    extras = [getattr(bonus.value, name) for name in _FIELDS]
+                    index = self._row(
+                        key,
+                        [extra.value for extra in extras],
+                        [extra.percent for extra in extras],
+                        stage,
+                    )
+            if index >= 0:
+                rows.append(index)
+        return rows
+
+    def total(self, pet: PetInfo) -> list[int]:
+        total = [0] * (12 * self.stage_count)
+        for index in self.pet_rows(pet):
+            total = list(map(add, total, self.rows[index]))
+        return total
+
+
+def compute_ability_total(pet: PetInfo, provider: StatProvider) -> AbilityView:
+    """计算一只精灵的能力值
+
+    Raises:
+        KeyError: ``provider`` 中没有该精灵、性格或刻印的数据
+    """
+    return _compute(pet, provider, _Extras(provider))
+
+
+def _compute(pet: PetInfo, provider: StatProvider, extras: _Extras) -> AbilityView:
+    base = provider.base_stats(pet.id)
+    modifiers = provider.nature_modifiers(pet.nature)
+    extra = extras.total(pet)
+    level, dv = pet.level, pet.dv
+    evs = AbilityView.from_proto(pet.evs)
+    values = []
+    for index in range(6):
+        part = (base[index] * 2 + dv + evs[index] // 4) * level // 100
+        if index == 0:
+            value = part + level + 10
+        else:
+            value = (part + 5) * modifiers[index] // 100
+        for offset in range(index, len(extra), 12):
+            value = (value + extra[offset]) * (100 + extra[offset + 6]) // 100
+        values.append(value)
+    values[0] += pet.extra_hp
+    return AbilityView(*values)
+
+
+def compute_ability_totals(pets: Iterable[PetInfo], provider: StatProvider):
+    """批量计算能力值，需要安装 NumPy
+
+    只有读取字段在 Python 中逐只精灵进行，刻印和加成的求和以及公式都在 NumPy
+    数组上一次性计算；种族值、性格修正和刻印数值对每个不同的 ID 只查询一次。
+
+    Returns:
+        形状为 ``(n, 6)`` 的 int64 数组，列顺序与 `AbilityView` 相同
+
+    Raises:
+        KeyError: ``provider`` 中没有某只精灵、性格或刻印的数据
+    """
+    import numpy as np
+
+    ids, levels, dvs, natures, extra_hp = (array('q') for _ in range(5))
+    evs = array('q')
+    owners, rows = array('q'), array('q')
+    extras = _Extras(provider)
+    count = 0
+    for count, pet in enumerate(pets, 1):
+        ids.append(pet.id)
+        levels.append(pet.level)
+        dvs.append(pet.dv)
+        natures.append(pet.nature)
+        extra_hp.append(pet.extra_hp)
+        evs.extend(AbilityView.from_proto(pet.evs))
+        pet_rows = extras.pet_rows(pet)
+        owners.extend([count - 1] * len(pet_rows))
+        rows.extend(pet_rows)
+    if not count:
+        return np.zeros((0, 6), dtype=np.int64)
+
+    unique_ids, id_index = np.unique(np.frombuffer(ids, np.int64), return_inverse=True)
+    base = np.array(
+        [provider.base_stats(pet_id) for pet_id in unique_ids.tolist()], dtype=np.int64
+    )[id_index]
+    unique_natures, nature_index = np.unique(
+        np.frombuffer(natures, np.int64), return_inverse=True
+    )
+    modifiers = np.array(
+        [provider.nature_modifiers(nature) for nature in unique_natures.tolist()],
+        dtype=np.int64,
+    )[nature_index]
+    extra = np.zeros((count, 12 * extras.stage_count), dtype=np.int64)
+    if rows:
+        table = np.array(extras.rows, dtype=np.int64)
+        np.add.at(
+            extra, np.frombuffer(owners, np.int64), table[np.frombuffer(rows, np.int64)]
+        )
+
+    level = np.frombuffer(levels, np.int64)[:, None]
+    dv = np.frombuffer(dvs, np.int64)[:, None]
+    part = (
+        (base * 2 + dv + np.frombuffer(evs, np.int64).reshape(-1, 6) // 4)
+        * level
+        // 100
+    )
+    values = (part + 5) * modifiers // 100
+    values[:, 0] = part[:, 0] + level[:, 0] + 10
+    for offset in range(0, extra.shape[1], 12):
+        values = (
+            (values + extra[:, offset : offset + 6])
+            * (100 + extra[:, offset + 6 : offset + 12])
+            // 100
+        )
+    values[:, 0] += np.frombuffer(extra_hp, np.int64)
+    return values
+
+
+def normalize_ability_totals(
+    pets: Iterable[PetInfo], provider: StatProvider
+) -> list[int]:
+    """将 ``ability_total`` 替换为计算结果，返回被修改的精灵的位置
+
+    Raises:
+        KeyError: ``provider`` 中没有某只精灵、性格或刻印的数据，此时不会修改任何精灵
+    """
+    pets = list(pets)
+    extras = _Extras(provider)
+    computed = [_compute(pet, provider, extras) for pet in pets]
+    changed = []
+    for index, (pet, value) in enumerate(zip(pets, computed)):
+        if AbilityView.from_proto(pet.ability_total) != value:
+            pet.ability_total.CopyFrom(value.to_proto())
+            changed.append(index)
+    return changed
+
+
+__all__ = [
+    'DEFAULT_BONUS_ORDER',
+    'BonusOrder',
+    'StatProvider',
+    'TableProvider',
+    'compute_ability_total',
+    'compute_ability_totals',
+    'normalize_ability_totals',
+]
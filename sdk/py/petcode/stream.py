@@ -0,0 +1,175 @@
+"""流式解码分享码文件
+
+`iter_decode` 读取每行一个 base64 分享码的文本文件，支持 gzip 压缩的文件，
+文件按块惰性读取，内存占用与文件大小无关。
+
+`iter_binary_records` 读取由多条 `to_binary` 结果直接拼接而成的二进制数据，
+文件通过 ``mmap`` 映射，不会整体读入内存。
+"""
+
+from collections.abc import Iterator
+from contextlib import ExitStack
+import gzip
+import io
+import mmap
+import os
+from typing import IO
+
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+from . import from_base64
+from .codec import GZIP_MAGIC, BinaryData, decompress_record
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+DEFAULT_MAX_LINE_LENGTH = 64 * 1024
+
+
+class LineTooLongError(ValueError):
+    """单行长度超过 `max_line_length` 限制"""
+
+
+class _EncodedText(io.RawIOBase):
+    """将没有底层二进制缓冲区的文本流（例如 ``io.StringIO``）按块编码为 UTF-8"""
+
+    def __init__(self, source: IO[str]):
+        self._source = source
+        self._pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._pending:
+            self._pending = self._source.read(len(buffer)).encode('utf-8')
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _open_binary(
+    source: str | os.PathLike | IO[bytes] | IO[str],
+    stack: ExitStack,
+    buffer_size: int,
+) -> IO[bytes]:
+    if isinstance(source, (str, os.PathLike)):
+        raw: IO[bytes] = stack.enter_context(open(source, 'rb', buffering=buffer_size))
+    elif isinstance(source, io.TextIOBase):
+        # 文本流（例如 sys.stdin）直接读取其底层的二进制缓冲区，
+        # 没有底层缓冲区时读取文本后重新编码
+        buffer = getattr(source, 'buffer', None)
+        raw = _EncodedText(source) if buffer is None else buffer  # type: ignore[assignment]
+    else:
+        raw = source  # type: ignore[assignment]
+
+    if not isinstance(raw, io.BufferedReader):
+        raw = io.BufferedReader(raw, buffer_size=buffer_size)  # type: ignore[arg-type]
+    if raw.peek(len(GZIP_MAGIC))[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+        raw = stack.enter_context(gzip.GzipFile(fileobj=raw, mode='rb'))
+    return raw
+
+
+def iter_decode(
+    source: str | os.PathLike | IO[bytes] | IO[str],
+    *,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+) -> Iterator[tuple[int, PetCodeMessage | Exception]]:
+    """逐行解码文件中的分享码
+
+    Args:
+        source: 文件路径或已打开的文件对象；gzip 压缩的输入会根据文件头自动识别
+        buffer_size: 读取缓冲区大小
+        max_line_length: 单行最大字节数，超过该长度的行会以 `LineTooLongError` 报告，
+            避免异常输入导致单行占用过多内存
+
+    Yields:
+        ``(line_no, result)`` 元组，``line_no`` 从 1 开始；
+        ``result`` 为解码后的消息，解码失败时为对应的异常对象。空行会被跳过。
+
+    Example:
+        >>> for line_no, result in iter_decode('codes.txt.gz'):
+        ...     if isinstance(result, Exception):
+        ...         print(f'line {line_no}: {result}')
+    """
+    with ExitStack() as stack:
+        reader = _open_binary(source, stack, buffer_size)
+        readline = reader.readline
+        line_no = 0
+        while line := readline(max_line_length + 1):
+            line_no += 1
+            if len(line) > max_line_length and not line.endswith(b'\n'):
+                # 丢弃该行的剩余部分，保持缓冲区大小有界
+                while (rest := readline(max_line_length)) and not rest.endswith(b'\n'):
+                    pass
+                yield (
+                    line_no,
+                    LineTooLongError(f'line {line_no} exceeds {max_line_length} bytes'),
+                )
+                continue
+
+            line = line.strip()
+            if not line:
+                continue
+            result: PetCodeMessage | Exception
+            try:
+                result = from_base64(line.decode('ascii'))
+            except Exception as e:
+                result = e
+            yield line_no, result
+
+
+def _iter_records(data: BinaryData) -> Iterator[tuple[int, PetCodeMessage]]:
+    view = memoryview(data)
+    parse = PetCodeMessage.FromString
+    offset = 0
+    try:
+        while offset < len(view):
+            payload, end = decompress_record(view, offset)
+            yield offset, parse(payload)
+            offset = end
+    finally:
+        view.release()
+
+
+def iter_binary_records(
+    source: BinaryData | str | os.PathLike,
+) -> Iterator[tuple[int, PetCodeMessage]]:
+    """逐条解码拼接在一起的二进制数据
+
+    每条数据为 `to_binary` 的结果，可以使用 gzip、deflate 等自带结束标记的编解码器，
+    不同记录的编解码器可以不同；``none`` 编解码器的数据无法确定边界，不能使用。
+
+    Args:
+        source: 文件路径，或 ``bytes``/``memoryview``/``mmap`` 等缓冲区对象；
+            文件会通过 ``mmap`` 映射后读取
+
+    Yields:
+        ``(offset, message)`` 元组，``offset`` 为该条数据在输入中的起始位置
+
+    Raises:
+        ValueError: 数据不完整或无法识别的头部
+        zlib.error: 压缩数据损坏
+        google.protobuf.message.DecodeError: 消息数据损坏
+
+    Example:
+        >>> with open('codes.bin', 'ab') as f:
+        ...     f.write(to_binary(message))
+        >>> for offset, message in iter_binary_records('codes.bin'):
+        ...     print(offset, message.pets[0].id)
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        yield from _iter_records(source)
+        return
+    with open(source, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from _iter_records(mapped)
+
+
+__all__ = [
+    'LineTooLongError',
+    'iter_binary_records',
+    'iter_decode',
+]
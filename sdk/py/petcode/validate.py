@@ -0,0 +1,184 @@
+"""带限制的解码，尽早拒绝异常输入
+
+`petcode.from_base64` 会对任意输入完整地执行 base64 解码、解压和解析，
+恶意构造的压缩数据（压缩炸弹）还可能占用大量内存。本模块按开销从低到高依次检查：
+
+1. base64 的长度和字符集（不分配内存）
+2. 编解码器头部（gzip 魔数或已注册的编解码器 ID）
+3. 流式解压，输出超过 ``max_decompressed_size`` 时立即停止；
+   数据不完整或末尾有多余数据时同样拒绝
+4. 解析后检查精灵、技能、特效和刻印的数量
+
+解压后的数据已被限制在 ``max_decompressed_size`` 以内，解析的开销也随之有界。
+
+默认限制远高于游戏中实际可能出现的数据，一般无需调整。
+"""
+
+import binascii
+from dataclasses import dataclass
+import re
+import zlib
+
+from google.protobuf.message import DecodeError
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+from .codec import GZIP_MAGIC, BinaryData, IdentityCodec, detect_codec
+
+
+class ValidationError(ValueError):
+    """输入不符合 `Limits` 的限制或格式不正确"""
+
+
+@dataclass(frozen=True)
+class Limits:
+    """解码时的各项限制
+
+    Attributes:
+        max_base64_length: base64 字符串的最大长度（不含首尾空白）
+        max_compressed_size: 压缩数据的最大字节数
+        max_decompressed_size: 解压后数据的最大字节数
+        max_pets: 每条消息的最大精灵数
+        max_skills: 每只精灵的最大技能数
+        max_effects: 每只精灵的最大特效数
+        max_mintmarks: 每只精灵的最大刻印数
+    """
+
+    max_base64_length: int = 16 * 1024
+    max_compressed_size: int = 12 * 1024
+    max_decompressed_size: int = 64 * 1024
+    max_pets: int = 16
+    max_skills: int = 16
+    max_effects: int = 32
+    max_mintmarks: int = 16
+
+
+DEFAULT_LIMITS = Limits()
+
+_BASE64 = re.compile(rb'[A-Za-z0-9+/]*={0,2}')
+
+
+def check_base64(base64_str: str | bytes, limits: Limits = DEFAULT_LIMITS) -> bytes:
+    """检查 base64 字符串的长度和字符集，返回解码后的数据"""
+    data = base64_str.strip()
+    if len(data) > limits.max_base64_length:
+        raise ValidationError(
+            f'base64 length {len(data)} exceeds {limits.max_base64_length}'
+        )
+    if isinstance(data, str):
+        # 非 ASCII 字符被替换为 '?'，随后的字符集检查会拒绝
+        data = data.encode('ascii', 'replace')
+    if not data:
+        raise ValidationError('Empty data')
+    if len(data) % 4 or _BASE64.fullmatch(data) is None:
+        raise ValidationError('Invalid base64')
+    try:
+        return binascii.a2b_base64(data)
+    except binascii.Error as e:
+        raise ValidationError('Invalid base64') from e
+
+
+def _decompress_stream(codec, data: memoryview, limit: int) -> bytes:
+    # gzip 数据可以由多个成员拼接而成，与 codec.decompress 一致
+    output = b''
+    while True:
+        decompressor = codec.decompressobj()
+        output += decompressor.decompress(data, limit - len(output) + 1)
+        if len(output) > limit or decompressor.unconsumed_tail:
+            raise ValidationError(f'Decompressed data exceeds {limit} bytes')
+        if not decompressor.eof:
+            raise ValidationError('Truncated compressed data')
+        data = decompressor.unused_data
+        if not data:
+            return output
+        if codec.codec_id is not None or data[:2] != GZIP_MAGIC:
+            raise ValidationError('Unexpected data after compressed stream')
+
+
+def decompress_limited(binary: BinaryData, limits: Limits = DEFAULT_LIMITS) -> bytes:
+    """识别编解码器并解压，输出超过 ``max_decompressed_size`` 时立即停止"""
+    if len(binary) > limits.max_compressed_size:
+        raise ValidationError(
+            f'Compressed size {len(binary)} exceeds {limits.max_compressed_size}'
+        )
+    try:
+        codec = detect_codec(binary)
+    except ValueError as e:
+        raise ValidationError(str(e)) from e
+    limit = limits.max_decompressed_size
+    with memoryview(binary) as view:
+        payload = view if codec.codec_id is None else view[1:]
+        if isinstance(codec, IdentityCodec):
+            if len(payload) > limit:
+                raise ValidationError(f'Decompressed data exceeds {limit} bytes')
+            return bytes(payload)
+        try:
+            codec.decompressobj()
+        except ValueError:
+            # 无法流式解压的自定义编解码器，只能在解压后检查大小
+            output = codec.decompress(payload)  # type: ignore[arg-type]
+            if len(output) > limit:
+                raise ValidationError(
+                    f'Decompressed data exceeds {limit} bytes'
+                ) from None
+            return output
+        try:
+            return _decompress_stream(codec, payload, limit)
+        except zlib.error as e:
+            raise ValidationError(f'Corrupted compressed data: {e}') from None
+
+
+def check_message(message: PetCodeMessage, limits: Limits = DEFAULT_LIMITS):
+    """检查消息中精灵、技能、特效和刻印的数量"""
+    if len(message.pets) > limits.max_pets:
+        raise ValidationError(
+            f'{len(message.pets)} pets exceed the limit of {limits.max_pets}'
+        )
+    for index, pet in enumerate(message.pets):
+        for name, limit in (
+            ('skills', limits.max_skills),
+            ('effects', limits.max_effects),
+            ('mintmarks', limits.max_mintmarks),
+        ):
+            count = len(getattr(pet, name))
+            if count > limit:
+                raise ValidationError(
+                    f'pets[{index}] has {count} {name}, exceeding the limit of {limit}'
+                )
+
+
+def from_binary(binary: BinaryData, limits: Limits = DEFAULT_LIMITS) -> PetCodeMessage:
+    """带限制的 `petcode.from_binary`
+
+    Raises:
+        ValidationError: 输入超出限制、格式不正确或数据损坏
+    """
+    data = decompress_limited(binary, limits)
+    try:
+        message = PetCodeMessage.FromString(data)
+    except DecodeError as e:
+        raise ValidationError(f'Invalid message: {e}') from None
+    check_message(message, limits)
+    return message
+
+
+def from_base64(
+    base64_str: str | bytes, limits: Limits = DEFAULT_LIMITS
+) -> PetCodeMessage:
+    """带限制的 `petcode.from_base64`
+
+    Raises:
+        ValidationError: 输入超出限制、格式不正确或数据损坏
+    """
+    return from_binary(check_base64(base64_str, limits), limits)
+
+
+__all__ = [
+    'DEFAULT_LIMITS',
+    'Limits',
+    'ValidationError',
+    'check_base64',
+    'check_message',
+    'decompress_limited',
+    'from_base64',
+    'from_binary',
+]
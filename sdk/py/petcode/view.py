@@ -0,0 +1,308 @@
+"""PetCodeMessage 的只读视图
+
+protobuf 消息的每次属性访问都要经过描述符查找，在只读取少数字段的渲染路径上开销明显。
+本模块提供基于元组（NamedTuple）的不可变视图，一次性从消息中提取字段，
+之后的属性访问与普通元组相同，并且视图可哈希，可作为 dict/set 的键。
+"""
+
+from typing import NamedTuple
+
+from seerbp.petcode.v1.message_pb2 import (
+    MintmarkInfo,
+    PetAbilityValue,
+    PetCodeMessage,
+    PetInfo,
+)
+
+
+class AbilityView(NamedTuple):
+    """`PetAbilityValue` 的只读视图"""
+
+    hp: int
+    attack: int
+    defense: int
+    special_attack: int
+    special_defense: int
+    speed: int
+
+    @classmethod
+    def from_proto(cls, value: PetAbilityValue) -> 'AbilityView':
+        return cls(
+            value.hp,
+            value.attack,
+            value.defense,
+            value.special_attack,
+            value.special_defense,
+            value.speed,
+        )
+
+    def to_proto(self) -> PetAbilityValue:
+        return PetAbilityValue(**self._asdict())
+
+
+class EffectView(NamedTuple):
+    """`PetInfo.Effect` 的只读视图"""
+
+    id: int
+    status: int
+    args: tuple[int, ...]
+
+    @classmethod
+    def from_proto(cls, effect: PetInfo.Effect) -> 'EffectView':
+        return cls(effect.id, effect.status, tuple(effect.args))
+
+    def to_proto(self) -> PetInfo.Effect:
+        return PetInfo.Effect(id=self.id, status=self.status, args=self.args)
+
+
+class MintmarkView(NamedTuple):
+    """`MintmarkInfo` 的只读视图
+
+    Attributes:
+        type: 刻印类型，取值为 ``'skill'``/``'ability'``/``'universal'``/``'quanxiao'``
+            或 None（未设置类型的空刻印）
+        id: 刻印 ID
+        level: 全能刻印等级
+        gem_id: 全能刻印的宝石 ID，没有宝石时为 None
+        bind_skill_id: 宝石绑定的技能 ID，没有宝石时为 None
+        ability: 全能刻印的自定义能力值，未设置时为 None
+        skill_mintmark_id: 全效刻印的技能刻印 ID
+    """
+
+    type: str | None
+    id: int
+    level: int = 0
+    gem_id: int | None = None
+    bind_skill_id: int | None = None
+    ability: AbilityView | None = None
+    skill_mintmark_id: int = 0
+
+    @classmethod
+    def from_proto(cls, mintmark: MintmarkInfo) -> 'MintmarkView':
+        type_ = mintmark.WhichOneof('mintmark')
+        if type_ is None:
+            return cls(None, 0)
+        if type_ == 'universal':
+            universal = mintmark.universal
+            gem = universal.gem if universal.HasField('gem') else None
+            return cls(
+                type_,
+                universal.id,
+                level=universal.level,
+                gem_id=gem.gem_id if gem is not None else None,
+                bind_skill_id=gem.bind_skill_id if gem is not None else None,
+                ability=(
+                    AbilityView.from_proto(universal.ability)
+                    if universal.HasField('ability')
+                    else None
+                ),
+            )
+        if type_ == 'quanxiao':
+            return cls(
+                type_,
+                mintmark.quanxiao.id,
+                skill_mintmark_id=mintmark.quanxiao.skill_mintmark_id,
+            )
+        if type_ == 'skill':
+            return cls(type_, mintmark.skill.id)
+        if type_ == 'ability':
+            return cls(type_, mintmark.ability.id)
+        raise ValueError(f'Unknown mintmark type: {type_}')
+
+    def to_proto(self) -> MintmarkInfo:
+        if self.type is None:
+            return MintmarkInfo()
+        if self.type == 'universal':
+            gem = None
+            if self.gem_id is not None or self.bind_skill_id is not None:
+                gem = MintmarkInfo.Universal.GemItem(
+                    gem_id=self.gem_id or 0, bind_skill_id=self.bind_skill_id or 0
+                )
+            return MintmarkInfo(
+                universal=MintmarkInfo.Universal(
+                    id=self.id,
+                    level=self.level,
+                    gem=gem,
+                    ability=self.ability.to_proto() if self.ability else None,
+                )
+            )
+        if self.type == 'quanxiao':
+            return MintmarkInfo(
+                quanxiao=MintmarkInfo.Quanxiao(
+                    id=self.id, skill_mintmark_id=self.skill_mintmark_id
+                )
+            )
+        if self.type == 'skill':
+            return MintmarkInfo(skill=MintmarkInfo.Skill(id=self.id))
+        if self.type == 'ability':
+            return MintmarkInfo(ability=MintmarkInfo.Ability(id=self.id))
+        raise ValueError(f'Unknown mintmark type: {self.type}')
+
+
+# PetView 展开的字段，其余字段（以及未知字段）保存在 PetView.rest 中
+_PET_VIEW_FIELDS = (
+    'id',
+    'level',
+    'dv',
+    'nature',
+    'skills',
+    'extra_hp',
+    'effects',
+    'mintmarks',
+    'is_awaken',
+    'pet_items',
+    'skin_id',
+)
+
+
+class PetView(NamedTuple):
+    """`PetInfo` 的只读视图
+
+    常用字段被展开为元组字段；``resistance`` 和 ``ability_bonus`` 等较少读取的字段
+    不展开，它们的序列化数据保存在 ``rest`` 中，需要时可通过 `to_proto` 还原。
+    `to_proto` 根据元组字段构造消息，``_replace`` 修改后的视图同样可以还原。
+    """
+
+    id: int
+    level: int
+    dv: int
+    nature: int
+    evs: AbilityView
+    skills: tuple[int, ...]
+    extra_hp: int
+    effects: tuple[EffectView, ...]
+    mintmarks: tuple[MintmarkView, ...]
+    is_awaken: bool
+    pet_items: tuple[int, ...]
+    ability_total: AbilityView
+    skin_id: int | None
+    rest: bytes = b''
+
+    @classmethod
+    def from_proto(cls, pet: PetInfo) -> 'PetView':
+        evs = AbilityView.from_proto(pet.evs)
+        ability_total = AbilityView.from_proto(pet.ability_total)
+        rest = PetInfo()
+        rest.CopyFrom(pet)
+        for name in _PET_VIEW_FIELDS:
+            rest.ClearField(name)
+        # 已设置但全为 0 的能力值无法从 AbilityView 区分，保留在 rest 中
+        if any(evs):
+            rest.ClearField('evs')
+        if any(ability_total):
+            rest.ClearField('ability_total')
+        return cls(
+            pet.id,
+            pet.level,
+            pet.dv,
+            pet.nature,
+            evs,
+            tuple(pet.skills),
+            pet.extra_hp,
+            tuple(map(EffectView.from_proto, pet.effects)),
+            tuple(map(MintmarkView.from_proto, pet.mintmarks)),
+            pet.is_awaken,
+            tuple(pet.pet_items),
+            ability_total,
+            pet.skin_id if pet.HasField('skin_id') else None,
+            rest.SerializeToString(),
+        )
+
+    def to_proto(self) -> PetInfo:
+        pet = PetInfo(
+            id=self.id,
+            level=self.level,
+            dv=self.dv,
+            nature=self.nature,
+            evs=self.evs.to_proto() if any(self.evs) else None,
+            skills=self.skills,
+            extra_hp=self.extra_hp,
+            effects=[effect.to_proto() for effect in self.effects],
+            mintmarks=[mintmark.to_proto() for mintmark in self.mintmarks],
+            is_awaken=self.is_awaken,
+            pet_items=self.pet_items,
+            ability_total=(
+                self.ability_total.to_proto() if any(self.ability_total) else None
+            ),
+            skin_id=self.skin_id,
+        )
+        if self.rest:
+            pet.MergeFromString(self.rest)
+        return pet
+
+
+class SeerSetView(NamedTuple):
+    """`PetCodeMessage.SeerSet` 的只读视图"""
+
+    equips: tuple[int, ...]
+    title_id: int | None
+
+    @classmethod
+    def from_proto(cls, seer_set: PetCodeMessage.SeerSet) -> 'SeerSetView':
+        return cls(
+            tuple(seer_set.equips),
+            seer_set.title_id if seer_set.HasField('title_id') else None,
+        )
+
+    def to_proto(self) -> PetCodeMessage.SeerSet:
+        return PetCodeMessage.SeerSet(equips=self.equips, title_id=self.title_id)
+
+
+class PetCodeView(NamedTuple):
+    """`PetCodeMessage` 的只读视图
+
+    ``seer_set`` 未设置时为 None，``equips`` 和 ``title_id`` 是读取其字段的快捷方式。
+    """
+
+    server: int
+    display_mode: int
+    seer_set: SeerSetView | None
+    pets: tuple[PetView, ...]
+    battle_fires: tuple[int, ...]
+
+    @property
+    def equips(self) -> tuple[int, ...]:
+        return () if self.seer_set is None else self.seer_set.equips
+
+    @property
+    def title_id(self) -> int | None:
+        return None if self.seer_set is None else self.seer_set.title_id
+
+    @classmethod
+    def from_proto(cls, message: PetCodeMessage) -> 'PetCodeView':
+        return cls(
+            message.server,
+            message.display_mode,
+            (
+                SeerSetView.from_proto(message.seer_set)
+                if message.HasField('seer_set')
+                else None
+            ),
+            tuple(map(PetView.from_proto, message.pets)),
+            tuple(message.battle_fires),
+        )
+
+    def to_proto(self) -> PetCodeMessage:
+        return PetCodeMessage(
+            server=self.server,  # type: ignore[arg-type]
+            display_mode=self.display_mode,  # type: ignore[arg-type]
+            seer_set=None if self.seer_set is None else self.seer_set.to_proto(),
+            pets=[pet.to_proto() for pet in self.pets],
+            battle_fires=self.battle_fires,  # type: ignore[arg-type]
+        )
+
+
+def view(message: PetCodeMessage) -> PetCodeView:
+    """创建消息的只读视图，等价于 `PetCodeView.from_proto`"""
+    return PetCodeView.from_proto(message)
+
+
+__all__ = [
+    'AbilityView',
+    'EffectView',
+    'MintmarkView',
+    'PetCodeView',
+    'PetView',
+    'SeerSetView',
+    'view',
+]
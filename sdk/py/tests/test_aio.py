@@ -0,0 +1,259 @@
+"""测试异步编解码接口"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import petcode
+from petcode import aio
+from petcode.aio import AsyncPetCode
+from petcode.validate import Limits, ValidationError
+import pytest
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+
+@pytest.fixture(autouse=True)
+def _shutdown_default():
+    yield
+    aio.shutdown()
+
+
+class _Gauge:
+    """记录同时执行的任务数"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def work(self, seconds: float):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        time.sleep(seconds)
+        with self.lock:
+            self.current -= 1
+
+
+class TestModuleFunctions:
+    """测试模块级函数"""
+
+    def test_roundtrip(self, sample_petcode_message):
+        """测试单条编解码"""
+
+        async def main():
+            code = await aio.to_base64(sample_petcode_message, codec='deflate')
+            binary = await aio.to_binary(sample_petcode_message)
+            return code, await aio.from_base64(code), await aio.from_binary(binary)
+
+        code, from_code, from_binary = asyncio.run(main())
+
+        assert code == petcode.to_base64(sample_petcode_message, codec='deflate')
+        assert from_code == from_binary == sample_petcode_message
+
+    def test_batch(self, sample_petcode_message):
+        """测试批量函数的结果顺序和错误条目"""
+        aio.configure(chunk_size=3)
+        messages = [PetCodeMessage(pets=[{'id': i}]) for i in range(10)]
+
+        async def main():
+            codes = await aio.to_base64_many(messages)
+            binaries = await aio.to_binary_many(messages, codec='deflate-dict')
+            decoded = await aio.from_base64_many([*codes, 'invalid!!!'])
+            return codes, decoded, await aio.from_binary_many(binaries)
+
+        codes, decoded, from_binaries = asyncio.run(main())
+
+        assert codes == petcode.to_base64_many(messages)
+        assert decoded[:10] == from_binaries == messages
+        assert isinstance(decoded[10], Exception)
+
+    def test_limits(self, sample_petcode_message):
+        """测试传入 limits 时按限制解码"""
+        limits = Limits(max_pets=0)
+        code = petcode.to_base64(sample_petcode_message)
+        binary = petcode.to_binary(sample_petcode_message)
+
+        async def main():
+            with pytest.raises(ValidationError, match='pets'):
+                await aio.from_base64(code, limits=limits)
+            with pytest.raises(ValidationError, match='pets'):
+                await aio.from_binary(binary, limits=limits)
+            return (
+                await aio.from_base64_many([code], limits=limits),
+                await aio.from_binary_many([binary], limits=limits),
+                await aio.from_base64_many([code], limits=Limits()),
+            )
+
+        from_codes, from_binaries, allowed = asyncio.run(main())
+
+        assert isinstance(from_codes[0], ValidationError)
+        assert isinstance(from_binaries[0], ValidationError)
+        assert allowed == [sample_petcode_message]
+
+    def test_configure_replaces_default(self):
+        """测试替换共享实例"""
+        first = aio.get_default()
+
+        second = aio.configure(max_pending=4)
+
+        assert aio.get_default() is second is not first
+        assert second.max_pending == 4
+
+    def test_multiple_event_loops(self, sample_petcode_message):
+        """测试共享实例可以在不同的事件循环中使用"""
+        code = petcode.to_base64(sample_petcode_message)
+        for _ in range(2):
+            assert asyncio.run(aio.from_base64(code)) == sample_petcode_message
+
+
+class TestAsyncPetCode:
+    """测试背压和取消"""
+
+    def test_max_pending(self):
+        """测试同时提交到执行器的任务数不超过 max_pending"""
+        gauge = _Gauge()
+        executor = ThreadPoolExecutor(max_workers=8)
+        coder = AsyncPetCode(executor, max_pending=2)
+
+        async def main():
+            await asyncio.gather(*(coder.run(gauge.work, 0.02) for _ in range(6)))
+
+        asyncio.run(main())
+        executor.shutdown()
+
+        assert gauge.peak == 2
+
+    def test_event_loop_not_blocked(self):
+        """测试执行器中的任务不阻塞事件循环"""
+        coder = AsyncPetCode(max_workers=1)
+
+        async def main():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.ensure_future(ticker())
+            await coder.run(time.sleep, 0.2)
+            task.cancel()
+            return ticks
+
+        ticks = asyncio.run(main())
+        coder.close()
+
+        assert ticks >= 5
+
+    def test_cancel_waiting_call(self):
+        """测试取消等待名额的调用，且正在执行的任务结束后名额才被释放"""
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        coder = AsyncPetCode(max_workers=2, max_pending=1)
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        async def main():
+            running = asyncio.ensure_future(coder.run(blocking))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            waiting = asyncio.ensure_future(coder.run(calls.append, 'waiting'))
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            running.cancel()
+            await asyncio.gather(running, waiting, return_exceptions=True)
+
+            # 执行中的任务无法中断，结束前名额仍被占用
+            third = asyncio.ensure_future(coder.run(calls.append, 'third'))
+            await asyncio.sleep(0.05)
+            assert calls == []
+            release.set()
+            await third
+
+        asyncio.run(main())
+        coder.close()
+
+        assert calls == ['third']
+
+    def test_cancel_batch(self, sample_petcode_message):
+        """测试取消批量调用时未开始的分块不再执行"""
+        release = threading.Event()
+        coder = AsyncPetCode(max_workers=1, max_pending=1, chunk_size=1)
+        codes = [petcode.to_base64(sample_petcode_message)] * 5
+
+        async def main():
+            blocker = asyncio.ensure_future(coder.run(release.wait, 5))
+            batch = asyncio.ensure_future(coder.from_base64_many(codes))
+            await asyncio.sleep(0.01)
+            batch.cancel()
+            release.set()
+            await blocker
+            with pytest.raises(asyncio.CancelledError):
+                await batch
+            return coder._semaphores[asyncio.get_running_loop()]
+
+        semaphore = asyncio.run(main())
+        coder.close()
+
+        assert not semaphore.locked()
+
+    def test_batch_reads_input_lazily(self, sample_petcode_message):
+        """测试批量调用只在有空闲名额时读取输入"""
+        release = threading.Event()
+        coder = AsyncPetCode(max_workers=1, max_pending=2, chunk_size=1)
+        code = petcode.to_base64(sample_petcode_message)
+        consumed = 0
+
+        def codes():
+            nonlocal consumed
+            for _ in range(100):
+                consumed += 1
+                yield code
+
+        async def main():
+            blocker = asyncio.ensure_future(coder.run(release.wait, 5))
+            batch = asyncio.ensure_future(coder.from_base64_many(codes()))
+            await asyncio.sleep(0.01)
+            # 窗口中的 2 个分块，加上等待窗口空出时已读取的 1 个分块
+            assert consumed == 3
+            release.set()
+            await blocker
+            return await batch
+
+        results = asyncio.run(main())
+        coder.close()
+
+        assert consumed == 100
+        assert results == [sample_petcode_message] * 100
+
+    def test_process_pool(self, sample_petcode_message):
+        """测试使用进程池"""
+        codes = [petcode.to_base64(sample_petcode_message)] * 4
+
+        async def main():
+            async with AsyncPetCode(
+                use_processes=True, max_workers=1, chunk_size=2
+            ) as coder:
+                return (
+                    await coder.from_base64_many(codes),
+                    await coder.to_base64_many([sample_petcode_message], codec='none'),
+                    await coder.from_base64_many(codes, limits=Limits(max_pets=0)),
+                )
+
+        decoded, encoded, limited = asyncio.run(main())
+
+        assert decoded == [sample_petcode_message] * 4
+        assert all(isinstance(result, ValidationError) for result in limited)
+        assert encoded == [petcode.to_base64(sample_petcode_message, codec='none')]
+
+    def test_invalid_arguments(self):
+        """测试参数校验"""
+        with pytest.raises(ValueError, match='max_pending'):
+            AsyncPetCode(max_pending=0)
+        with pytest.raises(ValueError, match='chunk_size'):
+            AsyncPetCode(chunk_size=0)
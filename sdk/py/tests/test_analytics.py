@@ -0,0 +1,101 @@
+"""测试列式数据导出"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import petcode
+from petcode.analytics import decode_columns, messages_to_columns
+from petcode.create_and_read import create_skill_mintmark
+from seerbp.petcode.v1.message_pb2 import MintmarkInfo, PetCodeMessage, PetInfo
+
+
+class TestMessagesToColumns:
+    """测试消息到列式数据的转换"""
+
+    def test_fixed_columns(self, sample_petcode_message):
+        """测试定长列"""
+        columns = messages_to_columns([sample_petcode_message])
+
+        assert len(columns) == 1
+        assert columns.id.tolist() == [3842]
+        assert columns.level.tolist() == [100]
+        assert columns.nature.tolist() == [1]
+        assert columns.evs.shape == (1, 6)
+        assert columns.evs[0].tolist() == [85, 85, 85, 7, 8, 9]
+        assert columns.ability_total[0].tolist() == [100, 120, 80, 90, 85, 110]
+        assert columns.skin_id.tolist() == [100001]
+        assert columns.is_awaken.dtype == bool
+        assert columns.is_awaken.tolist() == [False]
+
+    def test_ragged_columns(self, sample_petcode_message):
+        """测试变长列"""
+        message = PetCodeMessage()
+        message.CopyFrom(sample_petcode_message)
+        message.pets.append(
+            PetInfo(id=1, skills=[10], mintmarks=[create_skill_mintmark(id=50001)])
+        )
+        columns = messages_to_columns([message])
+
+        assert columns.skills.row(0).tolist() == [24708, 31567, 31568, 31569]
+        assert columns.skills.row(1).tolist() == [10]
+        assert columns.skills.lengths().tolist() == [4, 1]
+        assert columns.skills.row_index().tolist() == [0, 0, 0, 0, 1]
+        assert columns.pet_items.row(1).tolist() == []
+        assert columns.effects.values.shape == (1, 2)
+        assert columns.effects.row(0).tolist() == [[67, 1]]
+        assert columns.mintmarks.row(0).tolist() == [40001]
+        assert columns.mintmarks.row(1).tolist() == [50001]
+
+    def test_message_index(self):
+        """测试多条消息的行归属"""
+        messages = [
+            PetCodeMessage(pets=[PetInfo(id=1), PetInfo(id=2)]),
+            PetCodeMessage(),
+            PetCodeMessage(pets=[PetInfo(id=3)]),
+        ]
+        columns = messages_to_columns(messages)
+
+        assert columns.id.tolist() == [1, 2, 3]
+        assert columns.message_index.tolist() == [0, 0, 2]
+
+    def test_unset_mintmark(self):
+        """测试未设置类型的刻印记为 0"""
+        columns = messages_to_columns(
+            [PetCodeMessage(pets=[PetInfo(mintmarks=[MintmarkInfo()])])]
+        )
+        assert columns.mintmarks.values.tolist() == [0]
+
+    def test_empty(self):
+        """测试空输入"""
+        columns = messages_to_columns([])
+        assert len(columns) == 0
+        assert columns.evs.shape == (0, 6)
+        assert len(columns.skills) == 0
+
+
+class TestDecodeColumns:
+    """测试解码为列式数据"""
+
+    def test_decode_base64(self, sample_petcode_message):
+        """测试解码 base64 并记录错误"""
+        code = petcode.to_base64(sample_petcode_message)
+        columns, errors = decode_columns([code, 'invalid!!!base64', code])
+
+        assert columns.message_index.tolist() == [0, 2]
+        assert [index for index, _ in errors] == [1]
+        assert isinstance(errors[0][1], Exception)
+
+    def test_decode_binary(self, sample_petcode_message):
+        """测试解码二进制数据"""
+        binaries = petcode.to_binary_many([sample_petcode_message] * 3)
+        columns, errors = decode_columns(binaries, encoding='binary')
+
+        assert errors == []
+        assert np.unique(columns.id).tolist() == [3842]
+        assert len(columns) == 3
+
+    def test_unknown_encoding(self):
+        """测试未知编码"""
+        with pytest.raises(ValueError, match='Unknown encoding'):
+            decode_columns([], encoding='json')  # type: ignore[arg-type]
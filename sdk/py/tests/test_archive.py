@@ -0,0 +1,250 @@
+"""测试归档文件格式"""
+
+import zlib
+
+import petcode
+from petcode.archive import (
+    MAGIC,
+    ArchiveFormatError,
+    ArchiveReader,
+    ArchiveWriter,
+    recover_archive,
+    write_archive,
+)
+import pytest
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+
+def _messages(sample, count):
+    messages = []
+    for i in range(count):
+        message = PetCodeMessage()
+        message.CopyFrom(sample)
+        message.pets[0].id = 1000 + i
+        messages.append(message)
+    return messages
+
+
+@pytest.fixture
+def messages(sample_petcode_message):
+    return _messages(sample_petcode_message, 25)
+
+
+class TestArchiveRoundTrip:
+    """测试写入和读取"""
+
+    def test_iterate(self, tmp_path, messages):
+        """测试顺序读取全部记录"""
+        path = tmp_path / 'pets.pcar'
+
+        assert write_archive(path, messages, records_per_block=4) == 25
+
+        with ArchiveReader(path) as reader:
+            assert len(reader) == 25
+            assert reader.block_count == 7
+            assert reader.records_per_block == 4
+            assert list(reader) == messages
+
+    def test_random_access(self, tmp_path, messages):
+        """测试按序号读取任意记录"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages, records_per_block=4)
+
+        with ArchiveReader(path) as reader:
+            for index in (24, 0, 13, 3, 4, 12):
+                assert reader[index] == messages[index]
+            assert reader[-1] == messages[-1]
+            with pytest.raises(IndexError):
+                reader[25]
+
+    def test_iter_records_range(self, tmp_path, messages):
+        """测试读取部分范围的记录"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages, records_per_block=4)
+
+        with ArchiveReader(path) as reader:
+            assert list(reader.iter_records(3, 10)) == messages[3:10]
+            assert list(reader.iter_records(22, 100)) == messages[22:]
+            assert list(reader.iter_records(5, 5)) == []
+
+    def test_read_buffer(self, tmp_path, messages):
+        """测试从内存中的数据读取"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages, codec='gzip')
+
+        reader = ArchiveReader(path.read_bytes())
+
+        assert reader.block_count == 1
+        assert list(reader) == messages
+
+    def test_empty_archive(self, tmp_path):
+        """测试空归档"""
+        path = tmp_path / 'empty.pcar'
+        write_archive(path, [])
+
+        with ArchiveReader(path) as reader:
+            assert len(reader) == 0
+            assert list(reader) == []
+
+    def test_smaller_than_separate_binaries(self, tmp_path, messages):
+        """测试按块压缩比逐条压缩更节省空间"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages)
+
+        separate = sum(len(b) for b in petcode.to_binary_many(messages))
+        assert path.stat().st_size < separate
+
+
+class TestArchiveAppend:
+    """测试追加写入"""
+
+    def test_append_to_partial_block(self, tmp_path, messages):
+        """测试在未写满的数据块之后追加"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages[:10], records_per_block=4)
+
+        with ArchiveWriter(path, 'a') as writer:
+            assert len(writer) == 10
+            assert writer.write(messages[10]) == 10
+            writer.write_many(messages[11:])
+
+        with ArchiveReader(path) as reader:
+            assert reader.records_per_block == 4
+            assert reader.block_count == 7
+            assert list(reader) == messages
+            assert reader[9] == messages[9]
+
+    def test_append_to_full_block(self, tmp_path, messages):
+        """测试在写满的数据块之后追加，并使用不同的编解码器"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages[:8], records_per_block=4)
+
+        with ArchiveWriter(path, 'a', codec='gzip') as writer:
+            writer.write_many(messages[8:])
+
+        with ArchiveReader(path) as reader:
+            assert list(reader) == messages
+
+    def test_append_creates_file(self, tmp_path, messages):
+        """测试追加模式下文件不存在时创建新文件"""
+        path = tmp_path / 'new.pcar'
+
+        with ArchiveWriter(path, 'a', records_per_block=8) as writer:
+            writer.write_many(messages)
+
+        with ArchiveReader(path) as reader:
+            assert list(reader) == messages
+
+    def test_append_records_per_block_mismatch(self, tmp_path, messages):
+        """测试追加时每块记录数与已有文件不一致"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages, records_per_block=4)
+
+        with pytest.raises(ValueError, match='records_per_block'):
+            ArchiveWriter(path, 'a', records_per_block=8)
+
+    def test_append_without_records(self, tmp_path, messages):
+        """测试追加模式下没有写入记录时不修改文件"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages[:10], records_per_block=4)
+        data = path.read_bytes()
+
+        with ArchiveWriter(path, 'a'):
+            pass
+
+        assert path.read_bytes() == data
+
+    def test_append_never_closed(self, tmp_path, messages):
+        """测试追加的写入器未关闭时，原有数据保持不变并可以恢复"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages[:10], records_per_block=4)
+        data = path.read_bytes()
+
+        writer = ArchiveWriter(path, 'a')
+        writer.write_many(messages[10:])
+        writer._file.flush()
+        assert path.read_bytes().startswith(data)
+        with pytest.raises(ArchiveFormatError, match='trailer'):
+            ArchiveReader(path)
+
+        assert recover_archive(path) == 10
+        assert path.read_bytes() == data
+        with ArchiveReader(path) as reader:
+            assert list(reader) == messages[:10]
+        writer._file.close()
+
+        with ArchiveWriter(path, 'a') as writer:
+            writer.write_many(messages[10:])
+        with ArchiveReader(path) as reader:
+            assert list(reader) == messages
+
+    def test_recover_after_appends(self, tmp_path, messages):
+        """测试恢复到最后一次成功关闭的状态"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages[:5], records_per_block=4)
+        with ArchiveWriter(path, 'a') as writer:
+            writer.write_many(messages[5:10])
+        assert recover_archive(path) == 10
+
+        with open(path, 'ab') as f:
+            f.write(MAGIC * 3 + bytes(40) + MAGIC)
+        assert recover_archive(path) == 10
+        with ArchiveReader(path) as reader:
+            assert list(reader) == messages[:10]
+
+
+class TestArchiveErrors:
+    """测试错误处理"""
+
+    def test_unsupported_codec(self, tmp_path):
+        """测试无法拆分的编解码器"""
+        with pytest.raises(ValueError, match='record splitting'):
+            ArchiveWriter(tmp_path / 'pets.pcar', codec='none')
+
+    def test_not_an_archive(self, tmp_path):
+        """测试非归档数据"""
+        path = tmp_path / 'other.bin'
+        path.write_bytes(b'not an archive' * 4)
+
+        with pytest.raises(ArchiveFormatError, match='Not a PetCode archive'):
+            ArchiveReader(path)
+        with pytest.raises(ArchiveFormatError, match='too short'):
+            ArchiveReader(b'')
+
+    def test_unfinished_archive(self, tmp_path, messages):
+        """测试未关闭的写入器生成的文件"""
+        path = tmp_path / 'pets.pcar'
+        writer = ArchiveWriter(path, records_per_block=4)
+        writer.write_many(messages)
+        writer._file.flush()
+
+        with pytest.raises(ArchiveFormatError, match='trailer'):
+            ArchiveReader(path)
+        with pytest.raises(ArchiveFormatError, match='No valid archive trailer'):
+            recover_archive(path)
+        writer.close()
+
+    def test_corrupted_index(self, tmp_path, messages):
+        """测试索引损坏"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages, records_per_block=4)
+        data = bytearray(path.read_bytes())
+        data[-40] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        with pytest.raises(ArchiveFormatError, match='checksum'):
+            ArchiveReader(path)
+
+    def test_corrupted_block(self, tmp_path, messages):
+        """测试数据块损坏，且异常后文件仍可以关闭"""
+        path = tmp_path / 'pets.pcar'
+        write_archive(path, messages, records_per_block=4)
+        data = bytearray(path.read_bytes())
+        assert data[:4] == MAGIC
+        data[10:20] = bytes(10)
+        path.write_bytes(bytes(data))
+
+        reader = ArchiveReader(path)
+        with pytest.raises((zlib.error, ArchiveFormatError)):
+            reader[0]
+        reader.close()
@@ -0,0 +1,42 @@
+"""基准测试脚本的冒烟测试"""
+
+import json
+
+from benchmarks.corpus import CORPORA
+from benchmarks.run import main, run
+import petcode
+
+
+class TestBenchmarks:
+    """确保基准测试可以正常运行"""
+
+    def test_corpora_roundtrip(self):
+        """测试数据集可以正常序列化"""
+        sizes = []
+        for factory in CORPORA.values():
+            message = factory()
+            assert petcode.from_base64(petcode.to_base64(message)) == message
+            sizes.append(message.ByteSize())
+        assert sizes == sorted(sizes)
+
+    def test_run_report(self):
+        """测试生成的报告结构"""
+        report = run(keyword='single_pet', repeat=1, min_time=0)
+
+        assert report['environment']['protobuf']
+        names = {item['name'] for item in report['results']}
+        assert {'encode_base64', 'decode_base64', 'to_dict', 'param_to_effect'} <= names
+        assert all(item['corpus'] == 'single_pet' for item in report['results'])
+        json.dumps(report)
+
+    def test_main_writes_json(self, tmp_path, capsys):
+        """测试命令行输出 JSON 并支持对比"""
+        output = tmp_path / 'result.json'
+        args = ['-k', 'decode_binary/six', '--repeat', '1', '--min-time', '0']
+
+        assert main([*args, '-o', str(output)]) == 0
+        assert main([*args, '--compare', str(output)]) == 0
+
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert [item['name'] for item in report['results']] == ['decode_binary']
+        assert '%' in capsys.readouterr().out
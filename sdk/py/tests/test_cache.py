@@ -0,0 +1,116 @@
+"""测试解码缓存"""
+
+import binascii
+
+import petcode
+from petcode.cache import DecodeCache
+import pytest
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+
+def _codes(count):
+    return [
+        petcode.to_base64(PetCodeMessage(seer_set=PetCodeMessage.SeerSet(title_id=i)))
+        for i in range(1, count + 1)
+    ]
+
+
+class TestDecodeCache:
+    """测试 DecodeCache"""
+
+    def test_hit_and_miss(self, sample_petcode_message):
+        """测试命中与未命中计数"""
+        cache = DecodeCache()
+        code = petcode.to_base64(sample_petcode_message)
+
+        assert cache.from_base64(code) == sample_petcode_message
+        assert cache.from_base64(code) == sample_petcode_message
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+        assert stats.hit_rate == 0.5
+        assert stats.bytes == sample_petcode_message.ByteSize()
+
+    def test_from_binary(self, sample_petcode_message):
+        """测试二进制输入，包括 memoryview"""
+        cache = DecodeCache()
+        binary = petcode.to_binary(sample_petcode_message)
+
+        assert cache.from_binary(binary) == sample_petcode_message
+        assert cache.from_binary(memoryview(binary)) == sample_petcode_message
+        assert cache.stats().hits == 1
+        assert binary in cache
+        assert bytearray(binary) in cache
+        assert memoryview(binary) in cache
+        assert cache.invalidate(bytearray(binary)) is True
+        assert memoryview(binary) not in cache
+
+    def test_copy_on_read(self, sample_petcode_message):
+        """测试修改返回值不会影响缓存"""
+        cache = DecodeCache()
+        code = petcode.to_base64(sample_petcode_message)
+
+        first = cache.from_base64(code)
+        first.pets[0].level = 1
+        first.pets.add(id=1)
+
+        assert cache.from_base64(code) == sample_petcode_message
+
+    def test_max_entries_lru(self):
+        """测试按最近最少使用淘汰"""
+        cache = DecodeCache(max_entries=2)
+        a, b, c = _codes(3)
+
+        cache.from_base64(a)
+        cache.from_base64(b)
+        cache.from_base64(a)
+        cache.from_base64(c)
+
+        assert a in cache
+        assert b not in cache
+        assert c in cache
+        assert cache.stats().evictions == 1
+
+    def test_max_bytes(self, sample_petcode_message):
+        """测试总字节数限制"""
+        size = PetCodeMessage(seer_set=PetCodeMessage.SeerSet(title_id=1)).ByteSize()
+        cache = DecodeCache(max_bytes=size * 2)
+
+        for code in _codes(3):
+            cache.from_base64(code)
+        assert len(cache) == 2
+        assert cache.stats().bytes <= size * 2
+
+        # 超过上限的单条消息不会被缓存
+        cache.from_base64(petcode.to_base64(sample_petcode_message))
+        assert len(cache) == 2
+
+    def test_invalidate_and_clear(self):
+        """测试显式失效与清空"""
+        cache = DecodeCache()
+        a, b = _codes(2)
+        cache.from_base64(a)
+        cache.from_base64(b)
+
+        assert cache.invalidate(a) is True
+        assert cache.invalidate(a) is False
+        assert a not in cache
+
+        cache.clear()
+        stats = cache.stats()
+        assert (stats.entries, stats.bytes) == (0, 0)
+        assert stats.misses == 2
+
+    def test_errors_not_cached(self):
+        """测试解码失败不会被缓存"""
+        cache = DecodeCache()
+        with pytest.raises(binascii.Error, match='Invalid base64'):
+            cache.from_base64('invalid!!!base64')
+        assert len(cache) == 0
+
+    def test_invalid_limits(self):
+        """测试无效的限制参数"""
+        with pytest.raises(ValueError, match='max_entries'):
+            DecodeCache(max_entries=0)
+        with pytest.raises(ValueError, match='max_bytes'):
+            DecodeCache(max_bytes=0)
@@ -0,0 +1,149 @@
+"""测试规范形式与内容指纹"""
+
+import petcode
+from petcode.canonical import canonical_bytes, canonicalize, fingerprint
+from petcode.create_and_read import create_skill_mintmark
+import pytest
+from seerbp.petcode.v1.message_pb2 import (
+    PetAbilityBonus,
+    PetAbilityValue,
+    PetCodeMessage,
+    PetInfo,
+)
+
+
+def _copy(message):
+    result = PetCodeMessage()
+    result.CopyFrom(message)
+    return result
+
+
+def _reordered(message):
+    """打乱顺序无关字段的顺序"""
+    result = _copy(message)
+    result.battle_fires[:] = [3, 1, 2]
+    pet = result.pets[0]
+    effects = list(pet.effects)
+    del pet.effects[:]
+    pet.effects.extend(reversed(effects))
+    pet.pet_items[:] = list(reversed(pet.pet_items))
+    return result
+
+
+@pytest.fixture
+def message(sample_petcode_message):
+    message = _copy(sample_petcode_message)
+    message.battle_fires[:] = [1, 2, 3]
+    message.pets[0].effects.add(id=1, status=4, args=[2])
+    return message
+
+
+class TestCanonicalize:
+    """测试 canonicalize"""
+
+    def test_field_order(self, message):
+        """测试顺序无关字段的顺序不影响规范形式"""
+        reordered = _reordered(message)
+
+        assert reordered != message
+        assert canonicalize(reordered) == canonicalize(message)
+        assert canonical_bytes(reordered) == canonical_bytes(message)
+
+    def test_input_unchanged(self, message):
+        """测试不修改输入的消息"""
+        reordered = _reordered(message)
+        before = reordered.SerializeToString()
+
+        canonicalize(reordered)
+
+        assert reordered.SerializeToString() == before
+
+    def test_ordered_fields_kept(self, message):
+        """测试顺序有意义的字段（技能、精灵）保持原有顺序"""
+        message.pets.add(id=1)
+        message.pets[0].skills[:] = [3, 1, 2]
+
+        result = canonicalize(message)
+
+        assert [pet.id for pet in result.pets] == [3842, 1]
+        assert list(result.pets[0].skills) == [3, 1, 2]
+
+    def test_strip_defaults(self):
+        """测试清除默认值的 optional 字段和空的子消息"""
+        explicit = PetCodeMessage(
+            seer_set=PetCodeMessage.SeerSet(title_id=0),
+            pets=[
+                PetInfo(
+                    id=1,
+                    skin_id=0,
+                    evs=PetAbilityValue(),
+                    ability_bonus=[
+                        PetAbilityBonus(
+                            type=PetAbilityBonus.Type.TYPE_SOULMARK,
+                            value=PetAbilityBonus.Value(
+                                hp=PetAbilityBonus.ExtraValue(value=0)
+                            ),
+                        )
+                    ],
+                )
+            ],
+        )
+        implicit = PetCodeMessage(
+            pets=[
+                PetInfo(
+                    id=1,
+                    ability_bonus=[
+                        PetAbilityBonus(type=PetAbilityBonus.Type.TYPE_SOULMARK)
+                    ],
+                )
+            ]
+        )
+
+        assert explicit.SerializeToString() != implicit.SerializeToString()
+        assert canonical_bytes(explicit) == canonical_bytes(implicit)
+        assert not canonicalize(explicit).pets[0].HasField('skin_id')
+
+    def test_oneof_kept(self):
+        """测试 oneof 中内容为空的字段不会被清除"""
+        message = PetCodeMessage(pets=[PetInfo(mintmarks=[create_skill_mintmark(0)])])
+
+        result = canonicalize(message)
+
+        assert result.pets[0].mintmarks[0].WhichOneof('mintmark') == 'skill'
+
+
+class TestFingerprint:
+    """测试 fingerprint"""
+
+    def test_same_content(self, message):
+        """测试不同导出方式得到的相同配置指纹相同"""
+        reordered = _reordered(message)
+        code = petcode.to_base64(message)
+        other_code = petcode.to_base64(reordered, codec='deflate-dict')
+
+        assert code != other_code
+        assert petcode.fingerprint(petcode.from_base64(code)) == petcode.fingerprint(
+            petcode.from_base64(other_code)
+        )
+
+    def test_different_content(self, message):
+        """测试内容不同时指纹不同"""
+        other = _copy(message)
+        other.pets[0].level = 99
+
+        assert fingerprint(message) != fingerprint(other)
+        assert fingerprint(message, bits=128) != fingerprint(other, bits=128)
+
+    def test_bits(self, message):
+        """测试指纹位数"""
+        assert 0 <= fingerprint(message) < 2**64
+        assert 0 <= fingerprint(message, bits=128) < 2**128
+        assert fingerprint(message, bits=128) != fingerprint(message)
+        with pytest.raises(ValueError, match='bits must be 64 or 128'):
+            fingerprint(message, bits=32)
+
+    def test_dedup(self, message):
+        """测试作为集合的键去重"""
+        messages = [message, _reordered(message), PetCodeMessage(), PetCodeMessage()]
+
+        assert len({fingerprint(m) for m in messages}) == 2
@@ -0,0 +1,209 @@
+"""测试压缩编解码器"""
+
+import gzip
+import mmap
+
+import petcode
+from petcode.codec import (
+    GZIP_MAGIC,
+    Codec,
+    DeflateCodec,
+    IdentityCodec,
+    compress,
+    decompress_record,
+    detect_codec,
+    get_codec,
+    list_codecs,
+    register_codec,
+)
+import pytest
+
+
+class TestBuiltinCodecs:
+    """测试内置编解码器"""
+
+    def test_builtin_codecs_registered(self):
+        """测试内置编解码器已注册"""
+        assert {'gzip', 'deflate', 'none'} <= set(list_codecs())
+
+    def test_default_is_gzip(self, sample_petcode_message):
+        """测试默认使用 gzip 且不写入额外头部"""
+        binary = petcode.to_binary(sample_petcode_message)
+        assert binary[:2] == GZIP_MAGIC
+        assert gzip.decompress(binary) == sample_petcode_message.SerializeToString()
+
+    @pytest.mark.parametrize('codec', ['gzip', 'deflate', 'none'])
+    def test_roundtrip(self, sample_petcode_message, codec):
+        """测试各编解码器的往返转换"""
+        binary = petcode.to_binary(sample_petcode_message, codec=codec)
+        assert petcode.from_binary(binary) == sample_petcode_message
+        assert detect_codec(binary).name == codec
+
+        code = petcode.to_base64(sample_petcode_message, codec=codec)
+        assert petcode.from_base64(code) == sample_petcode_message
+
+    def test_header_format(self, sample_petcode_message):
+        """测试头部格式：高 4 位为版本，低 4 位为 ID"""
+        binary = petcode.to_binary(sample_petcode_message, codec='none')
+        assert binary[0] == 0x10
+        assert binary[1:] == sample_petcode_message.SerializeToString()
+
+        binary = petcode.to_binary(sample_petcode_message, codec='deflate')
+        assert binary[0] == 0x11
+
+    def test_deflate_smaller_than_gzip(self, sample_petcode_message):
+        """测试原始 deflate 比 gzip 更短"""
+        gzip_size = len(petcode.to_binary(sample_petcode_message))
+        deflate_size = len(petcode.to_binary(sample_petcode_message, codec='deflate'))
+        assert deflate_size < gzip_size
+
+    def test_batch_with_codec(self, sample_petcode_message):
+        """测试批量函数使用编解码器"""
+        codes = petcode.to_base64_many([sample_petcode_message], codec='deflate')
+        assert petcode.from_base64_many(codes) == [sample_petcode_message]
+
+    @pytest.mark.parametrize('codec', ['gzip', 'deflate', 'deflate-dict'])
+    def test_reject_trailing_data(self, sample_petcode_message, codec):
+        """测试拒绝压缩流之后的多余数据和不完整的数据"""
+        binary = petcode.to_binary(sample_petcode_message, codec=codec)
+
+        with pytest.raises(ValueError, match='Unexpected data'):
+            petcode.from_binary(binary + b'garbage')
+        with pytest.raises(ValueError, match='Truncated'):
+            petcode.from_binary(binary[:-4])
+        results = petcode.from_binary_many([binary + b'garbage'])
+        assert isinstance(results[0], ValueError)
+
+    def test_multi_member_gzip(self, sample_petcode_message):
+        """测试与 gzip.decompress 一样接受多个拼接在一起的 gzip 成员"""
+        data = sample_petcode_message.SerializeToString()
+        binary = gzip.compress(data[:10]) + gzip.compress(data[10:])
+
+        assert petcode.codec.decompress(binary) == data
+        assert petcode.from_binary(binary) == sample_petcode_message
+        with pytest.raises(ValueError, match='Unexpected data'):
+            petcode.from_binary(binary + b'garbage')
+        with pytest.raises(ValueError, match='Truncated'):
+            petcode.from_binary(binary[:-4])
+
+
+class TestBufferInputs:
+    """测试缓冲区对象输入"""
+
+    @pytest.mark.parametrize('codec', ['gzip', 'deflate', 'deflate-dict', 'none'])
+    @pytest.mark.parametrize('wrap', [bytearray, memoryview])
+    def test_from_binary_buffers(self, sample_petcode_message, codec, wrap):
+        """测试 from_binary 接受 bytearray 和 memoryview"""
+        binary = petcode.to_binary(sample_petcode_message, codec=codec)
+        assert petcode.from_binary(wrap(binary)) == sample_petcode_message
+
+    @pytest.mark.parametrize('codec', ['gzip', 'none'])
+    def test_from_binary_mmap(self, sample_petcode_message, codec):
+        """测试 from_binary 接受 mmap 及其切片"""
+        binary = petcode.to_binary(sample_petcode_message, codec=codec)
+        with mmap.mmap(-1, len(binary) + 3) as mapped:
+            mapped[3:] = binary
+            assert petcode.from_binary(memoryview(mapped)[3:]) == sample_petcode_message
+
+    def test_from_binary_many_buffers(self, sample_petcode_message):
+        """测试批量解码缓冲区对象"""
+        binary = petcode.to_binary(sample_petcode_message)
+        results = petcode.from_binary_many([memoryview(binary), bytearray(binary)])
+        assert results == [sample_petcode_message] * 2
+
+
+class TestDecompressRecord:
+    """测试 decompress_record"""
+
+    def test_concatenated_records(self, sample_petcode_message):
+        """测试逐条拆分不同编解码器拼接的数据"""
+        payload = sample_petcode_message.SerializeToString()
+        binaries = [
+            petcode.to_binary(sample_petcode_message, codec=codec)
+            for codec in ('gzip', 'deflate', 'deflate-dict')
+        ]
+        data = b''.join(binaries)
+
+        offset = 0
+        for binary in binaries:
+            result, end = decompress_record(data, offset)
+            assert result == payload
+            assert end - offset == len(binary)
+            offset = end
+        assert offset == len(data)
+
+    def test_large_record(self):
+        """测试超过单次读取块大小的数据"""
+        payload = bytes(range(256)) * 1024
+        data = compress(payload, 'deflate') + b'tail'
+        result, end = decompress_record(data)
+        assert result == payload
+        assert data[end:] == b'tail'
+
+    def test_truncated(self, sample_petcode_message):
+        """测试数据不完整"""
+        binary = petcode.to_binary(sample_petcode_message)
+        with pytest.raises(ValueError, match='Truncated'):
+            decompress_record(binary[:-4])
+
+    def test_identity_not_splittable(self, sample_petcode_message):
+        """测试未压缩的数据无法拆分"""
+        binary = petcode.to_binary(sample_petcode_message, codec='none')
+        with pytest.raises(ValueError, match='record splitting'):
+            decompress_record(binary)
+
+
+class TestCodecRegistry:
+    """测试编解码器注册"""
+
+    def test_abstract_codec(self):
+        """测试未实现全部抽象方法的编解码器无法实例化"""
+
+        class Incomplete(Codec):
+            def compress(self, data: bytes) -> bytes:
+                return data
+
+        with pytest.raises(TypeError, match='decompress'):
+            Incomplete()
+
+    def test_unknown_codec_name(self, sample_petcode_message):
+        """测试未知的编解码器名称"""
+        with pytest.raises(ValueError, match='Unknown codec'):
+            petcode.to_binary(sample_petcode_message, codec='zstd')
+
+    def test_unknown_codec_id(self):
+        """测试未知的编解码器 ID"""
+        with pytest.raises(ValueError, match='Unknown codec id'):
+            petcode.from_binary(b'\x1e\x00')
+
+    def test_unsupported_version(self):
+        """测试不支持的格式版本"""
+        with pytest.raises(ValueError, match='Unsupported format version'):
+            petcode.from_binary(b'\x21\x00')
+
+    def test_empty_data(self):
+        """测试空数据"""
+        with pytest.raises(ValueError, match='Empty data'):
+            petcode.from_binary(b'')
+
+    def test_register_conflicts(self):
+        """测试名称或 ID 冲突"""
+        with pytest.raises(ValueError, match='name already registered'):
+            register_codec(IdentityCodec(name='deflate', codec_id=13))
+        with pytest.raises(ValueError, match='id already registered'):
+            register_codec(IdentityCodec(name='another', codec_id=1))
+        with pytest.raises(ValueError, match='codec_id must be in'):
+            register_codec(IdentityCodec(name='another', codec_id=15))
+
+    def test_register_custom_dictionary_codec(self, sample_petcode_message):
+        """测试注册使用自定义字典的编解码器"""
+        zdict = sample_petcode_message.SerializeToString()
+        codec = DeflateCodec(name='test-dict', codec_id=14, zdict=zdict)
+        register_codec(codec, replace=True)
+        assert get_codec('test-dict') is codec
+
+        binary = petcode.to_binary(sample_petcode_message, codec='test-dict')
+        assert petcode.from_binary(binary) == sample_petcode_message
+        assert len(binary) < len(
+            petcode.to_binary(sample_petcode_message, codec='deflate')
+        )
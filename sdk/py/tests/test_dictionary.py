@@ -0,0 +1,81 @@
+"""测试预设字典训练与内置字典编解码器"""
+
+import hashlib
+
+import petcode
+from petcode._zdict import DEFAULT_ZDICT
+from petcode.codec import DeflateCodec, detect_codec
+from petcode.dictionary import DEFAULT_DICTIONARY_SIZE, train_dictionary
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage, PetInfo
+
+
+def _samples(sample_petcode_message, count=50):
+    samples = []
+    for i in range(count):
+        message = PetCodeMessage()
+        message.CopyFrom(sample_petcode_message)
+        message.pets[0].id = 1000 + i
+        message.pets[0].skills[0] = 20000 + i * 7
+        message.pets.append(PetInfo(id=2000 + i, level=100, dv=31))
+        samples.append(message)
+    return samples
+
+
+class TestTrainDictionary:
+    """测试字典训练"""
+
+    def test_respects_size(self, sample_petcode_message):
+        """测试字典大小不超过限制"""
+        zdict = train_dictionary(_samples(sample_petcode_message), size=128)
+        assert 0 < len(zdict) <= 128
+
+    def test_deterministic(self, sample_petcode_message):
+        """测试训练结果是确定的"""
+        samples = _samples(sample_petcode_message)
+        assert train_dictionary(samples) == train_dictionary(samples)
+
+    def test_accepts_serialized_samples(self, sample_petcode_message):
+        """测试接受序列化后的数据作为样本"""
+        samples = _samples(sample_petcode_message)
+        serialized = [sample.SerializeToString() for sample in samples]
+        assert train_dictionary(samples) == train_dictionary(serialized)
+
+    def test_improves_compression(self, sample_petcode_message):
+        """测试字典能够缩短压缩结果"""
+        samples = _samples(sample_petcode_message, count=60)
+        zdict = train_dictionary(samples[:50], size=512)
+
+        plain = DeflateCodec()
+        with_dict = DeflateCodec(zdict=zdict)
+        for sample in samples[50:]:
+            data = sample.SerializeToString()
+            assert len(with_dict.compress(data)) < len(plain.compress(data))
+            assert with_dict.decompress(with_dict.compress(data)) == data
+
+    def test_no_frequent_segments(self):
+        """测试没有公共片段时返回空字典"""
+        assert train_dictionary([b'abcdefgh', b'ijklmnop']) == b''
+
+
+class TestDefaultDictionaryCodec:
+    """测试内置字典编解码器"""
+
+    def test_default_dictionary_is_stable(self):
+        """已发布的分享码依赖内置字典，字典内容不能改变"""
+        assert len(DEFAULT_ZDICT) == DEFAULT_DICTIONARY_SIZE == 2048
+        assert hashlib.sha256(DEFAULT_ZDICT).hexdigest().startswith('06d28195f5c50002')
+
+    def test_roundtrip(self, sample_petcode_message):
+        """测试 deflate-dict 往返转换"""
+        code = petcode.to_base64(sample_petcode_message, codec='deflate-dict')
+        assert petcode.from_base64(code) == sample_petcode_message
+
+        binary = petcode.to_binary(sample_petcode_message, codec='deflate-dict')
+        assert binary[0] == 0x12
+        assert detect_codec(binary).name == 'deflate-dict'
+
+    def test_shorter_than_gzip(self, sample_petcode_message):
+        """测试内置字典生成的分享码比 gzip 更短"""
+        gzip_code = petcode.to_base64(sample_petcode_message)
+        dict_code = petcode.to_base64(sample_petcode_message, codec='deflate-dict')
+        assert len(dict_code) < len(gzip_code)
@@ -0,0 +1,148 @@
+"""测试编辑会话"""
+
+import petcode
+from petcode.editor import EditSession
+import pytest
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage, PetInfo
+
+
+@pytest.fixture
+def message(sample_petcode_message):
+    message = PetCodeMessage()
+    message.CopyFrom(sample_petcode_message)
+    for i in range(1, 4):
+        pet = message.pets.add()
+        pet.CopyFrom(message.pets[0])
+        pet.id += i
+    message.battle_fires.extend([1, 3])
+    return message
+
+
+def _assert_same(session):
+    assert session.serialize() == session.message.SerializeToString()
+    assert session.to_base64() == petcode.to_base64(session.message)
+
+
+class TestEditSession:
+    """测试编辑会话"""
+
+    def test_initial(self, message):
+        """测试初始编码结果与 to_base64 相同，且不修改传入的消息"""
+        session = EditSession(message)
+
+        assert session.to_base64() == petcode.to_base64(message)
+        assert session.message is not message
+        assert session.dirty == []
+
+        session.pet(0).level = 1
+        assert message.pets[0].level == 100
+
+    def test_empty(self):
+        """测试空消息"""
+        session = EditSession()
+
+        assert session.serialize() == b''
+        session.append_pet(PetInfo(id=1))
+        _assert_same(session)
+
+    def test_edit_pet(self, message):
+        """测试修改精灵后只重新序列化该精灵"""
+        session = EditSession(message)
+        session.to_binary()
+
+        session.pet(2).skills[0] = 1
+        assert session.dirty == [2]
+        _assert_same(session)
+        assert session.dirty == []
+
+    def test_edit_seer_set(self, message):
+        """测试修改 seer_set"""
+        session = EditSession(message)
+        session.to_binary()
+
+        session.seer_set.equips.append(1)
+        _assert_same(session)
+        session.message.ClearField('seer_set')
+        _assert_same(session)
+        session.seer_set.title_id = 0
+        _assert_same(session)
+
+    def test_top_level_fields(self, message):
+        """测试直接修改顶层的标量字段和 battle_fires"""
+        session = EditSession(message)
+        session.to_binary()
+
+        session.message.server = PetCodeMessage.Server.SERVER_TEST
+        session.message.display_mode = (
+            PetCodeMessage.DisplayMode.DISPLAY_MODE_UNSPECIFIED
+        )
+        session.message.battle_fires.append(4)
+        _assert_same(session)
+        del session.message.battle_fires[:]
+        session.message.server = -1  # type: ignore[assignment]
+        _assert_same(session)
+
+    def test_pet_list(self, message):
+        """测试修改精灵列表"""
+        session = EditSession(message)
+        session.to_binary()
+
+        session.move_pet(0, 3)
+        assert session.dirty == []
+        assert [pet.id for pet in session.message.pets] == [3843, 3844, 3845, 3842]
+        _assert_same(session)
+
+        session.set_pet(1, PetInfo(id=1))
+        session.insert_pet(0, PetInfo(id=2))
+        session.append_pet(PetInfo(id=3))
+        assert session.dirty == [0, 2, 5]
+        _assert_same(session)
+
+        removed = session.remove_pet(2)
+        assert removed.id == 1
+        assert [pet.id for pet in session.message.pets] == [2, 3843, 3845, 3842, 3]
+        _assert_same(session)
+
+    def test_mark_dirty(self, message):
+        """测试直接修改消息后标记为已修改"""
+        session = EditSession(message)
+        session.to_binary()
+
+        session.message.pets[1].level = 1
+        session.mark_dirty(1)
+        _assert_same(session)
+
+        session.message.pets[0].level = 1
+        session.message.seer_set.title_id = 2
+        session.mark_dirty()
+        assert session.dirty == [0, 1, 2, 3]
+        _assert_same(session)
+
+    def test_pet_count_changed(self, message):
+        """测试直接增删精灵时重新序列化所有精灵"""
+        session = EditSession(message)
+        session.to_binary()
+
+        del session.message.pets[0]
+        _assert_same(session)
+
+    def test_unknown_fields(self, message):
+        """测试保留顶层消息的未知字段"""
+        message = PetCodeMessage.FromString(
+            message.SerializeToString() + b'\xf8\x01\x05'
+        )
+        session = EditSession(message)
+
+        session.pet(0).level = 1
+        _assert_same(session)
+
+    def test_compress_cache(self, message):
+        """测试内容没有变化时复用压缩结果，并按编解码器区分"""
+        session = EditSession(message)
+        binary = session.to_binary()
+
+        session.pet(0)
+        assert session.to_binary() is binary
+
+        session.codec = 'deflate'
+        assert session.to_binary() == petcode.to_binary(message, codec='deflate')
@@ -5,9 +5,12 @@ import pytest
 from petcode.effect import (
     EffectParam,
     EffectType,
+    clear_effect_cache,
     effect_to_param,
+    effects_to_params,
     get_effect_type,
     param_to_effect,
+    params_to_effects,
 )
 from seerbp.petcode.v1.message_pb2 import PetInfo
 
@@ -360,3 +363,56 @@ class TestEdgeCases:
         assert restored.id == 100
         assert list(restored.args) == [1, 2]
 
+
+
+class TestBatchConversion:
+    """测试批量转换"""
+
+    def test_effects_to_params(self):
+        """测试批量转换与逐条转换结果一致"""
+        effects = [
+            PetInfo.Effect(id=67, status=1, args=[1, 5]),
+            PetInfo.Effect(id=100, status=888, args=[]),
+            PetInfo.Effect(id=3, status=5, args=[-1, 2, 3]),
+        ]
+        pet = PetInfo(effects=effects)
+
+        params = effects_to_params(pet.effects)
+
+        assert params == [effect_to_param(effect) for effect in effects]
+        assert effects_to_params([]) == []
+
+    def test_params_to_effects(self):
+        """测试批量还原"""
+        params = [
+            EffectParam(type=EffectType.GENERAL, name='67_1_5'),
+            EffectParam(type=EffectType.SOULMARK, name='12'),
+        ]
+
+        effects = params_to_effects(params)
+
+        assert effects == [param_to_effect(param) for param in params]
+        pet = PetInfo()
+        pet.effects.extend(effects)
+        assert effects_to_params(pet.effects) == params
+
+    def test_interned_names(self):
+        """测试相同特效共用同一个字符串对象"""
+        first = effect_to_param(PetInfo.Effect(id=67, status=1, args=[1, 5]))
+        second = effect_to_param(PetInfo.Effect(id=67, status=1, args=[1, 5]))
+
+        assert first.name is second.name
+
+    def test_invalid_name(self):
+        """测试无法解析的名称"""
+        with pytest.raises(ValueError, match='invalid literal'):
+            params_to_effects([EffectParam(type=EffectType.GENERAL, name='67_x')])
+
+    def test_clear_cache(self):
+        """测试清空缓存后结果不变"""
+        effect = PetInfo.Effect(id=67, status=1, args=[1, 5])
+        before = effect_to_param(effect)
+
+        clear_effect_cache()
+
+        assert effect_to_param(effect) == before
@@ -0,0 +1,254 @@
+"""测试专用字典转换与 json_format 的一致性"""
+
+import random
+
+from google.protobuf import json_format
+import petcode
+from petcode.create_and_read import (
+    create_ability_mintmark,
+    create_quanxiao_mintmark,
+    create_skill_mintmark,
+    create_universal_mintmark,
+)
+from petcode.fast_dict import dict_to_message, message_to_dict
+import pytest
+from seerbp.petcode.v1.message_pb2 import (
+    MintmarkInfo,
+    PetAbilityBonus,
+    PetAbilityValue,
+    PetCodeMessage,
+    PetInfo,
+    ResistanceInfo,
+)
+
+
+def _random_ability(rng: random.Random) -> PetAbilityValue:
+    return PetAbilityValue(
+        **{
+            name: rng.choice([0, rng.randint(1, 600)])
+            for name in (
+                'hp',
+                'attack',
+                'defense',
+                'special_attack',
+                'special_defense',
+                'speed',
+            )
+        }
+    )
+
+
+def _random_mintmark(rng: random.Random) -> MintmarkInfo:
+    kind = rng.randrange(5)
+    if kind == 0:
+        return create_skill_mintmark(id=rng.choice([0, 50001]))
+    if kind == 1:
+        return create_ability_mintmark(id=rng.randint(60000, 61000))
+    if kind == 2:
+        return create_quanxiao_mintmark(id=70001, skill_mintmark_id=rng.choice([0, 5]))
+    if kind == 3:
+        return MintmarkInfo()
+    if rng.random() < 0.5:
+        return create_universal_mintmark(
+            id=40001,
+            level=rng.randint(0, 5),
+            gem_id=rng.choice([0, 1800011]),
+            bind_skill_id=rng.choice([0, 24708]),
+        )
+    return create_universal_mintmark(
+        id=40001, level=5, ability=_random_ability(rng) if rng.random() < 0.5 else None
+    )
+
+
+def _random_pet(rng: random.Random) -> PetInfo:
+    pet = PetInfo(
+        id=rng.randint(0, 5000),
+        level=rng.choice([0, 100]),
+        dv=rng.choice([0, 31]),
+        nature=rng.randint(0, 25),
+        skills=[rng.randint(1, 40000) for _ in range(rng.randint(0, 5))],
+        extra_hp=rng.choice([0, 50]),
+        effects=[
+            PetInfo.Effect(
+                id=rng.randint(0, 200),
+                status=rng.choice([0, 1, 4, 5, 99]),
+                args=[rng.randint(-5, 10) for _ in range(rng.randint(0, 3))],
+            )
+            for _ in range(rng.randint(0, 3))
+        ],
+        mintmarks=[_random_mintmark(rng) for _ in range(rng.randint(0, 3))],
+        is_awaken=rng.random() < 0.5,
+        pet_items=[rng.randint(1, 300100) for _ in range(rng.randint(0, 2))],
+    )
+    if rng.random() < 0.7:
+        pet.evs.CopyFrom(_random_ability(rng))
+    if rng.random() < 0.7:
+        pet.ability_total.CopyFrom(_random_ability(rng))
+    if rng.random() < 0.5:
+        pet.skin_id = rng.choice([0, 100001])
+    if rng.random() < 0.5:
+        pet.resistance.CopyFrom(
+            ResistanceInfo(
+                hurt=(
+                    ResistanceInfo.Hurt(crit=35, regular=rng.choice([0, 35]))
+                    if rng.random() < 0.8
+                    else None
+                ),
+                ctl=[
+                    ResistanceInfo.StateItem(state_id=i, percent=rng.choice([0, 55]))
+                    for i in range(rng.randint(0, 3))
+                ],
+                weak=[ResistanceInfo.StateItem()] * rng.randint(0, 1),
+            )
+        )
+    for _ in range(rng.randint(0, 2)):
+        bonus = pet.ability_bonus.add(type=rng.choice([0, 1, 2, 99, 1000]))
+        if rng.random() < 0.8:
+            bonus.value.SetInParent()
+            for name in ('hp', 'attack', 'special_defense', 'speed'):
+                if rng.random() < 0.5:
+                    extra = getattr(bonus.value, name)
+                    extra.SetInParent()
+                    if rng.random() < 0.5:
+                        extra.value = rng.choice([0, 10])
+                    if rng.random() < 0.5:
+                        extra.percent = rng.choice([0, 5])
+    return pet
+
+
+def _random_message(rng: random.Random) -> PetCodeMessage:
+    message = PetCodeMessage(
+        server=rng.choice([0, 1, 2, 3, 4, 42]),  # type: ignore[arg-type]
+        display_mode=rng.choice([0, 1, 2, 3]),  # type: ignore[arg-type]
+        pets=[_random_pet(rng) for _ in range(rng.randint(0, 6))],
+        battle_fires=[rng.choice([0, 1, 4, 9]) for _ in range(rng.randint(0, 2))],  # type: ignore[misc]
+    )
+    if rng.random() < 0.7:
+        message.seer_set.SetInParent()
+        message.seer_set.equips.extend(
+            rng.randint(1, 600001) for _ in range(rng.randint(0, 5))
+        )
+        if rng.random() < 0.5:
+            message.seer_set.title_id = rng.choice([0, 100001])
+    return message
+
+
+RANDOM_MESSAGES = [_random_message(random.Random(seed)) for seed in range(200)]
+
+
+class TestMessageToDict:
+    """测试消息到字典的转换与 json_format 一致"""
+
+    def test_sample_message(self, sample_petcode_message):
+        """测试示例消息"""
+        assert message_to_dict(sample_petcode_message) == json_format.MessageToDict(
+            sample_petcode_message
+        )
+
+    def test_empty_message(self):
+        """测试空消息"""
+        assert message_to_dict(PetCodeMessage()) == {}
+
+    def test_explicit_presence_fields(self):
+        """测试 optional 字段为 0 时仍然输出"""
+        message = PetCodeMessage(
+            seer_set=PetCodeMessage.SeerSet(title_id=0),
+            pets=[
+                PetInfo(
+                    skin_id=0,
+                    ability_bonus=[
+                        PetAbilityBonus(
+                            value=PetAbilityBonus.Value(
+                                hp=PetAbilityBonus.ExtraValue(value=0)
+                            )
+                        )
+                    ],
+                )
+            ],
+        )
+        data = message_to_dict(message)
+        assert data == json_format.MessageToDict(message)
+        assert data['seerSet'] == {'titleId': 0}
+        assert data['pets'][0]['skinId'] == 0
+
+    def test_unknown_enum_value(self):
+        """测试未知枚举值输出为整数"""
+        message = PetCodeMessage(server=42)  # type: ignore[arg-type]
+        assert message_to_dict(message) == json_format.MessageToDict(message)
+
+    @pytest.mark.parametrize('index', range(len(RANDOM_MESSAGES)))
+    def test_random_messages(self, index):
+        """测试随机生成的消息"""
+        message = RANDOM_MESSAGES[index]
+        assert message_to_dict(message) == json_format.MessageToDict(message)
+
+    def test_to_dict_uses_fast_path(self, sample_petcode_message):
+        """测试 petcode.to_dict 结果不变"""
+        assert petcode.to_dict(sample_petcode_message) == json_format.MessageToDict(
+            sample_petcode_message
+        )
+
+
+class TestDictToMessage:
+    """测试字典到消息的转换与 json_format 一致"""
+
+    @pytest.mark.parametrize('index', range(len(RANDOM_MESSAGES)))
+    def test_random_roundtrip(self, index):
+        """测试随机消息的往返转换"""
+        message = RANDOM_MESSAGES[index]
+        data = json_format.MessageToDict(message)
+        assert dict_to_message(data) == json_format.ParseDict(data, PetCodeMessage())
+        assert dict_to_message(data) == message
+
+    def test_snake_case_keys(self, sample_petcode_message):
+        """测试原始字段名"""
+        data = json_format.MessageToDict(
+            sample_petcode_message, preserving_proto_field_name=True
+        )
+        assert dict_to_message(data) == sample_petcode_message
+
+    def test_integer_enums(self, sample_petcode_message):
+        """测试整数形式的枚举值"""
+        data = json_format.MessageToDict(
+            sample_petcode_message, use_integers_for_enums=True
+        )
+        assert dict_to_message(data) == sample_petcode_message
+
+    def test_empty_submessages(self):
+        """测试空的子消息会被设置"""
+        data = {'seerSet': {}, 'pets': [{'mintmarks': [{'skill': {}}], 'evs': {}}]}
+        message = dict_to_message(data)
+        assert message == json_format.ParseDict(data, PetCodeMessage())
+        assert message.HasField('seer_set')
+        assert message.pets[0].mintmarks[0].WhichOneof('mintmark') == 'skill'
+
+    @pytest.mark.parametrize(
+        'data',
+        [
+            {'pets': [{'id': '3842', 'level': 100.0}]},
+            {'pets': [{'skinId': None}]},
+            {'seerSet': {'titleId': '1'}},
+            {'displayMode': 1, 'display_mode': 2},
+        ],
+    )
+    def test_fallback_inputs(self, data):
+        """测试快速路径不处理的输入回退到 json_format"""
+        assert dict_to_message(data) == json_format.ParseDict(data, PetCodeMessage())
+
+    @pytest.mark.parametrize(
+        'data',
+        [
+            {'unknownField': 1},
+            {'server': 'SERVER_UNKNOWN'},
+            {'pets': [{'id': 2**31}]},
+            {'pets': [{'isAwaken': 1}]},
+            {'pets': [{'mintmarks': [{'skill': {}, 'ability': {}}]}]},
+            {'pets': {}},
+        ],
+    )
+    def test_invalid_inputs(self, data):
+        """测试无效输入与 json_format 抛出相同的异常"""
+        with pytest.raises(json_format.ParseError):
+            json_format.ParseDict(data, PetCodeMessage())
+        with pytest.raises(json_format.ParseError):
+            dict_to_message(data)
@@ -0,0 +1,211 @@
+"""测试倒排索引"""
+
+from array import array
+
+from petcode.archive import ArchiveReader, write_archive
+from petcode.create_and_read import create_skill_mintmark
+from petcode.index import (
+    IndexBuilder,
+    IndexFormatError,
+    PetCodeIndex,
+    build_index,
+    intersect,
+    union,
+)
+import pytest
+from seerbp.petcode.v1.message_pb2 import MintmarkInfo, PetCodeMessage, PetInfo
+
+
+def _message(pet_id, skills, *, server=1, effect=(67, 1), mintmark=None):
+    pet = PetInfo(
+        id=pet_id,
+        nature=pet_id % 25,
+        skills=skills,
+        effects=[PetInfo.Effect(id=effect[0], status=effect[1])],
+    )
+    if mintmark is not None:
+        pet.mintmarks.append(create_skill_mintmark(mintmark))
+    return PetCodeMessage(server=server, display_mode=1, pets=[pet])
+
+
+@pytest.fixture
+def messages():
+    messages = [
+        _message(3842, [24708, 100], mintmark=5),
+        _message(3842, [200]),
+        _message(1000, [24708], server=2, effect=(67, 2)),
+        _message(3842, [24708, 24708]),
+    ]
+    # 大量相同的记录使部分倒排列表以位图保存
+    messages.extend(_message(2000 + i % 3, [300]) for i in range(200))
+    return messages
+
+
+def _brute_force(messages, predicate):
+    return [i for i, message in enumerate(messages) if predicate(message)]
+
+
+class TestPetCodeIndex:
+    """测试建立和查询索引"""
+
+    def test_match_all(self, messages):
+        """测试 AND 查询"""
+        index = build_index(messages)
+
+        records = index.match_all([('pet', 3842), ('skill', 24708)])
+
+        assert isinstance(records, array)
+        assert list(records) == [0, 3]
+
+    def test_match_any(self, messages):
+        """测试 OR 查询"""
+        index = build_index(messages)
+
+        records = index.match_any([('pet', 1000), ('skill', 200), ('pet', 9999)])
+
+        assert list(records) == [1, 2]
+
+    def test_nested_query(self, messages):
+        """测试组合 intersect 与 union"""
+        index = build_index(messages)
+
+        records = intersect(
+            index.postings('skill', 24708),
+            union(index.postings('server', 2), index.postings('mintmark', 5)),
+        )
+
+        assert list(records) == [0, 2]
+
+    def test_all_fields(self, messages):
+        """测试各字段的倒排列表与逐条检查的结果一致"""
+        index = build_index(messages)
+
+        cases = {
+            ('pet', 2001): lambda m: m.pets[0].id == 2001,
+            ('nature', 3842 % 25): lambda m: m.pets[0].nature == 3842 % 25,
+            ('effect', (67, 2)): lambda m: m.pets[0].effects[0].status == 2,
+            ('server', 1): lambda m: m.server == 1,
+            ('display_mode', 1): lambda m: m.display_mode == 1,
+            ('skill', 300): lambda m: 300 in m.pets[0].skills,
+        }
+        for (field, value), predicate in cases.items():
+            expected = _brute_force(messages, predicate)
+            assert list(index.postings(field, value)) == expected
+            assert index.count(field, value) == len(expected)
+
+    def test_bitmap_queries(self, messages):
+        """测试位图与数组混合的 AND/OR 查询与逐条检查的结果一致"""
+        index = build_index(messages)
+        checks = {
+            ('server', 1): lambda m: m.server == 1,
+            ('skill', 300): lambda m: 300 in m.pets[0].skills,
+            ('pet', 2001): lambda m: m.pets[0].id == 2001,
+            ('pet', 2002): lambda m: m.pets[0].id == 2002,
+            ('pet', 3842): lambda m: m.pets[0].id == 3842,
+        }
+        queries = [
+            [('server', 1), ('skill', 300)],
+            [('server', 1), ('pet', 2001), ('skill', 300)],
+            [('pet', 3842), ('server', 1)],
+            [('pet', 2001), ('pet', 2002)],
+            [('pet', 3842), ('pet', 2002)],
+        ]
+
+        for terms in queries:
+            predicates = [checks[term] for term in terms]
+            assert list(index.match_all(terms)) == _brute_force(
+                messages, lambda m, p=predicates: all(f(m) for f in p)
+            )
+            assert list(index.match_any(terms)) == _brute_force(
+                messages, lambda m, p=predicates: any(f(m) for f in p)
+            )
+
+    def test_match_all_stops_when_empty(self, messages, monkeypatch):
+        """测试交集为空后不再读取其他列表"""
+        index = build_index(messages)
+        read = []
+        original = PetCodeIndex._read
+
+        def spy(self, entry, term):
+            read.append(term)
+            return original(self, entry, term)
+
+        monkeypatch.setattr(PetCodeIndex, '_read', spy)
+        terms = [('pet', 1000), ('pet', 3842), ('server', 1), ('skill', 300)]
+
+        assert list(index.match_all(terms)) == []
+        assert read == [('pet', 1000), ('pet', 3842)]
+
+    def test_unset_mintmark(self):
+        """测试跳过未设置类型的刻印"""
+        message = PetCodeMessage(pets=[PetInfo(id=1, mintmarks=[MintmarkInfo()])])
+        index = build_index([message, _message(2, [1], mintmark=5)])
+
+        assert list(index.postings('pet', 1)) == [0]
+        assert index.terms('mintmark') == {5: 1}
+
+    def test_terms(self, messages):
+        """测试列出字段中的所有值"""
+        index = build_index(messages)
+
+        assert index.terms('effect') == {(67, 1): 203, (67, 2): 1}
+        assert index.terms('server') == {1: 203, 2: 1}
+
+    def test_missing_term(self, messages):
+        """测试不存在的词项"""
+        index = build_index(messages)
+
+        assert list(index.postings('pet', 1)) == []
+        assert list(index.match_all([('pet', 1), ('server', 1)])) == []
+
+    def test_unknown_field(self, messages):
+        """测试未知字段"""
+        index = build_index(messages)
+
+        with pytest.raises(ValueError, match='Unknown index field'):
+            index.postings('level', 100)
+        with pytest.raises(ValueError, match='at least one term'):
+            index.match_all([])
+
+    def test_index_archive_file(self, tmp_path, messages):
+        """测试为归档文件建立索引并按序号读取命中的记录"""
+        write_archive(tmp_path / 'pets.pcar', messages, records_per_block=16)
+        builder = IndexBuilder()
+        with ArchiveReader(tmp_path / 'pets.pcar') as archive:
+            assert builder.add_many(archive) == len(messages)
+        builder.write(tmp_path / 'pets.pcix')
+
+        with PetCodeIndex(tmp_path / 'pets.pcix') as index:
+            assert len(index) == len(messages)
+            records = index.match_all([('pet', 2002), ('skill', 300)])
+        with ArchiveReader(tmp_path / 'pets.pcar') as archive:
+            found = [archive[i] for i in records]
+
+        assert found == [m for m in messages if m.pets[0].id == 2002]
+
+    def test_invalid_data(self, tmp_path):
+        """测试非索引数据"""
+        with pytest.raises(IndexFormatError, match='Not a PetCode index'):
+            PetCodeIndex(b'x' * 64)
+        (tmp_path / 'empty.pcix').write_bytes(b'')
+        with pytest.raises(IndexFormatError, match='too short'):
+            PetCodeIndex(tmp_path / 'empty.pcix')
+
+
+class TestSetOperations:
+    """测试有序列表的集合运算"""
+
+    def test_intersect(self):
+        """测试长度相近与相差悬殊的列表求交集"""
+        small = array('I', [3, 50, 999])
+        large = array('I', range(0, 1000, 3))
+
+        assert list(intersect(small, large)) == [3, 999]
+        assert list(intersect(large, array('I', range(0, 1000, 2)))) == list(
+            range(0, 1000, 6)
+        )
+        assert list(intersect()) == []
+
+    def test_union(self):
+        """测试求并集"""
+        assert list(union(array('I', [1, 5]), array('I', [2, 5, 9]))) == [1, 2, 5, 9]
@@ -0,0 +1,77 @@
+"""测试并行解码"""
+
+import petcode
+from petcode.parallel import ParallelDecoder, decode_parallel
+import pytest
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+
+class TestParallelDecoder:
+    """测试进程池并行解码"""
+
+    def test_decode_base64_in_order(self, sample_petcode_message):
+        """测试结果顺序与输入一致"""
+        messages = [
+            PetCodeMessage(server=PetCodeMessage.Server.SERVER_OFFICIAL),
+            sample_petcode_message,
+            PetCodeMessage(server=PetCodeMessage.Server.SERVER_TEST),
+        ] * 5
+        codes = petcode.to_base64_many(messages)
+
+        with ParallelDecoder(max_workers=2, chunk_size=4) as decoder:
+            restored = decoder.decode_base64(codes)
+
+        assert restored == messages
+
+    def test_decode_binary_serialized(self, sample_petcode_message):
+        """测试返回序列化数据"""
+        binaries = petcode.to_binary_many([sample_petcode_message] * 3)
+
+        with ParallelDecoder(max_workers=1, chunk_size=2) as decoder:
+            restored = decoder.decode_binary(iter(binaries), serialized=True)
+
+        assert restored == [sample_petcode_message.SerializeToString()] * 3
+
+    def test_decode_reports_errors(self, sample_petcode_message):
+        """测试单条错误以异常对象返回"""
+        code = petcode.to_base64(sample_petcode_message)
+        restored = decode_parallel(
+            [code, 'invalid!!!base64', code], max_workers=1, chunk_size=2
+        )
+
+        assert restored[0] == sample_petcode_message
+        assert isinstance(restored[1], Exception)
+        assert restored[2] == sample_petcode_message
+
+    def test_decode_empty(self):
+        """测试空输入"""
+        assert decode_parallel([], max_workers=1) == []
+
+    def test_invalid_arguments(self):
+        """测试无效参数"""
+        with pytest.raises(ValueError, match='chunk_size'):
+            ParallelDecoder(chunk_size=0)
+        with (
+            ParallelDecoder(max_workers=1) as decoder,
+            pytest.raises(ValueError, match='encoding'),
+        ):
+            decoder.decode([], encoding='json')  # type: ignore[arg-type]
+        with pytest.raises(ValueError, match='max_pending'):
+            ParallelDecoder(max_pending=0)
+
+    def test_bounded_submission(self, sample_petcode_message):
+        """测试输入按需读取，同时提交的任务不超过 max_pending"""
+        code = petcode.to_base64(sample_petcode_message)
+        consumed = 0
+
+        def codes():
+            nonlocal consumed
+            while True:
+                consumed += 1
+                yield code
+
+        with ParallelDecoder(max_workers=1, chunk_size=2, max_pending=2) as decoder:
+            results = decoder.decode_iter(codes())
+            assert next(results) == sample_petcode_message
+            assert consumed <= 2 * 3 + 1
+            results.close()
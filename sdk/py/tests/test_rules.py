@@ -0,0 +1,303 @@
+"""测试合法性规则"""
+
+from petcode import rules
+from petcode.create_and_read import (
+    create_quanxiao_mintmark,
+    create_skill_mintmark,
+    create_universal_mintmark,
+)
+from petcode.rules import (
+    DEFAULT_RULES,
+    Allowed,
+    MaxCount,
+    Range,
+    Rule,
+    RuleSet,
+    Sum,
+    Unique,
+    Violation,
+    mintmark_id,
+)
+import pytest
+from seerbp.petcode.v1.message_pb2 import MintmarkInfo, PetCodeMessage, PetInfo
+
+
+def _copy(message):
+    result = PetCodeMessage()
+    result.CopyFrom(message)
+    return result
+
+
+def _set_ev(pet):
+    pet.evs.attack = 256
+
+
+def _set_ev_total(pet):
+    pet.evs.hp = pet.evs.attack = pet.evs.defense = 200
+
+
+def _add_skills(pet):
+    pet.skills.extend([1, 2])
+
+
+def _duplicate_skill(pet):
+    pet.skills.append(pet.skills[1])
+
+
+def _add_effect(pet):
+    pet.effects.add(id=1, status=3)
+
+
+def _duplicate_mintmark(pet):
+    pet.mintmarks.append(create_skill_mintmark(1))
+    pet.mintmarks.append(create_quanxiao_mintmark(1, skill_mintmark_id=2))
+
+
+def _set_hurt(pet):
+    pet.resistance.hurt.regular = 36
+
+
+def _set_ctl(pet):
+    pet.resistance.ctl[2].percent = 56
+
+
+def _add_weak(pet):
+    pet.resistance.weak.add(state_id=1, percent=-1)
+
+
+def _set_bonus_type(pet):
+    pet.ability_bonus[0].type = 7  # type: ignore[assignment]
+
+
+class TestDefaultRules:
+    """测试默认规则"""
+
+    def test_valid(self, sample_petcode_message):
+        """测试示例数据没有违反规则"""
+        assert rules.check(sample_petcode_message) == []
+
+    @pytest.mark.parametrize(
+        ('mutate', 'rule', 'path', 'value'),
+        [
+            (lambda pet: setattr(pet, 'level', 101), 'level', 'pets[0].level', 101),
+            (lambda pet: setattr(pet, 'dv', -1), 'dv', 'pets[0].dv', -1),
+            (_set_ev, 'ev', 'pets[0].evs.attack', 256),
+            (_set_ev_total, 'ev_total', 'pets[0].evs', 624),
+            (_add_skills, 'skill_count', 'pets[0].skills', 6),
+            (_duplicate_skill, 'skill_unique', 'pets[0].skills[4]', 31567),
+            (_add_effect, 'effect_status', 'pets[0].effects[1].status', 3),
+            (_duplicate_mintmark, 'mintmark_unique', 'pets[0].mintmarks[2]', 1),
+            (_set_hurt, 'hurt_resistance', 'pets[0].resistance.hurt.regular', 36),
+            (_set_ctl, 'ctl_resistance', 'pets[0].resistance.ctl[2].percent', 56),
+            (_add_weak, 'weak_resistance', 'pets[0].resistance.weak[0].percent', -1),
+            (_set_bonus_type, 'ability_bonus_type', 'pets[0].ability_bonus[0].type', 7),
+        ],
+    )
+    def test_violation(self, sample_petcode_message, mutate, rule, path, value):
+        """测试每条默认规则"""
+        message = _copy(sample_petcode_message)
+        mutate(message.pets[0])
+
+        violations = rules.check(message)
+
+        assert [(v.rule, v.path, v.value) for v in violations] == [(rule, path, value)]
+
+    def test_order(self, sample_petcode_message):
+        """测试结果按精灵、规则和元素的顺序排列"""
+        message = _copy(sample_petcode_message)
+        message.pets.add().CopyFrom(message.pets[0])
+        first, second = message.pets
+        second.resistance.ctl[1].percent = 60
+        second.resistance.ctl[0].percent = 60
+        second.level = 0
+        first.skills.extend([24708, 24708])
+
+        violations = rules.check(message)
+
+        assert [v.path for v in violations] == [
+            'pets[0].skills',
+            'pets[0].skills[4]',
+            'pets[0].skills[5]',
+            'pets[1].level',
+            'pets[1].resistance.ctl[0].percent',
+            'pets[1].resistance.ctl[1].percent',
+        ]
+        assert violations[0] == Violation(
+            'skill_count', 'pets[0].skills', 6, MaxCount(5)
+        )
+
+    def test_unset_optional(self, sample_petcode_message):
+        """测试未设置的 optional 字段不检查"""
+        message = _copy(sample_petcode_message)
+        message.pets[0].ClearField('resistance')
+
+        assert rules.check(message) == []
+
+    def test_check_many(self, sample_petcode_message):
+        """测试批量检查"""
+        invalid = _copy(sample_petcode_message)
+        invalid.pets[0].level = 0
+
+        results = rules.check_many([sample_petcode_message, invalid])
+
+        assert results[0] == []
+        assert [v.rule for v in results[1]] == ['level']
+
+
+class TestRuleSet:
+    """测试自定义规则"""
+
+    def test_oneof_path(self):
+        """测试经过 oneof 字段的路径只检查设置了该类型的刻印"""
+        rule_set = RuleSet(
+            [Rule('mintmark_level', 'mintmarks.universal.level', Range(max=5))]
+        )
+        pet = PetInfo(
+            mintmarks=[
+                create_skill_mintmark(1),
+                create_universal_mintmark(id=2, level=6),
+                create_universal_mintmark(id=3, level=5),
+            ]
+        )
+
+        assert rule_set.check_pet(pet, 2) == [
+            Violation(
+                'mintmark_level',
+                'pets[2].mintmarks[1].universal.level',
+                6,
+                Range(max=5),
+            )
+        ]
+
+    def test_wildcard_and_sum(self):
+        """测试 ``*`` 展开和 Sum"""
+        rule_set = RuleSet(
+            [
+                Rule('total', 'ability_total.*', Range(min=1)),
+                Rule('total_sum', 'ability_total', Sum(600)),
+            ]
+        )
+        pet = PetInfo()
+        pet.ability_total.hp = 700
+
+        assert [(v.rule, v.path) for v in rule_set.check_pet(pet)] == [
+            ('total', 'pets[0].ability_total.attack'),
+            ('total', 'pets[0].ability_total.defense'),
+            ('total', 'pets[0].ability_total.special_attack'),
+            ('total', 'pets[0].ability_total.special_defense'),
+            ('total', 'pets[0].ability_total.speed'),
+            ('total_sum', 'pets[0].ability_total'),
+        ]
+
+    def test_unique_key(self):
+        """测试 Unique 的 key"""
+        rule_set = RuleSet(
+            [
+                Rule('effect_id', 'effects', Unique(lambda effect: effect.id)),
+                Rule('item', 'pet_items', Allowed(frozenset({1, 2}))),
+            ]
+        )
+        pet = PetInfo(
+            effects=[PetInfo.Effect(id=1), PetInfo.Effect(id=1, status=1)],
+            pet_items=[1, 3],
+        )
+
+        assert [(v.rule, v.path, v.value) for v in rule_set.check_pet(pet)] == [
+            ('effect_id', 'pets[0].effects[1]', 1),
+            ('item', 'pets[0].pet_items[1]', 3),
+        ]
+
+    @pytest.mark.parametrize(
+        ('rule', 'match'),
+        [
+            (Rule('x', 'unknown', Range(0, 1)), "unknown field 'unknown'"),
+            (Rule('x', 'level.value', Range(0, 1)), 'not a message field'),
+            (Rule('x', 'evs', Range(0, 1)), 'needs a number'),
+            (Rule('x', 'level', MaxCount(1)), 'needs a repeated field'),
+            (Rule('x', 'skills', Sum(1)), 'Sum needs a message field'),
+        ],
+    )
+    def test_invalid_rule(self, rule, match):
+        """测试无效的规则在创建规则集时报错"""
+        with pytest.raises(ValueError, match=match):
+            RuleSet([rule])
+
+    def test_mintmark_id(self):
+        """测试刻印 ID"""
+        assert mintmark_id(create_quanxiao_mintmark(5, skill_mintmark_id=6)) == 5
+        assert mintmark_id(MintmarkInfo()) == 0
+
+
+class TestCheckColumns:
+    """测试在列式数据上检查"""
+
+    @pytest.fixture
+    def messages(self, sample_petcode_message):
+        pytest.importorskip('numpy')
+        messages = [_copy(sample_petcode_message) for _ in range(4)]
+        messages[0].pets.add().CopyFrom(messages[0].pets[0])
+        messages[0].pets[1].level = 0
+        messages[0].pets[1].evs.hp = 300
+        messages[2].pets[0].skills.extend([1, 24708, 1])
+        messages[2].pets[0].effects.add(id=1, status=3)
+        messages[3].pets[0].mintmarks.append(messages[3].pets[0].mintmarks[0])
+        messages[3].pets.add(level=1, mintmarks=[MintmarkInfo(), MintmarkInfo()])
+        return messages
+
+    def test_same_as_check(self, messages):
+        """测试结果与逐条检查相同"""
+        from petcode.analytics import messages_to_columns
+
+        supported = [
+            rule
+            for rule in DEFAULT_RULES
+            if rule.path.split('.')[0] not in ('resistance', 'ability_bonus')
+        ]
+        supported += [
+            Rule('nature', 'nature', Allowed(frozenset({1}))),
+            Rule('item', 'pet_items', Range(max=300001)),
+            Rule('effect_count', 'effects', MaxCount(1)),
+        ]
+        rule_set = RuleSet(supported)
+
+        found = rule_set.check_columns(messages_to_columns(messages))
+
+        expected = [
+            (index, violation)
+            for index, violations in enumerate(rule_set.check_many(messages))
+            for violation in violations
+        ]
+        assert len(expected) > 8
+        assert found == expected
+
+    def test_unsupported(self, messages):
+        """测试无法在列式数据上检查的规则"""
+        from petcode.analytics import messages_to_columns
+
+        columns = messages_to_columns(messages)
+
+        with pytest.raises(ValueError, match='hurt_resistance'):
+            rules.DEFAULT_RULE_SET.check_columns(columns)
+        found = rules.DEFAULT_RULE_SET.check_columns(columns, skip_unsupported=True)
+        assert {index for index, _ in found} == {0, 2, 3}
+
+    def test_default_rules_with_messages(self, messages):
+        """测试传入消息时无法向量化的规则逐只精灵检查，结果与逐条检查相同"""
+        from petcode.analytics import messages_to_columns
+
+        messages[1].pets[0].resistance.hurt.crit = 100
+        messages[3].pets[0].ability_bonus.add(type=50)
+        columns = messages_to_columns(messages)
+
+        found = rules.DEFAULT_RULE_SET.check_columns(columns, messages)
+
+        expected = [
+            (index, violation)
+            for index, violations in enumerate(rules.check_many(messages))
+            for violation in violations
+        ]
+        assert {v.rule for _, v in found} >= {
+            'hurt_resistance',
+            'ability_bonus_type',
+        }
+        assert found == expected
@@ -330,3 +330,61 @@ class TestEdgeCases:
         assert len(data['battleFires']) == 2
         restored_dict = petcode.from_dict(data)
         assert len(restored_dict.battle_fires) == 2
+
+
+class TestBatchSerialization:
+    """测试批量序列化"""
+
+    def test_binary_many_roundtrip(self, sample_petcode_message):
+        """测试批量二进制往返转换"""
+        messages = [sample_petcode_message, PetCodeMessage()]
+        binaries = petcode.to_binary_many(messages)
+        restored = petcode.from_binary_many(binaries)
+
+        assert len(restored) == 2
+        assert restored[0] == sample_petcode_message
+        assert restored[1] == PetCodeMessage()
+
+    def test_base64_many_roundtrip(self, sample_petcode_message):
+        """测试批量 Base64 往返转换"""
+        codes = petcode.to_base64_many([sample_petcode_message] * 3)
+        restored = petcode.from_base64_many(codes)
+
+        assert all(msg == sample_petcode_message for msg in restored)
+
+    def test_many_matches_single(self, sample_petcode_message):
+        """测试批量结果与单条结果一致"""
+        assert petcode.to_base64_many([sample_petcode_message]) == [
+            petcode.to_base64(sample_petcode_message)
+        ]
+        assert petcode.to_binary_many([sample_petcode_message]) == [
+            petcode.to_binary(sample_petcode_message)
+        ]
+
+    def test_gzip_compatibility(self, sample_petcode_message):
+        """测试兼容标准 gzip 模块生成的数据"""
+        import gzip
+
+        binary = gzip.compress(sample_petcode_message.SerializeToString())
+        assert petcode.from_binary(binary) == sample_petcode_message
+        assert petcode.from_binary_many([binary]) == [sample_petcode_message]
+
+    def test_many_reports_errors_in_place(self, sample_petcode_message):
+        """测试单条错误不会中断批次"""
+        code = petcode.to_base64(sample_petcode_message)
+        restored = petcode.from_base64_many([code, 'invalid!!!base64', code])
+
+        assert restored[0] == sample_petcode_message
+        assert isinstance(restored[1], Exception)
+        assert restored[2] == sample_petcode_message
+
+    def test_many_accepts_iterables(self, sample_petcode_message):
+        """测试批量函数接受任意可迭代对象"""
+        codes = petcode.to_base64_many(iter([sample_petcode_message]))
+        restored = petcode.from_base64_many(code for code in codes)
+        assert restored == [sample_petcode_message]
+
+    def test_many_empty_input(self):
+        """测试空输入"""
+        assert petcode.to_base64_many([]) == []
+        assert petcode.from_binary_many([]) == []
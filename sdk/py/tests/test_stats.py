@@ -0,0 +1,222 @@
+"""测试能力值计算"""
+
+from petcode.create_and_read import (
+    create_ability_mintmark,
+    create_quanxiao_mintmark,
+    create_skill_mintmark,
+    create_universal_mintmark,
+)
+from petcode.stats import (
+    DEFAULT_BONUS_ORDER,
+    TableProvider,
+    compute_ability_total,
+    compute_ability_totals,
+    normalize_ability_totals,
+)
+from petcode.view import AbilityView
+import pytest
+from seerbp.petcode.v1.message_pb2 import PetAbilityBonus, PetAbilityValue, PetInfo
+
+
+@pytest.fixture
+def provider():
+    return TableProvider(
+        base_stats={1: (100, 120, 80, 90, 85, 110), 2: (50, 50, 50, 50, 50, 50)},
+        natures={1: (100, 110, 90, 100, 100, 100), 2: (100,) * 6},
+        mintmarks={
+            10: (0, 10, 0, 0, 0, 5),
+            20: (1, 1, 1, 1, 1, 1),
+            (20, 5): (5, 5, 5, 5, 5, 5),
+            30: (0, 0, 20, 0, 20, 0),
+        },
+    )
+
+
+def _pet(**kwargs):
+    return PetInfo(
+        id=1,
+        level=100,
+        dv=31,
+        nature=1,
+        evs=PetAbilityValue(hp=252, speed=252),
+        **kwargs,
+    )
+
+
+def _bonus(bonus_type=PetAbilityBonus.Type.TYPE_TEAM_TECH, **values):
+    return PetAbilityBonus(
+        type=bonus_type,
+        value=PetAbilityBonus.Value(
+            **{
+                name: PetAbilityBonus.ExtraValue(**value)
+                for name, value in values.items()
+            }
+        ),
+    )
+
+
+class TestComputeAbilityTotal:
+    """测试单只精灵的计算"""
+
+    def test_formula(self, provider):
+        """测试种族值、个体值、学习力、等级和性格修正"""
+        assert compute_ability_total(_pet(), provider) == (404, 303, 176, 216, 206, 319)
+
+        pet = _pet()
+        pet.level = 50
+        assert compute_ability_total(pet, provider).hp == 207
+
+    def test_mintmarks(self, provider):
+        """测试各类刻印的数值"""
+        pet = _pet(
+            mintmarks=[
+                create_skill_mintmark(99),
+                create_ability_mintmark(10),
+                create_quanxiao_mintmark(30, skill_mintmark_id=99),
+                create_universal_mintmark(id=20, level=5),
+                create_universal_mintmark(id=20, level=1),
+            ]
+        )
+
+        assert compute_ability_total(pet, provider) == (
+            404 + 5 + 1,
+            303 + 10 + 5 + 1,
+            176 + 20 + 5 + 1,
+            216 + 5 + 1,
+            206 + 20 + 5 + 1,
+            319 + 5 + 5 + 1,
+        )
+
+    def test_universal_ability_override(self, provider):
+        """测试全能刻印的自定义数值优先于按等级查询的数值"""
+        ability = PetAbilityValue(hp=7, attack=8)
+        pet = _pet(
+            mintmarks=[create_universal_mintmark(id=20, level=5, ability=ability)]
+        )
+
+        assert compute_ability_total(pet, provider)[:3] == (411, 311, 176)
+
+    def test_ability_bonus(self, provider):
+        """测试加成的固定值和百分比，以及额外体力上限"""
+        pet = _pet(
+            ability_bonus=[
+                _bonus(hp={'value': 100, 'percent': 10}, attack={'percent': 5}),
+                _bonus(attack={'value': 20, 'percent': 5}),
+            ],
+            extra_hp=50,
+        )
+
+        result = compute_ability_total(pet, provider)
+
+        assert result.hp == (404 + 100) * 110 // 100 + 50
+        assert result.attack == (303 + 20) * 110 // 100
+        assert result.defense == 176
+
+    def test_bonus_order(self, provider):
+        """测试按 bonus_order 分组依次结算加成，不在其中的类型不参与计算"""
+        pet = _pet(
+            ability_bonus=[
+                _bonus(hp={'value': 100, 'percent': 10}),
+                _bonus(PetAbilityBonus.Type.TYPE_SOULMARK, hp={'value': 20}),
+                _bonus(PetAbilityBonus.Type.TYPE_AWAKEN, hp={'percent': 50}),
+            ]
+        )
+        team, soulmark = (
+            PetAbilityBonus.Type.TYPE_TEAM_TECH,
+            PetAbilityBonus.Type.TYPE_SOULMARK,
+        )
+
+        assert provider.bonus_order == DEFAULT_BONUS_ORDER
+        assert compute_ability_total(pet, provider).hp == (404 + 120) * 160 // 100
+
+        provider.bonus_order = [{soulmark}, {team}]
+        assert compute_ability_total(pet, provider).hp == (404 + 20 + 100) * 110 // 100
+
+        provider.bonus_order = [{team}, {soulmark}]
+        assert compute_ability_total(pet, provider).hp == (404 + 100) * 110 // 100 + 20
+
+        provider.bonus_order = [{team}, {team, soulmark}]
+        with pytest.raises(ValueError, match='more than one group'):
+            compute_ability_total(pet, provider)
+
+    def test_missing_data(self, provider):
+        """测试缺少数据时抛出 KeyError"""
+        with pytest.raises(KeyError):
+            compute_ability_total(PetInfo(id=3), provider)
+        with pytest.raises(KeyError):
+            compute_ability_total(
+                _pet(mintmarks=[create_ability_mintmark(11)]), provider
+            )
+
+
+class TestBatch:
+    """测试批量计算和规范化"""
+
+    def test_same_as_single(self, provider):
+        """测试批量计算的结果与逐只计算相同"""
+        np = pytest.importorskip('numpy')
+        pets = [
+            _pet(),
+            PetInfo(id=2, level=1, nature=2),
+            _pet(
+                mintmarks=[
+                    create_universal_mintmark(id=20, level=5),
+                    create_universal_mintmark(
+                        id=20, level=5, ability=PetAbilityValue(speed=3)
+                    ),
+                    create_ability_mintmark(10),
+                ],
+                ability_bonus=[_bonus(speed={'value': 5, 'percent': 20})] * 2,
+                extra_hp=10,
+            ),
+            _pet(ability_bonus=[_bonus(hp={'percent': -10})]),
+        ]
+
+        pets.append(
+            _pet(
+                ability_bonus=[
+                    _bonus(hp={'value': 7, 'percent': 30}),
+                    _bonus(
+                        PetAbilityBonus.Type.TYPE_AWAKEN,
+                        hp={'value': 3, 'percent': -5},
+                        speed={'percent': 15},
+                    ),
+                    _bonus(PetAbilityBonus.Type.TYPE_SPECIAL, attack={'value': 9}),
+                ],
+                mintmarks=[create_ability_mintmark(10)],
+            )
+        )
+
+        for order in (
+            DEFAULT_BONUS_ORDER,
+            [
+                {PetAbilityBonus.Type.TYPE_AWAKEN},
+                {PetAbilityBonus.Type.TYPE_TEAM_TECH},
+            ],
+        ):
+            provider.bonus_order = order
+            result = compute_ability_totals(pets, provider)
+
+            assert result.dtype == np.int64
+            assert result.tolist() == [
+                list(compute_ability_total(pet, provider)) for pet in pets
+            ]
+        assert compute_ability_totals([], provider).shape == (0, 6)
+
+    def test_normalize(self, provider):
+        """测试规范化只修改与计算结果不同的精灵"""
+        expected = compute_ability_total(_pet(), provider)
+        correct = _pet(ability_total=expected.to_proto())
+        wrong = _pet(ability_total=PetAbilityValue(hp=1))
+
+        assert normalize_ability_totals([correct, wrong], provider) == [1]
+        assert AbilityView.from_proto(wrong.ability_total) == expected
+
+    def test_normalize_missing_data(self, provider):
+        """测试缺少数据时不修改任何精灵"""
+        first = _pet()
+        pets = [first, PetInfo(id=3)]
+
+        with pytest.raises(KeyError):
+            normalize_ability_totals(pets, provider)
+        assert not first.HasField('ability_total')
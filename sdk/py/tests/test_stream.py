@@ -0,0 +1,150 @@
+"""测试流式解码"""
+
+import gzip
+import io
+import zlib
+
+import petcode
+from petcode.stream import LineTooLongError
+import pytest
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+
+def _write_codes(messages):
+    return '\n'.join(petcode.to_base64_many(messages)) + '\n'
+
+
+class TestIterDecode:
+    """测试 iter_decode"""
+
+    def test_decode_path(self, tmp_path, sample_petcode_message):
+        """测试从文件路径读取"""
+        path = tmp_path / 'codes.txt'
+        path.write_text(_write_codes([sample_petcode_message, PetCodeMessage()]))
+
+        results = list(petcode.iter_decode(path))
+
+        assert results == [(1, sample_petcode_message), (2, PetCodeMessage())]
+
+    def test_decode_gzip_file(self, tmp_path, sample_petcode_message):
+        """测试自动识别 gzip 压缩的文件"""
+        path = tmp_path / 'codes.txt.gz'
+        with gzip.open(path, 'wt') as f:
+            f.write(_write_codes([sample_petcode_message] * 3))
+
+        results = list(petcode.iter_decode(str(path)))
+
+        assert [line_no for line_no, _ in results] == [1, 2, 3]
+        assert all(msg == sample_petcode_message for _, msg in results)
+
+    def test_decode_file_objects(self, sample_petcode_message):
+        """测试从二进制和文本文件对象读取"""
+        text = _write_codes([sample_petcode_message])
+
+        binary_results = list(petcode.iter_decode(io.BytesIO(text.encode())))
+        text_results = list(
+            petcode.iter_decode(io.TextIOWrapper(io.BytesIO(text.encode())))
+        )
+
+        assert binary_results == text_results == [(1, sample_petcode_message)]
+
+    def test_decode_string_io(self, sample_petcode_message):
+        """测试没有底层二进制缓冲区的文本流"""
+        text = _write_codes([sample_petcode_message] * 3) + 'invalid\n'
+
+        results = list(petcode.iter_decode(io.StringIO(text), buffer_size=64))
+
+        assert results[:3] == [(i, sample_petcode_message) for i in (1, 2, 3)]
+        assert isinstance(results[3][1], Exception)
+
+    def test_skip_blank_lines_and_report_errors(self, sample_petcode_message):
+        """测试跳过空行并报告错误行"""
+        code = petcode.to_base64(sample_petcode_message)
+        data = f'{code}\n\n  \ninvalid!!!base64\r\n{code}'.encode()
+
+        results = list(petcode.iter_decode(io.BytesIO(data)))
+
+        assert [line_no for line_no, _ in results] == [1, 4, 5]
+        assert results[0][1] == sample_petcode_message
+        assert isinstance(results[1][1], Exception)
+        assert results[2][1] == sample_petcode_message
+
+    def test_line_too_long(self, sample_petcode_message):
+        """测试超长行被报告且不影响后续行"""
+        code = petcode.to_base64(sample_petcode_message)
+        data = f'{"A" * (len(code) + 100)}\n{code}\n'.encode()
+
+        results = list(petcode.iter_decode(io.BytesIO(data), max_line_length=32))
+
+        assert isinstance(results[0][1], LineTooLongError)
+        assert results[0][0] == 1
+        # 正常长度的分享码同样超出限制
+        assert isinstance(results[1][1], LineTooLongError)
+
+        results = list(petcode.iter_decode(io.BytesIO(data), max_line_length=len(code)))
+        assert isinstance(results[0][1], LineTooLongError)
+        assert results[1] == (2, sample_petcode_message)
+
+    def test_lazy_iteration(self, sample_petcode_message):
+        """测试按需读取"""
+        data = _write_codes([sample_petcode_message] * 1000).encode()
+        stream = io.BytesIO(data)
+
+        iterator = petcode.iter_decode(stream, buffer_size=1024)
+        assert next(iterator) == (1, sample_petcode_message)
+        assert stream.tell() < len(data)
+
+
+class TestIterBinaryRecords:
+    """测试 iter_binary_records"""
+
+    def _write(self, path, messages, codecs):
+        binaries = [
+            petcode.to_binary(message, codec=codec)
+            for message, codec in zip(messages, codecs)
+        ]
+        path.write_bytes(b''.join(binaries))
+        return binaries
+
+    def test_read_file(self, tmp_path, sample_petcode_message):
+        """测试通过 mmap 读取文件，并返回每条数据的偏移量"""
+        path = tmp_path / 'codes.bin'
+        messages = [sample_petcode_message, PetCodeMessage(), sample_petcode_message]
+        binaries = self._write(path, messages, ['gzip', 'deflate', 'deflate-dict'])
+
+        results = list(petcode.iter_binary_records(path))
+
+        assert [message for _, message in results] == messages
+        assert [offset for offset, _ in results] == [
+            0,
+            len(binaries[0]),
+            len(binaries[0]) + len(binaries[1]),
+        ]
+
+    def test_read_buffer(self, sample_petcode_message):
+        """测试读取内存中的数据"""
+        data = bytearray(petcode.to_binary(sample_petcode_message) * 3)
+        results = list(petcode.iter_binary_records(memoryview(data)))
+        assert len(results) == 3
+
+    def test_empty(self, tmp_path):
+        """测试空文件和空数据"""
+        path = tmp_path / 'empty.bin'
+        path.write_bytes(b'')
+        assert list(petcode.iter_binary_records(str(path))) == []
+        assert list(petcode.iter_binary_records(b'')) == []
+
+    def test_corrupted_file(self, tmp_path, sample_petcode_message):
+        """测试数据损坏时抛出原始异常，并正常关闭文件"""
+        path = tmp_path / 'codes.bin'
+        binary = petcode.to_binary(sample_petcode_message)
+        path.write_bytes(binary + binary[:-4])
+
+        records = petcode.iter_binary_records(path)
+        assert next(records)[1] == sample_petcode_message
+        with pytest.raises(ValueError, match='Truncated'):
+            next(records)
+
+        path.write_bytes(binary[:10] + b'\x00' * 20)
+        with pytest.raises(zlib.error):
+            list(petcode.iter_binary_records(path))
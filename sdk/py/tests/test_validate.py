@@ -0,0 +1,178 @@
+"""测试带限制的解码"""
+
+import base64
+import zlib
+
+import petcode
+from petcode.codec import GZIP_MAGIC
+from petcode.validate import (
+    DEFAULT_LIMITS,
+    Limits,
+    ValidationError,
+    check_base64,
+    decompress_limited,
+)
+import pytest
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage
+
+
+def _bomb(size: int) -> bytes:
+    """解压后为 ``size`` 字节 0 的 gzip 数据"""
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    return compressor.compress(bytes(size)) + compressor.flush()
+
+
+class TestBase64:
+    """测试 base64 检查"""
+
+    @pytest.mark.parametrize(
+        'code',
+        ['', '   ', 'abc', 'ab!d', 'ab=d', 'abc===', '中文中文'],
+    )
+    def test_invalid(self, code):
+        """测试拒绝空字符串、长度错误和非法字符"""
+        with pytest.raises(ValidationError):
+            check_base64(code)
+
+    def test_length_limit(self):
+        """测试超过长度限制时在解码前拒绝"""
+        with pytest.raises(ValidationError, match='base64 length'):
+            check_base64('A' * 20, Limits(max_base64_length=16))
+
+    def test_strip_whitespace(self, sample_petcode_message):
+        """测试忽略首尾空白，并接受 bytes"""
+        code = petcode.to_base64(sample_petcode_message)
+
+        assert check_base64(f'  {code}\n') == base64.b64decode(code)
+        assert check_base64(code.encode()) == base64.b64decode(code)
+
+
+class TestDecompress:
+    """测试受限解压"""
+
+    def test_bomb(self):
+        """测试解压输出超过限制时立即停止"""
+        bomb = _bomb(10 * 1024 * 1024)
+
+        assert len(bomb) < DEFAULT_LIMITS.max_compressed_size
+        with pytest.raises(ValidationError, match='exceeds'):
+            decompress_limited(bomb)
+
+    @pytest.mark.parametrize('codec', ['gzip', 'deflate', 'deflate-dict', 'none'])
+    def test_size_limit(self, codec):
+        """测试各编解码器的解压大小限制"""
+        binary = petcode.codec.compress(bytes(100), codec)
+
+        assert decompress_limited(binary, Limits(max_decompressed_size=100)) == bytes(
+            100
+        )
+        with pytest.raises(ValidationError, match='exceeds'):
+            decompress_limited(binary, Limits(max_decompressed_size=99))
+
+    def test_compressed_size(self):
+        """测试压缩数据超过限制时拒绝"""
+        with pytest.raises(ValidationError, match='Compressed size'):
+            decompress_limited(_bomb(1000), Limits(max_compressed_size=10))
+
+    def test_bad_header(self):
+        """测试未知的头部"""
+        with pytest.raises(ValidationError, match='version'):
+            decompress_limited(b'\x00\x01\x02')
+        with pytest.raises(ValidationError, match='codec id'):
+            decompress_limited(b'\x1c\x01\x02')
+
+    def test_truncated_and_trailing(self):
+        """测试数据不完整或末尾有多余数据"""
+        binary = _bomb(100)
+
+        with pytest.raises(ValidationError, match='Truncated'):
+            decompress_limited(binary[:-4])
+        with pytest.raises(ValidationError, match='Unexpected data'):
+            decompress_limited(binary + b'\x00')
+        with pytest.raises(ValidationError, match='Corrupted'):
+            decompress_limited(GZIP_MAGIC + b'\x00' * 20)
+
+    def test_multi_member_gzip(self):
+        """测试多个拼接在一起的 gzip 成员，输出大小按总和计算"""
+        binary = _bomb(100) + _bomb(200)
+
+        assert decompress_limited(binary) == bytes(300)
+        with pytest.raises(ValidationError, match='exceeds'):
+            decompress_limited(binary, Limits(max_decompressed_size=250))
+        with pytest.raises(ValidationError, match='Truncated'):
+            decompress_limited(binary[:-4])
+
+
+class TestFromBase64:
+    """测试 from_base64 的 limits 参数"""
+
+    def test_roundtrip(self, sample_petcode_message):
+        """测试合法数据的结果与不带限制时相同"""
+        code = petcode.to_base64(sample_petcode_message)
+
+        assert petcode.from_base64(code, limits=DEFAULT_LIMITS) == petcode.from_base64(
+            code
+        )
+        assert (
+            petcode.from_binary(base64.b64decode(code), limits=Limits())
+            == sample_petcode_message
+        )
+
+    def test_max_sized_message(self, sample_petcode_message):
+        """测试默认限制接受字段全部填满的消息"""
+        message = PetCodeMessage()
+        message.CopyFrom(sample_petcode_message)
+        pet = message.pets[0]
+        pet.skills[:] = range(1, 6)
+        for i in range(3):
+            pet.effects.add(id=i, status=1, args=[1, 2, 3])
+        del message.pets[:]
+        message.pets.extend([pet] * 6)
+
+        assert (
+            petcode.from_base64(petcode.to_base64(message), limits=Limits()) == message
+        )
+
+    @pytest.mark.parametrize(
+        ('field', 'limits'),
+        [
+            ('pets', Limits(max_pets=1)),
+            ('skills', Limits(max_skills=1)),
+            ('effects', Limits(max_effects=0)),
+            ('mintmarks', Limits(max_mintmarks=0)),
+        ],
+    )
+    def test_count_limits(self, sample_petcode_message, field, limits):
+        """测试数量限制"""
+        message = PetCodeMessage()
+        message.CopyFrom(sample_petcode_message)
+        message.pets.add().CopyFrom(message.pets[0])
+        message.pets[0].skills.append(1)
+        message.pets[0].effects.add(id=1)
+        code = petcode.to_base64(message)
+
+        with pytest.raises(ValidationError, match=field):
+            petcode.from_base64(code, limits=limits)
+
+    def test_invalid_message(self):
+        """测试解压后不是合法的消息"""
+        header = petcode.codec.get_codec('none').header
+        code = base64.b64encode(header + b'\xff\xff\xff').decode()
+
+        with pytest.raises(ValidationError, match='Invalid message'):
+            petcode.from_base64(code, limits=DEFAULT_LIMITS)
+
+    def test_many(self, sample_petcode_message):
+        """测试批量函数的错误条目"""
+        code = petcode.to_base64(sample_petcode_message)
+        bomb = base64.b64encode(_bomb(1024 * 1024)).decode()
+
+        results = petcode.from_base64_many([code, bomb, 'ab!d'], limits=Limits())
+        binaries = petcode.from_binary_many(
+            [base64.b64decode(code), _bomb(1024 * 1024)], limits=Limits()
+        )
+
+        assert results[0] == binaries[0] == sample_petcode_message
+        assert isinstance(results[1], ValidationError)
+        assert isinstance(results[2], ValidationError)
+        assert isinstance(binaries[1], ValidationError)
@@ -0,0 +1,190 @@
+"""测试只读视图"""
+
+from petcode.create_and_read import (
+    create_ability_mintmark,
+    create_quanxiao_mintmark,
+    create_skill_mintmark,
+    create_universal_mintmark,
+)
+from petcode.view import MintmarkView, PetCodeView, PetView, view
+import pytest
+from seerbp.petcode.v1.message_pb2 import (
+    MintmarkInfo,
+    PetAbilityValue,
+    PetCodeMessage,
+    PetInfo,
+)
+
+
+class TestPetView:
+    """测试 PetView"""
+
+    def test_fields(self, sample_pet_info):
+        """测试字段提取"""
+        pet = PetView.from_proto(sample_pet_info)
+
+        assert pet.id == 3842
+        assert pet.level == 100
+        assert pet.skills == (24708, 31567, 31568, 31569)
+        assert pet.evs.hp == 85
+        assert pet.ability_total.speed == 110
+        assert pet.effects[0].id == 67
+        assert pet.effects[0].args == (1, 5)
+        assert pet.mintmarks[0].type == 'universal'
+        assert pet.mintmarks[0].level == 5
+        assert pet.pet_items == (300001, 300002)
+        assert pet.skin_id == 100001
+
+    def test_roundtrip(self, sample_pet_info):
+        """测试还原为 protobuf 对象"""
+        pet = PetView.from_proto(sample_pet_info)
+
+        assert pet.to_proto() == sample_pet_info
+        assert pet.to_proto().SerializeToString() == sample_pet_info.SerializeToString()
+
+    def test_rest_only_unexpanded_fields(self, sample_pet_info):
+        """测试 rest 只保存未展开的字段"""
+        rest = PetInfo.FromString(PetView.from_proto(sample_pet_info).rest)
+
+        assert [field.name for field, _ in rest.ListFields()] == [
+            'resistance',
+            'ability_bonus',
+        ]
+
+    def test_replace(self, sample_pet_info):
+        """测试 _replace 修改后的视图还原为修改后的消息"""
+        pet = PetView.from_proto(sample_pet_info)._replace(level=50, skills=(1,))
+
+        result = pet.to_proto()
+
+        assert (result.level, list(result.skills)) == (50, [1])
+        assert result.resistance == sample_pet_info.resistance
+
+    @pytest.mark.parametrize(
+        'pet',
+        [
+            PetInfo(),
+            PetInfo(id=1, evs=PetAbilityValue(), ability_total=PetAbilityValue()),
+            PetInfo.FromString(PetInfo(id=1).SerializeToString() + b'\xf8\x01\x05'),
+        ],
+    )
+    def test_roundtrip_presence(self, pet):
+        """测试已设置但为空的子消息和未知字段"""
+        result = PetView.from_proto(pet).to_proto()
+
+        assert result == pet
+        assert result.SerializeToString() == pet.SerializeToString()
+
+    def test_optional_skin_id(self):
+        """测试未设置的皮肤 ID"""
+        assert PetView.from_proto(PetInfo(id=1)).skin_id is None
+        assert PetView.from_proto(PetInfo(id=1, skin_id=0)).skin_id == 0
+
+    def test_immutable_and_hashable(self, sample_pet_info):
+        """测试不可变且可哈希"""
+        pet = PetView.from_proto(sample_pet_info)
+
+        with pytest.raises(AttributeError):
+            pet.level = 1  # type: ignore[misc]
+        assert hash(pet) == hash(PetView.from_proto(sample_pet_info))
+        assert {pet: 1}[PetView.from_proto(sample_pet_info)] == 1
+
+
+class TestMintmarkView:
+    """测试 MintmarkView"""
+
+    @pytest.mark.parametrize(
+        'mintmark',
+        [
+            create_skill_mintmark(id=50001),
+            create_ability_mintmark(id=60001),
+            create_universal_mintmark(id=40001, level=5),
+            create_universal_mintmark(
+                id=40001, level=5, gem_id=1800011, bind_skill_id=24708
+            ),
+            create_universal_mintmark(
+                id=40001,
+                level=3,
+                ability=PetAbilityValue(hp=1, attack=2, speed=6),
+            ),
+            create_quanxiao_mintmark(id=70001, skill_mintmark_id=50001),
+        ],
+    )
+    def test_roundtrip(self, mintmark):
+        """测试各类刻印的往返转换"""
+        assert MintmarkView.from_proto(mintmark).to_proto() == mintmark
+
+    def test_gem_fields(self):
+        """测试宝石字段"""
+        mintmark = MintmarkView.from_proto(
+            create_universal_mintmark(
+                id=40001, level=5, gem_id=1800011, bind_skill_id=24708
+            )
+        )
+        assert (mintmark.gem_id, mintmark.bind_skill_id) == (1800011, 24708)
+        assert mintmark.ability is None
+
+    def test_empty_mintmark(self):
+        """测试未设置类型的刻印"""
+        mintmark = MintmarkView.from_proto(MintmarkInfo())
+
+        assert (mintmark.type, mintmark.id) == (None, 0)
+        assert mintmark.to_proto() == MintmarkInfo()
+
+        message = PetCodeMessage(pets=[PetInfo(id=3022, mintmarks=[MintmarkInfo()])])
+        assert view(message).pets[0].mintmarks[0].type is None
+        assert view(message).to_proto() == message
+
+    def test_unknown_type(self):
+        """测试未知的刻印类型"""
+        with pytest.raises(ValueError, match='Unknown mintmark type'):
+            MintmarkView('gem', 1).to_proto()
+
+
+class TestPetCodeView:
+    """测试 PetCodeView"""
+
+    def test_fields(self, sample_petcode_message):
+        """测试字段提取"""
+        message_view = view(sample_petcode_message)
+
+        assert message_view.server == PetCodeMessage.Server.SERVER_OFFICIAL
+        assert message_view.equips == (200001, 300001, 400001, 500001, 600001)
+        assert message_view.title_id == 100001
+        assert len(message_view.pets) == 1
+        assert message_view.pets[0].id == 3842
+
+    def test_roundtrip(self, sample_petcode_message):
+        """测试还原为 protobuf 对象"""
+        assert view(sample_petcode_message).to_proto() == sample_petcode_message
+
+    @pytest.mark.parametrize(
+        'message',
+        [
+            PetCodeMessage(),
+            PetCodeMessage(seer_set=PetCodeMessage.SeerSet()),
+            PetCodeMessage(seer_set=PetCodeMessage.SeerSet(title_id=0)),
+        ],
+    )
+    def test_roundtrip_seer_set(self, message):
+        """测试未设置、已设置但为空的 seer_set"""
+        message_view = view(message)
+
+        assert (message_view.seer_set is None) == (not message.HasField('seer_set'))
+        assert message_view.to_proto() == message
+        assert (
+            message_view.to_proto().SerializeToString() == message.SerializeToString()
+        )
+
+    def test_empty_message(self):
+        """测试空消息"""
+        message_view = PetCodeView.from_proto(PetCodeMessage())
+        assert message_view.seer_set is None
+        assert (message_view.equips, message_view.title_id) == ((), None)
+        assert message_view.pets == ()
+        assert message_view.to_proto() == PetCodeMessage()
+
+    def test_hashable(self, sample_petcode_message):
+        """测试可作为集合元素去重"""
+        views = {view(sample_petcode_message), view(sample_petcode_message)}
+        assert len(views) == 1
@@ -0,0 +1,348 @@
+"""PetCode 服务器压测
+
+用法（在 server/py 目录下运行）::
+
+    python -m benchmarks.loadtest                      # 启动本地服务器并压测 10 秒
+    python -m benchmarks.loadtest -c 64 -d 30 --server-workers 4
+    python -m benchmarks.loadtest --mix decode=3,encode=1,batch_decode=1
+    python -m benchmarks.loadtest --url http://127.0.0.1:8080 -o result.json
+
+不指定 ``--url`` 时会使用 uvicorn 在随机端口启动 ``petcode_server:app``，
+压测结束后关闭。
+每个并发连接独立发送请求（HTTP/1.1 keep-alive），按 ``--mix`` 中的权重随机选择场景；
+预热阶段的请求不计入结果。结果以 JSON 输出，包含总体及各场景的 RPS、
+p50/p95/p99 延迟和错误率。
+
+压测客户端本身运行在单个进程中，结果的上限受客户端 CPU 限制，
+压测多进程服务器时应确认客户端没有先达到瓶颈。
+"""
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import json
+import math
+import platform
+import random
+import socket
+import statistics
+import sys
+import time
+from typing import Literal
+from urllib.parse import urlsplit
+
+from .payloads import CONTENT_TYPES, SCENARIO_PATHS, build_bodies, build_messages
+
+DEFAULT_MIX = {'decode': 3, 'encode': 1}
+
+
+class HttpError(Exception):
+    pass
+
+
+class _Connection:
+    """最小的 HTTP/1.1 keep-alive 客户端，只支持带 Content-Length 的响应"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def request(self, path: str, body: bytes, content_type: str) -> int:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        assert self._reader is not None
+        head = (
+            f'POST {path} HTTP/1.1\r\n'
+            f'Host: {self.host}:{self.port}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            '\r\n'
+        )
+        self._writer.write(head.encode('latin-1') + body)
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise HttpError('connection closed by server')
+        status = int(status_line.split(b' ', 2)[1])
+        length = None
+        keep_alive = True
+        while (line := await self._reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.partition(b':')
+            name = name.strip().lower()
+            if name == b'content-length':
+                length = int(value)
+            elif name == b'connection' and value.strip().lower() == b'close':
+                keep_alive = False
+        if length is None:
+            raise HttpError('response without Content-Length')
+        await self._reader.readexactly(length)
+        if not keep_alive:
+            await self.close()
+        return status
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """最近秩法计算百分位数，``sorted_values`` 需已排序"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class _Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.status_codes: dict[str, int] = {}
+
+    def record(self, scenario: str, latency_ms: float, status: int | str):
+        self.latencies.setdefault(scenario, []).append(latency_ms)
+        key = str(status)
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+        if status != 200:
+            self.errors[scenario] = self.errors.get(scenario, 0) + 1
+
+
+def _summary(latencies: list[float], errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        'requests': count,
+        'errors': errors,
+        'error_rate': errors / count if count else 0.0,
+        'rps': count / elapsed if elapsed else 0.0,
+        'latency_ms': {
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'p99': percentile(values, 99),
+            'mean': statistics.fmean(values) if values else 0.0,
+            'max': values[-1] if values else 0.0,
+        },
+    }
+
+
+async def run_load(
+    url: str,
+    *,
+    mix: dict[str, float] | None = None,
+    concurrency: int = 32,
+    duration: float = 10.0,
+    warmup: float = 1.0,
+    content_type: Literal['json', 'proto'] = 'json',
+    batch_size: int = 50,
+    seed: int = 0,
+) -> dict:
+    """对 ``url`` 指向的服务器进行压测，返回结果字典"""
+    mix = mix or DEFAULT_MIX
+    parts = urlsplit(url)
+    host, port = parts.hostname or '127.0.0.1', parts.port or 80
+    messages = build_messages(seed=seed)
+    scenarios = list(mix)
+    weights = [mix[name] for name in scenarios]
+    bodies = {
+        name: build_bodies(
+            name, messages, content_type=content_type, batch_size=batch_size
+        )
+        for name in scenarios
+    }
+    mime = CONTENT_TYPES[content_type]
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    measure_start = start + warmup
+    deadline = measure_start + duration
+    recorder = _Recorder()
+
+    async def worker(index: int):
+        rng = random.Random(seed * 1000 + index)
+        connection = _Connection(host, port)
+        try:
+            while (now := loop.time()) < deadline:
+                scenario = rng.choices(scenarios, weights)[0]
+                body = rng.choice(bodies[scenario])
+                began = time.perf_counter()
+                try:
+                    status: int | str = await connection.request(
+                        SCENARIO_PATHS[scenario], body, mime
+                    )
+                except (OSError, HttpError, asyncio.IncompleteReadError) as e:
+                    status = type(e).__name__
+                    await connection.close()
+                latency_ms = (time.perf_counter() - began) * 1000
+                if now >= measure_start:
+                    recorder.record(scenario, latency_ms, status)
+        finally:
+            await connection.close()
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = loop.time() - measure_start
+
+    all_latencies = [v for values in recorder.latencies.values() for v in values]
+    report = {
+        'config': {
+            'url': url,
+            'mix': mix,
+            'concurrency': concurrency,
+            'duration': duration,
+            'warmup': warmup,
+            'content_type': content_type,
+            'batch_size': batch_size,
+            'seed': seed,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'elapsed': elapsed,
+        **_summary(all_latencies, sum(recorder.errors.values()), elapsed),
+        'status_codes': recorder.status_codes,
+        'scenarios': {
+            name: _summary(
+                recorder.latencies.get(name, []),
+                recorder.errors.get(name, 0),
+                elapsed,
+            )
+            for name in scenarios
+        },
+    }
+    return report
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(
+    host: str, port: int, process: asyncio.subprocess.Process, timeout: float
+):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.returncode is not None:
+            raise RuntimeError(f'server exited with code {process.returncode}')
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        await writer.wait_closed()
+        return
+    raise RuntimeError('server did not start in time')
+
+
+@asynccontextmanager
+async def local_server(workers: int = 1, timeout: float = 30.0) -> AsyncIterator[str]:
+    """在随机端口启动 uvicorn 服务器，返回其 URL"""
+    host, port = '127.0.0.1', _free_port()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        '-m',
+        'uvicorn',
+        'petcode_server:app',
+        '--host',
+        host,
+        '--port',
+        str(port),
+        '--workers',
+        str(workers),
+        '--log-level',
+        'warning',
+        '--no-access-log',
+    )
+    try:
+        await _wait_ready(host, port, process, timeout)
+        yield f'http://{host}:{port}'
+    finally:
+        if process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """解析 ``decode=3,encode=1`` 形式的场景权重"""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIO_PATHS:
+            raise argparse.ArgumentTypeError(
+                f'unknown scenario {name!r}, choose from {", ".join(SCENARIO_PATHS)}'
+            )
+        mix[name] = float(weight) if weight else 1.0
+    return mix
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    options = {
+        'mix': args.mix,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'content_type': args.content_type,
+        'batch_size': args.batch_size,
+        'seed': args.seed,
+    }
+    if args.url:
+        return await run_load(args.url, **options)
+    async with local_server(args.server_workers) as url:
+        report = await run_load(url, **options)
+    report['config']['server_workers'] = args.server_workers
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='PetCode 服务器压测')
+    parser.add_argument('--url', help='目标服务器地址，省略时在本地启动服务器')
+    parser.add_argument(
+        '--server-workers', type=int, default=1, help='本地服务器的工作进程数'
+    )
+    parser.add_argument('-c', '--concurrency', type=int, default=32)
+    parser.add_argument(
+        '-d', '--duration', type=float, default=10.0, help='压测时长（秒）'
+    )
+    parser.add_argument('--warmup', type=float, default=1.0, help='预热时长（秒）')
+    parser.add_argument(
+        '--mix',
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help='场景及权重，例如 decode=3,encode=1,batch_decode=1',
+    )
+    parser.add_argument('--content-type', choices=tuple(CONTENT_TYPES), default='json')
+    parser.add_argument(
+        '--batch-size', type=int, default=50, help='批量场景每个请求的条目数'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='将结果保存为 JSON 文件')
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_main(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    sys.stdout.write(text + '\n')
+    return 1 if report['requests'] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
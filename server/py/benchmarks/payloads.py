@@ -0,0 +1,136 @@
+"""压测使用的请求数据
+
+消息由 SDK 的 ``create_*`` 辅助函数构造，包含单只精灵的小消息和六只精灵、
+各字段较满的大消息，按固定随机种子生成，保证每次运行的数据一致。
+"""
+
+import json
+import random
+from typing import Literal
+
+from google.protobuf import json_format
+from google.protobuf.message import Message
+import petcode
+from petcode.create_and_read import (
+    create_petcode_message,
+    create_quanxiao_mintmark,
+    create_skill_mintmark,
+    create_state_resist,
+    create_universal_mintmark,
+)
+from seerbp.petcode.server.v1.service_pb2 import (
+    BatchDecodePetCodeMessageFromBase64Request,
+    BatchEncodePetCodeMessageToBase64Request,
+    DecodePetCodeMessageFromBase64Request,
+    EncodePetCodeMessageToBase64Request,
+)
+from seerbp.petcode.v1.message_pb2 import (
+    PetAbilityValue,
+    PetCodeMessage,
+    PetInfo,
+    ResistanceInfo,
+)
+
+
+def _pet(rng: random.Random, full: bool) -> PetInfo:
+    pet = PetInfo(
+        id=rng.randint(1000, 5000),
+        level=100,
+        dv=31,
+        nature=rng.randint(1, 25),
+        evs=PetAbilityValue(hp=255, attack=255, speed=100),
+        skills=rng.sample(range(20000, 40000), 4),
+        effects=[PetInfo.Effect(id=67, status=1, args=[1, 5])],
+        mintmarks=[create_universal_mintmark(id=40001, level=5)],
+    )
+    if full:
+        pet.mintmarks.extend(
+            [
+                create_universal_mintmark(
+                    id=40002, level=5, gem_id=1800011, bind_skill_id=pet.skills[0]
+                ),
+                create_quanxiao_mintmark(id=70001, skill_mintmark_id=50001),
+                create_skill_mintmark(id=50002),
+            ]
+        )
+        pet.resistance.CopyFrom(
+            ResistanceInfo(
+                hurt=ResistanceInfo.Hurt(crit=35, regular=35, precent=35),
+                ctl=create_state_resist((1, 55), (2, 18), (3, 10)),
+            )
+        )
+        pet.pet_items.extend([300001, 300002])
+        pet.skin_id = rng.randint(100000, 200000)
+    return pet
+
+
+def build_messages(count: int = 16, seed: int = 0) -> list[PetCodeMessage]:
+    """生成 ``count`` 条消息，单精灵和六精灵的消息各占一半"""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        full = i % 2 == 1
+        pets = [_pet(rng, full) for _ in range(6 if full else 1)]
+        messages.append(
+            create_petcode_message(
+                server=PetCodeMessage.Server.SERVER_OFFICIAL,
+                display_mode=PetCodeMessage.DisplayMode.DISPLAY_MODE_PVP,
+                seer_set=PetCodeMessage.SeerSet(equips=[200001, 300001]),
+                pets=pets,
+            )
+        )
+    return messages
+
+
+def _requests(
+    scenario: str, messages: list[PetCodeMessage], batch_size: int
+) -> list[Message]:
+    codes = petcode.to_base64_many(messages)
+    if scenario == 'encode':
+        return [
+            EncodePetCodeMessageToBase64Request(pet_code_message=message)
+            for message in messages
+        ]
+    if scenario == 'decode':
+        return [DecodePetCodeMessageFromBase64Request(base64=code) for code in codes]
+    if scenario == 'batch_encode':
+        return [
+            BatchEncodePetCodeMessageToBase64Request(
+                pet_code_messages=(messages * batch_size)[:batch_size]
+            )
+        ]
+    if scenario == 'batch_decode':
+        return [
+            BatchDecodePetCodeMessageFromBase64Request(
+                base64=(codes * batch_size)[:batch_size]
+            )
+        ]
+    raise ValueError(f'Unknown scenario: {scenario}')
+
+
+def build_bodies(
+    scenario: str,
+    messages: list[PetCodeMessage],
+    *,
+    content_type: Literal['json', 'proto'] = 'json',
+    batch_size: int = 50,
+) -> list[bytes]:
+    """为指定场景生成请求体列表"""
+    requests = _requests(scenario, messages, batch_size)
+    if content_type == 'proto':
+        return [request.SerializeToString() for request in requests]
+    return [
+        json.dumps(json_format.MessageToDict(request)).encode() for request in requests
+    ]
+
+
+SCENARIO_PATHS = {
+    'encode': '/v1/to_base64',
+    'decode': '/v1/from_base64',
+    'batch_encode': '/v1/batch/to_base64',
+    'batch_decode': '/v1/batch/from_base64',
+}
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'proto': 'application/proto',
+}
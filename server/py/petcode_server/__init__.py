@@ -0,0 +1,10 @@
+from .app import PetCodeApp, app, create_app
+from .service import ConnectError, PetCodeService
+
+__all__ = [
+    'ConnectError',
+    'PetCodeApp',
+    'PetCodeService',
+    'app',
+    'create_app',
+]
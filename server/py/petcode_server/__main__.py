@@ -0,0 +1,22 @@
+"""使用 uvicorn 启动服务器：``python -m petcode_server``
+
+配置通过环境变量传入：``HOST``（默认 ``0.0.0.0``）、``PORT``（默认 ``8080``）、
+``WORKERS``（工作进程数，默认 ``1``）。
+"""
+
+import os
+
+import uvicorn
+
+
+def main():
+    uvicorn.run(
+        'petcode_server.app:app',
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=int(os.environ.get('PORT', '8080')),
+        workers=int(os.environ.get('WORKERS', '1')),
+    )
+
+
+if __name__ == '__main__':
+    main()
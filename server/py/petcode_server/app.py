@@ -0,0 +1,301 @@
+"""PetCode API v1 的 ASGI 应用
+
+支持 Connect 协议的 unary 调用
+（``POST /seerbp.petcode.server.v1.PetCodeService/<Method>``），
+请求体可以是 JSON（``application/json``）或二进制 protobuf（``application/proto``），
+响应使用与请求相同的格式；同时提供 proto 中 ``google.api.http`` 声明的路径
+（例如 ``POST /v1/to_base64``），两者行为相同。
+
+错误按 Connect 协议返回 JSON：``{"code": "invalid_argument", "message": "..."}``。
+批量 RPC 在线程池中执行，处理大批量请求时不会阻塞事件循环。
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor
+import json
+import logging
+from typing import Any, NamedTuple
+
+from google.protobuf import json_format
+from google.protobuf.message import Message
+from seerbp.petcode.server.v1.service_pb2 import (
+    DESCRIPTOR,
+    BatchDecodePetCodeMessageFromBase64Request,
+    BatchEncodePetCodeMessageToBase64Request,
+    DecodePetCodeMessageFromBase64Request,
+    EncodePetCodeMessageToBase64Request,
+)
+
+from .service import ConnectError, PetCodeService
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict]]
+Send = Callable[[dict], Awaitable[None]]
+
+DEFAULT_MAX_BODY_SIZE = 4 * 1024 * 1024
+
+_logger = logging.getLogger(__name__)
+
+SERVICE_NAME = DESCRIPTOR.services_by_name['PetCodeService'].full_name
+
+# Connect 错误码对应的 HTTP 状态码
+_ERROR_STATUS = {
+    'invalid_argument': 400,
+    'not_found': 404,
+    'resource_exhausted': 429,
+    'unimplemented': 501,
+    'internal': 500,
+    'unknown': 500,
+}
+
+
+class _Route(NamedTuple):
+    request_type: type[Message]
+    handler: str
+    # 是否在线程池中执行
+    blocking: bool = False
+
+
+def _routes() -> dict[str, _Route]:
+    methods = {
+        'EncodePetCodeMessageToBase64': (
+            '/v1/to_base64',
+            _Route(
+                EncodePetCodeMessageToBase64Request,
+                'encode_pet_code_message_to_base64',
+            ),
+        ),
+        'DecodePetCodeMessageFromBase64': (
+            '/v1/from_base64',
+            _Route(
+                DecodePetCodeMessageFromBase64Request,
+                'decode_pet_code_message_from_base64',
+            ),
+        ),
+        'BatchEncodePetCodeMessageToBase64': (
+            '/v1/batch/to_base64',
+            _Route(
+                BatchEncodePetCodeMessageToBase64Request,
+                'batch_encode_pet_code_message_to_base64',
+                blocking=True,
+            ),
+        ),
+        'BatchDecodePetCodeMessageFromBase64': (
+            '/v1/batch/from_base64',
+            _Route(
+                BatchDecodePetCodeMessageFromBase64Request,
+                'batch_decode_pet_code_message_from_base64',
+                blocking=True,
+            ),
+        ),
+    }
+    routes = {}
+    for method, (http_path, route) in methods.items():
+        routes[f'/{SERVICE_NAME}/{method}'] = route
+        routes[http_path] = route
+    return routes
+
+
+class _Codec(NamedTuple):
+    content_type: bytes
+    parse: Callable[[bytes, Message], None]
+    serialize: Callable[[Message], bytes]
+
+
+def _parse_json(body: bytes, message: Message):
+    json_format.Parse(body or b'{}', message)
+
+
+def _serialize_json(message: Message) -> bytes:
+    data = json_format.MessageToDict(message)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def _parse_proto(body: bytes, message: Message):
+    message.ParseFromString(body)
+
+
+def _serialize_proto(message: Message) -> bytes:
+    return message.SerializeToString()
+
+
+_JSON_CODEC = _Codec(b'application/json', _parse_json, _serialize_json)
+_PROTO_CODEC = _Codec(b'application/proto', _parse_proto, _serialize_proto)
+_CODECS = {
+    'application/json': _JSON_CODEC,
+    'application/proto': _PROTO_CODEC,
+    'application/x-protobuf': _PROTO_CODEC,
+}
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+async def _read_body(receive: Receive, max_size: int) -> bytes:
+    chunks = []
+    size = 0
+    while True:
+        event = await receive()
+        if event['type'] == 'http.disconnect':
+            break
+        chunk = event.get('body', b'')
+        size += len(chunk)
+        if size > max_size:
+            raise _BodyTooLarge
+        chunks.append(chunk)
+        if not event.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+
+async def _respond(
+    send: Send,
+    status: int,
+    body: bytes,
+    content_type: bytes,
+    extra_headers: list[tuple[bytes, bytes]] | None = None,
+):
+    headers = [
+        (b'content-type', content_type),
+        (b'content-length', str(len(body)).encode()),
+    ]
+    if extra_headers:
+        headers.extend(extra_headers)
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _respond_error(send: Send, code: str, message: str):
+    body = json.dumps({'code': code, 'message': message}).encode()
+    await _respond(send, _ERROR_STATUS.get(code, 500), body, b'application/json')
+
+
+def _content_type(scope: Scope) -> str:
+    for name, value in scope['headers']:
+        if name == b'content-type':
+            return value.decode('latin-1').split(';', 1)[0].strip().lower()
+    return ''
+
+
+class PetCodeApp:
+    """PetCodeService 的 ASGI 应用
+
+    Args:
+        service: RPC 实现，默认为 `PetCodeService()`
+        max_body_size: 请求体的最大字节数
+        executor: 执行批量 RPC 的线程池，默认使用事件循环的默认线程池
+    """
+
+    def __init__(
+        self,
+        service: PetCodeService | None = None,
+        *,
+        max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+        executor: Executor | None = None,
+    ):
+        self.service = service if service is not None else PetCodeService()
+        self.max_body_size = max_body_size
+        self.executor = executor
+        self._routes = _routes()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive: Receive, send: Send):
+        while True:
+            event = await receive()
+            if event['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif event['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send):
+        path = scope['path']
+        if path == '/' and scope['method'] in ('GET', 'HEAD'):
+            await _respond(send, 200, b'Hello World!', b'text/plain; charset=utf-8')
+            return
+
+        route = self._routes.get(path)
+        if route is None:
+            await _respond(send, 404, b'Not Found', b'text/plain; charset=utf-8')
+            return
+        if scope['method'] != 'POST':
+            await _respond(
+                send,
+                405,
+                b'Method Not Allowed',
+                b'text/plain; charset=utf-8',
+                [(b'allow', b'POST')],
+            )
+            return
+
+        codec = _CODECS.get(_content_type(scope))
+        if codec is None:
+            await _respond(
+                send,
+                415,
+                b'Unsupported Media Type',
+                b'text/plain; charset=utf-8',
+                [(b'accept-post', b'application/json, application/proto')],
+            )
+            return
+
+        try:
+            body = await _read_body(receive, self.max_body_size)
+        except _BodyTooLarge:
+            await _respond_error(
+                send,
+                'resource_exhausted',
+                f'request body exceeds {self.max_body_size} bytes',
+            )
+            return
+
+        request = route.request_type()
+        try:
+            codec.parse(body, request)
+        except Exception:
+            await _respond_error(send, 'invalid_argument', 'invalid request body')
+            return
+
+        handler = getattr(self.service, route.handler)
+        try:
+            if route.blocking:
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(self.executor, handler, request)
+            else:
+                response = handler(request)
+        except ConnectError as e:
+            await _respond_error(send, e.code, e.message)
+            return
+        except Exception:
+            # 错误已经作为响应返回，不再抛出给 ASGI 服务器
+            _logger.exception('Unhandled error in %s', path)
+            await _respond_error(send, 'internal', 'internal error')
+            return
+        await _respond(send, 200, codec.serialize(response), codec.content_type)
+
+
+def create_app(
+    service: PetCodeService | None = None,
+    *,
+    max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+    executor: Executor | None = None,
+) -> PetCodeApp:
+    """创建 ASGI 应用"""
+    return PetCodeApp(service, max_body_size=max_body_size, executor=executor)
+
+
+app = create_app()
+
+__all__ = [
+    'DEFAULT_MAX_BODY_SIZE',
+    'PetCodeApp',
+    'app',
+    'create_app',
+]
@@ -0,0 +1,90 @@
+"""`seerbp.petcode.server.v1.PetCodeService` 的实现"""
+
+import petcode
+from seerbp.petcode.server.v1.service_pb2 import (
+    BatchDecodePetCodeMessageFromBase64Request,
+    BatchDecodePetCodeMessageFromBase64Response,
+    BatchEncodePetCodeMessageToBase64Request,
+    BatchEncodePetCodeMessageToBase64Response,
+    DecodePetCodeMessageFromBase64Request,
+    DecodePetCodeMessageFromBase64Response,
+    EncodePetCodeMessageToBase64Request,
+    EncodePetCodeMessageToBase64Response,
+)
+
+DEFAULT_MAX_BATCH_SIZE = 1000
+
+
+class ConnectError(Exception):
+    """RPC 错误，``code`` 为 Connect 协议的错误码（例如 ``invalid_argument``）"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class PetCodeService:
+    """PetCodeService 的各个 RPC，方法接收请求消息并返回响应消息
+
+    Args:
+        max_batch_size: 批量 RPC 单次请求的最大条目数
+    """
+
+    def __init__(self, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        self.max_batch_size = max_batch_size
+
+    def _check_batch_size(self, size: int):
+        if size > self.max_batch_size:
+            raise ConnectError(
+                'invalid_argument',
+                f'batch size {size} exceeds the limit of {self.max_batch_size}',
+            )
+
+    def encode_pet_code_message_to_base64(
+        self, request: EncodePetCodeMessageToBase64Request
+    ) -> EncodePetCodeMessageToBase64Response:
+        if not request.HasField('pet_code_message'):
+            raise ConnectError('invalid_argument', 'pet_code_message is required')
+        return EncodePetCodeMessageToBase64Response(
+            base64=petcode.to_base64(request.pet_code_message)
+        )
+
+    def decode_pet_code_message_from_base64(
+        self, request: DecodePetCodeMessageFromBase64Request
+    ) -> DecodePetCodeMessageFromBase64Response:
+        if not request.base64:
+            raise ConnectError('invalid_argument', 'base64 is required')
+        try:
+            message = petcode.from_base64(request.base64)
+        except Exception as e:
+            raise ConnectError('invalid_argument', 'invalid base64') from e
+        return DecodePetCodeMessageFromBase64Response(pet_code_message=message)
+
+    def batch_encode_pet_code_message_to_base64(
+        self, request: BatchEncodePetCodeMessageToBase64Request
+    ) -> BatchEncodePetCodeMessageToBase64Response:
+        self._check_batch_size(len(request.pet_code_messages))
+        return BatchEncodePetCodeMessageToBase64Response(
+            base64=petcode.to_base64_many(request.pet_code_messages)
+        )
+
+    def batch_decode_pet_code_message_from_base64(
+        self, request: BatchDecodePetCodeMessageFromBase64Request
+    ) -> BatchDecodePetCodeMessageFromBase64Response:
+        self._check_batch_size(len(request.base64))
+        response = BatchDecodePetCodeMessageFromBase64Response()
+        for result in petcode.from_base64_many(request.base64):
+            item = response.results.add()
+            if isinstance(result, Exception):
+                item.error = 'invalid base64'
+            else:
+                item.pet_code_message.CopyFrom(result)
+        return response
+
+
+__all__ = [
+    'DEFAULT_MAX_BATCH_SIZE',
+    'ConnectError',
+    'PetCodeService',
+]
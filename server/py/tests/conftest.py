@@ -0,0 +1,58 @@
+"""pytest 配置和共享 fixtures"""
+
+import asyncio
+from typing import NamedTuple
+
+from petcode import create_petcode_message
+from petcode_server import PetCodeService, create_app
+import pytest
+from seerbp.petcode.v1.message_pb2 import PetCodeMessage, PetInfo
+
+
+class Response(NamedTuple):
+    status: int
+    headers: dict[bytes, bytes]
+    body: bytes
+
+
+def call_app(app, method: str, path: str, body: bytes = b'', content_type=None):
+    """直接调用 ASGI 应用，返回响应"""
+    headers = []
+    if content_type is not None:
+        headers.append((b'content-type', content_type.encode()))
+    scope = {'type': 'http', 'method': method, 'path': path, 'headers': headers}
+    events = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return events.pop(0) if events else {'type': 'http.disconnect'}
+
+    async def send(event):
+        sent.append(event)
+
+    asyncio.run(app(scope, receive, send))
+    start, body_event = sent
+    return Response(start['status'], dict(start['headers']), body_event['body'])
+
+
+@pytest.fixture
+def service():
+    """创建限制批量大小的服务"""
+    return PetCodeService(max_batch_size=10)
+
+
+@pytest.fixture
+def app(service):
+    """创建 ASGI 应用"""
+    return create_app(service, max_body_size=64 * 1024)
+
+
+@pytest.fixture
+def sample_petcode_message():
+    """创建示例 PetCode 消息"""
+    return create_petcode_message(
+        server=PetCodeMessage.Server.SERVER_OFFICIAL,
+        display_mode=PetCodeMessage.DisplayMode.DISPLAY_MODE_PVP,
+        pets=[PetInfo(id=3842, level=100, skills=[24708, 31567])],
+        seer_set=PetCodeMessage.SeerSet(equips=[200001], title_id=100001),
+    )
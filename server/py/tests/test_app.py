@@ -0,0 +1,201 @@
+"""ASGI 应用测试"""
+
+import json
+import logging
+import threading
+
+import petcode
+from petcode_server import PetCodeService, create_app
+import pytest
+from seerbp.petcode.server.v1.service_pb2 import (
+    BatchDecodePetCodeMessageFromBase64Request,
+    BatchDecodePetCodeMessageFromBase64Response,
+    DecodePetCodeMessageFromBase64Request,
+    DecodePetCodeMessageFromBase64Response,
+    EncodePetCodeMessageToBase64Request,
+    EncodePetCodeMessageToBase64Response,
+)
+
+from .conftest import call_app
+
+SERVICE_PATH = '/seerbp.petcode.server.v1.PetCodeService'
+
+
+class TestConnectProtocol:
+    """测试 Connect 协议的 unary 调用"""
+
+    @pytest.mark.parametrize(
+        'path', [f'{SERVICE_PATH}/EncodePetCodeMessageToBase64', '/v1/to_base64']
+    )
+    def test_encode_json(self, app, sample_petcode_message, path):
+        """测试 JSON 请求，Connect 路径和 HTTP 路径行为相同"""
+        body = json.dumps(
+            {'petCodeMessage': petcode.to_dict(sample_petcode_message)}
+        ).encode()
+        response = call_app(app, 'POST', path, body, 'application/json')
+
+        assert response.status == 200
+        assert response.headers[b'content-type'] == b'application/json'
+        assert json.loads(response.body) == {
+            'base64': petcode.to_base64(sample_petcode_message)
+        }
+
+    def test_decode_json(self, app, sample_petcode_message):
+        """测试 JSON 解码请求"""
+        body = json.dumps({'base64': petcode.to_base64(sample_petcode_message)})
+        response = call_app(
+            app,
+            'POST',
+            '/v1/from_base64',
+            body.encode(),
+            'application/json; charset=utf-8',
+        )
+
+        assert response.status == 200
+        data = json.loads(response.body)
+        assert petcode.from_dict(data['petCodeMessage']) == sample_petcode_message
+
+    def test_proto_body(self, app, sample_petcode_message):
+        """测试二进制 protobuf 请求，响应也是二进制"""
+        request = EncodePetCodeMessageToBase64Request(
+            pet_code_message=sample_petcode_message
+        )
+        response = call_app(
+            app,
+            'POST',
+            f'{SERVICE_PATH}/EncodePetCodeMessageToBase64',
+            request.SerializeToString(),
+            'application/proto',
+        )
+
+        assert response.status == 200
+        assert response.headers[b'content-type'] == b'application/proto'
+        code = EncodePetCodeMessageToBase64Response.FromString(response.body).base64
+
+        request = DecodePetCodeMessageFromBase64Request(base64=code)
+        response = call_app(
+            app,
+            'POST',
+            f'{SERVICE_PATH}/DecodePetCodeMessageFromBase64',
+            request.SerializeToString(),
+            'application/proto',
+        )
+        message = DecodePetCodeMessageFromBase64Response.FromString(response.body)
+        assert message.pet_code_message == sample_petcode_message
+
+    def test_batch_decode_json(self, app, sample_petcode_message):
+        """测试批量解码的 JSON 响应"""
+        code = petcode.to_base64(sample_petcode_message)
+        body = json.dumps({'base64': [code, 'AAAA']}).encode()
+        response = call_app(
+            app, 'POST', '/v1/batch/from_base64', body, 'application/json'
+        )
+
+        assert response.status == 200
+        results = json.loads(response.body)['results']
+        assert results[1] == {'error': 'invalid base64'}
+
+    def test_batch_decode_proto(self, app, sample_petcode_message):
+        """测试批量解码的二进制响应"""
+        code = petcode.to_base64(sample_petcode_message)
+        request = BatchDecodePetCodeMessageFromBase64Request(base64=[code] * 3)
+        response = call_app(
+            app,
+            'POST',
+            f'{SERVICE_PATH}/BatchDecodePetCodeMessageFromBase64',
+            request.SerializeToString(),
+            'application/proto',
+        )
+
+        assert response.status == 200
+        results = BatchDecodePetCodeMessageFromBase64Response.FromString(
+            response.body
+        ).results
+        assert len(results) == 3
+        assert all(r.pet_code_message == sample_petcode_message for r in results)
+
+    def test_batch_in_executor(self, sample_petcode_message):
+        """测试批量 RPC 不在事件循环所在的线程中执行"""
+        threads = []
+
+        class Service(PetCodeService):
+            def batch_decode_pet_code_message_from_base64(self, request):
+                threads.append(threading.get_ident())
+                return super().batch_decode_pet_code_message_from_base64(request)
+
+        app = create_app(Service())
+        code = petcode.to_base64(sample_petcode_message)
+        body = json.dumps({'base64': [code]}).encode()
+        response = call_app(
+            app, 'POST', '/v1/batch/from_base64', body, 'application/json'
+        )
+
+        assert response.status == 200
+        assert len(threads) == 1
+        assert threads[0] != threading.get_ident()
+
+
+class TestErrors:
+    """测试错误响应"""
+
+    def test_invalid_argument(self, app):
+        """测试业务错误按 Connect 格式返回"""
+        response = call_app(
+            app, 'POST', '/v1/from_base64', b'{"base64": "AAAA"}', 'application/json'
+        )
+
+        assert response.status == 400
+        assert json.loads(response.body) == {
+            'code': 'invalid_argument',
+            'message': 'invalid base64',
+        }
+
+    def test_invalid_body(self, app):
+        """测试无法解析的请求体"""
+        response = call_app(
+            app, 'POST', '/v1/from_base64', b'{"unknown": 1}', 'application/json'
+        )
+        assert response.status == 400
+        assert json.loads(response.body)['code'] == 'invalid_argument'
+
+    def test_body_too_large(self, app):
+        """测试超过大小限制的请求体"""
+        body = json.dumps({'base64': 'A' * 70000}).encode()
+        response = call_app(app, 'POST', '/v1/from_base64', body, 'application/json')
+        assert response.status == 429
+        assert json.loads(response.body)['code'] == 'resource_exhausted'
+
+    def test_unsupported_media_type(self, app):
+        """测试不支持的 Content-Type"""
+        response = call_app(app, 'POST', '/v1/from_base64', b'', 'text/plain')
+        assert response.status == 415
+
+    def test_not_found_and_method(self, app):
+        """测试未知路径和非 POST 请求"""
+        assert call_app(app, 'POST', '/v1/unknown').status == 404
+        response = call_app(app, 'GET', '/v1/from_base64')
+        assert response.status == 405
+        assert response.headers[b'allow'] == b'POST'
+
+    def test_root(self, app):
+        """测试根路径"""
+        response = call_app(app, 'GET', '/')
+        assert response.status == 200
+        assert response.body == b'Hello World!'
+
+    def test_internal_error(self, caplog):
+        """测试未预期的异常只返回一次 internal 错误并记录日志"""
+
+        class Service(PetCodeService):
+            def decode_pet_code_message_from_base64(self, request):
+                raise RuntimeError('boom')
+
+        app = create_app(Service())
+        with caplog.at_level(logging.ERROR, logger='petcode_server.app'):
+            response = call_app(
+                app, 'POST', '/v1/from_base64', b'{}', 'application/json'
+            )
+
+        assert response.status == 500
+        assert json.loads(response.body)['code'] == 'internal'
+        assert 'boom' in caplog.text
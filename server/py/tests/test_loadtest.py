@@ -0,0 +1,84 @@
+"""压测脚本测试"""
+
+import argparse
+import asyncio
+import json
+
+from benchmarks.loadtest import parse_mix, percentile, run_load
+from benchmarks.payloads import SCENARIO_PATHS, build_bodies, build_messages
+from petcode_server import create_app
+import pytest
+import uvicorn
+
+from .conftest import call_app
+
+
+class TestHelpers:
+    """测试辅助函数"""
+
+    def test_percentile(self):
+        """测试最近秩百分位数"""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+        assert percentile([], 50) == 0.0
+
+    def test_parse_mix(self):
+        """测试解析场景权重"""
+        assert parse_mix('decode=3,encode') == {'decode': 3.0, 'encode': 1.0}
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix('unknown=1')
+
+    @pytest.mark.parametrize('scenario', list(SCENARIO_PATHS))
+    @pytest.mark.parametrize('content_type', ['json', 'proto'])
+    def test_bodies_accepted_by_server(self, scenario, content_type):
+        """测试生成的请求体都能被服务器正确处理"""
+        app = create_app()
+        messages = build_messages(count=4)
+        mime = 'application/json' if content_type == 'json' else 'application/proto'
+        for body in build_bodies(
+            scenario, messages, content_type=content_type, batch_size=5
+        ):
+            response = call_app(app, 'POST', SCENARIO_PATHS[scenario], body, mime)
+            assert response.status == 200
+
+
+class TestRunLoad:
+    """测试对真实服务器压测"""
+
+    def test_report(self):
+        """测试压测结果的结构"""
+
+        async def scenario():
+            config = uvicorn.Config(
+                create_app(), host='127.0.0.1', port=0, log_level='warning'
+            )
+            server = uvicorn.Server(config)
+            task = asyncio.create_task(server.serve())
+            # uvicorn 没有提供启动完成的事件，只能轮询
+            while not server.started:  # noqa: ASYNC110
+                await asyncio.sleep(0.01)
+            port = server.servers[0].sockets[0].getsockname()[1]
+            try:
+                return await run_load(
+                    f'http://127.0.0.1:{port}',
+                    mix={'decode': 1, 'batch_encode': 1},
+                    concurrency=4,
+                    duration=0.3,
+                    warmup=0.05,
+                    batch_size=5,
+                )
+            finally:
+                server.should_exit = True
+                await task
+
+        report = asyncio.run(scenario())
+
+        assert report['requests'] > 0
+        assert report['errors'] == 0
+        assert report['status_codes'] == {'200': report['requests']}
+        assert set(report['scenarios']) == {'decode', 'batch_encode'}
+        latency = report['latency_ms']
+        assert 0 < latency['p50'] <= latency['p95'] <= latency['p99'] <= latency['max']
+        json.dumps(report)
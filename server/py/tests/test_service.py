@@ -0,0 +1,96 @@
+"""PetCodeService 测试"""
+
+import petcode
+from petcode_server import ConnectError
+import pytest
+from seerbp.petcode.server.v1.service_pb2 import (
+    BatchDecodePetCodeMessageFromBase64Request,
+    BatchEncodePetCodeMessageToBase64Request,
+    DecodePetCodeMessageFromBase64Request,
+    EncodePetCodeMessageToBase64Request,
+)
+
+
+class TestPetCodeService:
+    """测试单条 RPC"""
+
+    def test_encode_and_decode(self, service, sample_petcode_message):
+        """测试编码后解码得到原消息"""
+        encoded = service.encode_pet_code_message_to_base64(
+            EncodePetCodeMessageToBase64Request(pet_code_message=sample_petcode_message)
+        )
+        assert encoded.base64 == petcode.to_base64(sample_petcode_message)
+
+        decoded = service.decode_pet_code_message_from_base64(
+            DecodePetCodeMessageFromBase64Request(base64=encoded.base64)
+        )
+        assert decoded.pet_code_message == sample_petcode_message
+
+    def test_encode_requires_message(self, service):
+        """测试缺少消息时报错"""
+        with pytest.raises(ConnectError) as exc_info:
+            service.encode_pet_code_message_to_base64(
+                EncodePetCodeMessageToBase64Request()
+            )
+        assert exc_info.value.code == 'invalid_argument'
+
+    @pytest.mark.parametrize('base64', ['', 'not base64', 'AAAA'])
+    def test_decode_invalid(self, service, base64):
+        """测试空字符串和无效数据"""
+        with pytest.raises(ConnectError) as exc_info:
+            service.decode_pet_code_message_from_base64(
+                DecodePetCodeMessageFromBase64Request(base64=base64)
+            )
+        assert exc_info.value.code == 'invalid_argument'
+
+
+class TestBatchRpc:
+    """测试批量 RPC"""
+
+    def test_batch_encode(self, service, sample_petcode_message):
+        """测试批量编码，结果顺序与输入一致"""
+        other = petcode.PetCodeMessage()
+        other.CopyFrom(sample_petcode_message)
+        other.pets[0].level = 1
+        response = service.batch_encode_pet_code_message_to_base64(
+            BatchEncodePetCodeMessageToBase64Request(
+                pet_code_messages=[sample_petcode_message, other]
+            )
+        )
+        assert list(response.base64) == [
+            petcode.to_base64(sample_petcode_message),
+            petcode.to_base64(other),
+        ]
+
+    def test_batch_decode_reports_errors_in_place(
+        self, service, sample_petcode_message
+    ):
+        """测试单条解码失败不影响其他结果"""
+        code = petcode.to_base64(sample_petcode_message)
+        response = service.batch_decode_pet_code_message_from_base64(
+            BatchDecodePetCodeMessageFromBase64Request(base64=[code, 'AAAA', code])
+        )
+
+        results = response.results
+        assert [r.WhichOneof('result') for r in results] == [
+            'pet_code_message',
+            'error',
+            'pet_code_message',
+        ]
+        assert results[0].pet_code_message == sample_petcode_message
+        assert results[1].error == 'invalid base64'
+
+    def test_batch_empty(self, service):
+        """测试空批量请求"""
+        response = service.batch_decode_pet_code_message_from_base64(
+            BatchDecodePetCodeMessageFromBase64Request()
+        )
+        assert len(response.results) == 0
+
+    def test_batch_size_limit(self, service):
+        """测试超过批量大小限制时报错"""
+        with pytest.raises(ConnectError) as exc_info:
+            service.batch_decode_pet_code_message_from_base64(
+                BatchDecodePetCodeMessageFromBase64Request(base64=['AAAA'] * 11)
+            )
+        assert exc_info.value.code == 'invalid_argument'